@@ -0,0 +1,58 @@
+"""Compara o IndiceFiltros com a cadeia de filtros original do dashboard.
+
+Uso: python benchmarks/bench_filtros.py [n_linhas]
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_pipeline import cronometrar
+from benchmarks.gerador import gerar_base
+from paradas.compactacao import compactar
+from paradas.filtros import IndiceFiltros, aplicar
+
+
+def cadeia_original(df, locais, equipamentos, status, periodo):
+    df_filtrado = df.copy()
+    df_filtrado = df_filtrado[df_filtrado['Local'].isin(locais)]
+    df_filtrado = df_filtrado[df_filtrado['Equipamento'].isin(equipamentos)]
+    df_filtrado = df_filtrado[df_filtrado['Status'].isin(status)]
+    data_inicio = pd.to_datetime(periodo[0])
+    data_fim = pd.to_datetime(periodo[1])
+    return df_filtrado[
+        (df_filtrado['Data Início'] >= data_inicio) &
+        (df_filtrado['Data Início'] <= data_fim)
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = compactar(gerar_base(n))
+
+    locais = list(df['Local'].cat.categories[:6])
+    equipamentos = list(df['Equipamento'].cat.categories[:200])
+    status = ['Fechado']
+    periodo = (pd.Timestamp('2021-03-01'), pd.Timestamp('2023-09-30'))
+
+    t_indice, indice = cronometrar(lambda: IndiceFiltros(df), repeticoes=1)
+    t_original, esperado = cronometrar(lambda: cadeia_original(df, locais, equipamentos, status, periodo))
+    t_filtro, posicoes = cronometrar(lambda: indice.filtrar(
+        {'Local': locais, 'Equipamento': equipamentos, 'Status': status}, periodo=periodo
+    ))
+    t_aplicar, obtido = cronometrar(lambda: aplicar(df, posicoes))
+
+    assert obtido.index.equals(esperado.index), 'IndiceFiltros divergiu da cadeia original'
+
+    print(f'Linhas: {n:,} | filtradas: {len(posicoes):,}')
+    print(f'Construção do índice:  {t_indice * 1000:8.1f} ms (uma vez por base)')
+    print(f'Cadeia original:       {t_original * 1000:8.1f} ms')
+    print(f'IndiceFiltros.filtrar: {t_filtro * 1000:8.1f} ms')
+    print(f'  + aplicar (iloc):    {t_aplicar * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
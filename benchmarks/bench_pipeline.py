@@ -0,0 +1,178 @@
+"""Benchmark das etapas do pipeline de dados do dashboard.
+
+Gera bases sintéticas (benchmarks/gerador.py), cronometra cada etapa
+separadamente e grava os resultados em JSON para comparação entre versões.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--tamanhos 10000 100000 ...] [--saida arquivo.json]
+                                        [--comparar anterior.json] [--xlsx]
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+
+from benchmarks.gerador import gerar_base, salvar
+from paradas.causas import IndiceCausas
+from paradas.classificacao import ClassificadorManutencao
+from paradas.compactacao import compactar
+from paradas.cubo import CuboParadas
+from paradas.exportacao import escrever_csv
+from paradas.filtros import IndiceFiltros, aplicar
+from paradas.ingestao import CacheParquet, carregar_arquivo
+from paradas.kpis import calcular_kpis, tabela_kpis
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# Acima disso a planilha não cabe numa aba do Excel (e a escrita leva muito tempo)
+LIMITE_XLSX = 100_000
+
+# Uma etapa é sinalizada quando fica mais lenta que isso em relação à referência
+TOLERANCIA_REGRESSAO = 1.2
+
+
+def cronometrar(funcao, repeticoes=3):
+    """Menor tempo (s) entre ``repeticoes`` execuções e o resultado da última."""
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos), resultado
+
+
+def medir(n, diretorio, repeticoes=3, xlsx=False):
+    """Tempos (s) de cada etapa para uma base sintética de ``n`` linhas."""
+    base = gerar_base(n)
+    extensao = 'xlsx' if xlsx and n <= LIMITE_XLSX else 'csv'
+    caminho = Path(diretorio) / f'base_{n}.{extensao}'
+    salvar(base, caminho)
+    del base
+    dados = caminho.read_bytes()
+
+    etapas = {}
+    # Leitura do arquivo como no upload (carregar_base): hash, conversão em
+    # blocos para o cache Parquet, leitura do Parquet e compactação
+    diretorio_cache = Path(diretorio) / f'cache_{n}'
+
+    def ler(frio):
+        if frio:
+            shutil.rmtree(diretorio_cache, ignore_errors=True)
+        cache = CacheParquet(diretorio_cache)
+        return compactar(carregar_arquivo(dados, caminho.name, cache=cache, em_blocos=True))
+
+    # Cache vazio (primeiro upload) e cache já preenchido (mesmo arquivo de novo)
+    etapas['leitura'], df = cronometrar(lambda: ler(frio=True), repeticoes=1 if n > LIMITE_XLSX else repeticoes)
+    etapas['leitura_cache'], df = cronometrar(lambda: ler(frio=False), repeticoes)
+    shutil.rmtree(diretorio_cache, ignore_errors=True)
+    del dados
+
+    locais = list(df['Local'].cat.categories[: max(1, len(df['Local'].cat.categories) // 2)])
+    equipamentos = list(df['Equipamento'].cat.categories[: max(1, len(df['Equipamento'].cat.categories) // 2)])
+    inicio, fim = df['Data Início'].quantile([0.1, 0.9])
+    selecoes = {'Local': locais, 'Equipamento': equipamentos, 'Status': ['Fechado', 'Aberto']}
+
+    etapas['indice_filtros'], indice = cronometrar(lambda: IndiceFiltros(df), repeticoes=1)
+    etapas['filtros'], posicoes = cronometrar(
+        lambda: indice.filtrar(selecoes, periodo=(inicio, fim)), repeticoes
+    )
+    df_filtrado = aplicar(df, posicoes)
+
+    etapas['kpis'], _ = cronometrar(lambda: calcular_kpis(df_filtrado), repeticoes)
+    etapas['kpis_por_grupo'], _ = cronometrar(lambda: tabela_kpis(df_filtrado), repeticoes)
+    # Classificação a frio: um classificador novo a cada repetição
+    etapas['classificacao'], _ = cronometrar(
+        lambda: ClassificadorManutencao().classificar(df_filtrado['Causa']), repeticoes
+    )
+    etapas['indice_causas'], indice_causas = cronometrar(lambda: IndiceCausas(df['Causa']), repeticoes=1)
+    etapas['palavras_chave'], _ = cronometrar(lambda: indice_causas.top_termos(posicoes, n=10), repeticoes)
+    etapas['cubo'], cubo = cronometrar(lambda: CuboParadas(df), repeticoes=1)
+    etapas['tendencia_mensal'], _ = cronometrar(lambda: cubo.serie(posicoes, 'Mês'), repeticoes)
+    etapas['tendencia_diaria'], _ = cronometrar(lambda: cubo.serie(posicoes, 'Dia'), repeticoes)
+    destino = Path(diretorio) / f'export_{n}.csv'
+    etapas['exportacao_csv'], _ = cronometrar(lambda: escrever_csv(df, posicoes, destino), repeticoes=1)
+
+    return {
+        'linhas': n,
+        'linhas_filtradas': int(len(posicoes)),
+        'formato_entrada': extensao,
+        'etapas_s': {etapa: round(tempo, 6) for etapa, tempo in etapas.items()},
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, referencia):
+    """Lista as etapas que ficaram mais lentas que a referência além da tolerância."""
+    anteriores = {r['linhas']: r['etapas_s'] for r in referencia['resultados']}
+    regressoes = []
+    for resultado in atual['resultados']:
+        antes = anteriores.get(resultado['linhas'], {})
+        for etapa, tempo in resultado['etapas_s'].items():
+            if antes.get(etapa) and tempo > antes[etapa] * TOLERANCIA_REGRESSAO:
+                regressoes.append((resultado['linhas'], etapa, antes[etapa], tempo))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--xlsx', action='store_true', help=f'Ler bases de até {LIMITE_XLSX} linhas em .xlsx')
+    parser.add_argument('--saida', type=Path, default=None, help='Arquivo JSON (padrão: benchmarks/resultados/)')
+    parser.add_argument('--comparar', type=Path, default=None, help='JSON de referência para detectar regressões')
+    args = parser.parse_args(argv)
+
+    commit = _commit()
+    relatorio = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'resultados': [],
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        for n in args.tamanhos:
+            resultado = medir(n, diretorio, args.repeticoes, args.xlsx)
+            relatorio['resultados'].append(resultado)
+            print(f'\n{n:,} linhas ({resultado["linhas_filtradas"]:,} filtradas, {resultado["formato_entrada"]})')
+            for etapa, tempo in resultado['etapas_s'].items():
+                print(f'  {etapa:<18} {tempo * 1000:10.1f} ms')
+
+    saida = args.saida or RAIZ / 'benchmarks' / 'resultados' / f'bench_{commit or "local"}_{datetime.now():%Y%m%d_%H%M%S}.json'
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'\nResultados gravados em {saida}')
+
+    if args.comparar:
+        regressoes = comparar(relatorio, json.loads(args.comparar.read_text(encoding='utf-8')))
+        for linhas, etapa, antes, depois in regressoes:
+            print(f'REGRESSÃO {linhas:,} linhas / {etapa}: {antes * 1000:.1f} ms -> {depois * 1000:.1f} ms')
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Gerador de bases sintéticas de paradas no formato esperado pelo dashboard.
+
+As cardinalidades seguem o que se vê nas bases reais: poucos locais,
+equipamentos na casa de centenas a milhares, causas compostas de
+componente + sintoma (com uma parcela de preventivas) e ~10% de paradas
+em aberto, sem 'Data Fim'.
+"""
+
+import numpy as np
+import pandas as pd
+
+LOCAIS = [
+    'AGR Cabiúnas', 'TIMS', 'Pátio de Valorização de Resíduos', 'Área 400 Depósito 421',
+    'Terminal Norte', 'Base Macaé', 'Porto do Açu', 'Usina Sul', 'Oficina Central',
+    'Almoxarifado 2', 'Canteiro Leste', 'Pátio Ferroviário',
+]
+TIPOS_EQUIPAMENTO = [
+    'Empilhadeira 2.5 ton', 'Empilhadeira 4 ton', 'Empilhadeira 7 ton', 'Retroescavadeira',
+    'Manipuladora', 'Pá carregadeira', 'Caminhão munck', 'Guindaste', 'Rebocador', 'Plataforma elevatória',
+]
+COMPONENTES = [
+    'freio de mão', 'cabo de bateria', 'mangueira hidráulica', 'pneu dianteiro', 'pneu traseiro',
+    'motor de partida', 'alternador', 'garfo', 'mastro', 'corrente de elevação', 'sistema elétrico',
+    'radiador', 'bomba hidráulica', 'painel', 'farol', 'cilindro de inclinação', 'embreagem',
+    'caixa de câmbio', 'filtro de óleo', 'parafusos da roda',
+]
+SINTOMAS = [
+    'travado', 'com folga', 'com vazamento', 'danificado', 'sem funcionamento', 'com ruído',
+    'superaquecendo', 'desgastado', 'rompido', 'com afrouxamento', 'em curto', 'desalinhado',
+]
+PREVENTIVAS = [
+    'Manutenção preventiva programada', 'Lavagem geral', 'Revisão preventiva de 500 horas',
+    'Troca de óleo programada', 'Inspeção preventiva', 'Análise de vibração preditiva',
+]
+
+
+def gerar_base(n, seed=0, proporcao_abertas=0.1, anos=5):
+    """Base sintética com ``n`` paradas nas colunas do dashboard."""
+    rng = np.random.default_rng(seed)
+
+    n_equipamentos = int(np.clip(n // 50, 20, 20_000))
+    equipamentos = np.array(
+        [f'{TIPOS_EQUIPAMENTO[i % len(TIPOS_EQUIPAMENTO)]} #{i:05d}' for i in range(n_equipamentos)],
+        dtype=object,
+    )
+    # Cada equipamento pertence a um local fixo
+    local_do_equipamento = rng.integers(0, len(LOCAIS), n_equipamentos)
+
+    causas = np.array(
+        [f'{c.capitalize()} {s}' for c in COMPONENTES for s in SINTOMAS] + PREVENTIVAS,
+        dtype=object,
+    )
+    pesos = np.ones(len(causas))
+    pesos[-len(PREVENTIVAS):] = 25.0
+    pesos /= pesos.sum()
+
+    # Alguns equipamentos quebram bem mais que outros (distribuição de Zipf)
+    codigo_equipamento = (rng.zipf(1.3, n) - 1) % n_equipamentos
+    inicio = pd.Timestamp('2020-01-01') + pd.to_timedelta(
+        rng.integers(0, anos * 365 * 24 * 60, n), unit='min'
+    )
+    duracao_h = rng.lognormal(mean=1.5, sigma=1.2, size=n)
+    aberta = rng.random(n) < proporcao_abertas
+    fim = pd.Series(inicio + pd.to_timedelta(np.round(duracao_h * 60), unit='min'))
+    fim[aberta] = pd.NaT
+
+    return pd.DataFrame({
+        'Data Início': inicio,
+        'Data Fim': fim,
+        'Local': pd.Categorical.from_codes(local_do_equipamento[codigo_equipamento], categories=LOCAIS),
+        'Equipamento': pd.Categorical.from_codes(codigo_equipamento, categories=equipamentos),
+        'Causa': pd.Categorical.from_codes(rng.choice(len(causas), n, p=pesos), categories=causas),
+        'Status': np.where(aberta, 'Aberto', 'Fechado'),
+    })
+
+
+def salvar(df, caminho):
+    """Grava a base em .csv ou .xlsx, conforme a extensão de ``caminho``."""
+    if str(caminho).lower().endswith('.xlsx'):
+        df.to_excel(caminho, index=False)
+    else:
+        df.to_csv(caminho, index=False)
@@ -1,11 +1,40 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import openpyxl
 from io import BytesIO
+import os
+from uuid import uuid4
+
+from paradas.causas import MAX_GRUPOS, IndiceCausas
+from paradas.classificacao import ClassificadorManutencao
+from paradas.compactacao import compactar, uso_memoria
+from paradas.confiabilidade import HORIZONTE_PADRAO_H, analisar_confiabilidade
+from paradas.cubo import DIMENSOES, GRANULARIDADES, LIMITE_DIAS_HORA, CuboParadas
+from paradas.agregados import HistoricoAgregados, kpis_de_agregados, selecionar
+from paradas.exportacao import FORMATOS, LIMITE_LINHAS_XLSX, CacheExportacoes
+from paradas.filtros import IndiceFiltros, aplicar
+from paradas.fontes import LIMITE_CATALOGO, PERIODO_INICIAL_DIAS, TABELA_PADRAO, FonteMemoria, abrir_fonte, assinatura_fonte
+from paradas.intervalos import paradas_simultaneas
+from paradas.perfil import MetricasEtapas, PerfilExecucao, configurar_log
+from paradas.reducao import detalhamento, limitar_figura
+from paradas.registro import RegistroBases
+from paradas.kpis import NIVEIS, calcular_kpis, tabela_kpis
+from paradas.graficos import (
+    CacheGraficos,
+    figura_palavras_chave,
+    figura_paradas_por_equipamento,
+    figura_paradas_por_local,
+    figura_sobrevivencia,
+    figura_tendencia,
+    figura_tendencia_por_grupo,
+    figura_tipo_manutencao,
+    impressao_filtros,
+)
+from paradas.tabela import IndiceTabela, total_paginas
+from paradas.tarefas import ExecutorTarefas
+from paradas.ingestao import CacheParquet, ColunasFaltantesError, carregar_arquivo, hash_conteudo
 
 # Configuração da página
 st.set_page_config(
@@ -18,37 +47,118 @@ st.set_page_config(
 # Título do aplicativo
 st.title("📊 Dashboard de KPIs de Manutenção com Pirâmide de Bird")
 
+# Cache em disco compartilhado entre reruns e sessões
+@st.cache_resource
+def get_cache_parquet():
+    return CacheParquet()
+
+# Registro de bases do processo: uma cópia mapeada por conteúdo, compartilhada por todas as sessões
+@st.cache_resource
+def get_registro_bases():
+    return RegistroBases()
+
+# Leitura e compactação, executadas só pela primeira sessão que envia o arquivo
+def carregar_base(chave, nome, dados):
+    with st.spinner("Processando arquivo..."):
+        df = carregar_arquivo(dados, nome, cache=get_cache_parquet(), chave=chave, em_blocos=True)
+        # Compactar categorias e numéricos, medindo a memória antes
+        memoria_antes = uso_memoria(df)
+        return compactar(df), memoria_antes
+
+# Histórico de agregados parciais persistido entre sessões
+@st.cache_resource
+def get_historico():
+    return HistoricoAgregados()
+
+# Classificador de manutenção com memória por texto de causa, compartilhado entre reruns
+@st.cache_resource
+def get_classificador():
+    return ClassificadorManutencao()
+
+# Pool de threads das seções pesadas, com os resultados guardados por chave
+@st.cache_resource
+def get_executor_tarefas():
+    return ExecutorTarefas()
+
+# Intervalo (s) entre as verificações das seções ainda em cálculo
+INTERVALO_VERIFICACAO = 0.5
+
+def aguardar(tarefa, descricao):
+    """Resultado da tarefa, ou None com um aviso que se atualiza até ela terminar."""
+    if tarefa.done():
+        try:
+            return tarefa.result()
+        except Exception as e:
+            st.error(f"❌ Erro ao calcular {descricao}: {e}")
+            return None
+
+    # Só o aviso é reexecutado; ao terminar, a página inteira é redesenhada com o resultado
+    @st.fragment(run_every=INTERVALO_VERIFICACAO)
+    def espera():
+        if tarefa.done():
+            st.rerun()
+        st.info(f"⏳ Calculando {descricao}...")
+
+    espera()
+    return None
+
+# Cache das figuras, compartilhado entre sessões e chaveado pelo estado dos filtros
+@st.cache_resource
+def get_cache_graficos():
+    return CacheGraficos()
+
+# Posições das consultas da tabela detalhada: separadas das figuras, que uma consulta grande expulsaria
+@st.cache_resource
+def get_cache_tabela():
+    return CacheGraficos(max_entradas=16, max_bytes=256 * 1024 * 1024)
+
+# Ranks de ordenação da tabela detalhada, calculados sob demanda por base
+@st.cache_resource(max_entries=4)
+def get_indice_tabela(chave, _df):
+    return IndiceTabela(_df)
+
+# Arquivos exportados em disco, chaveados pela impressão digital dos filtros
+@st.cache_resource
+def get_cache_exportacoes():
+    return CacheExportacoes()
+
+# Cubo de tempo de parada por dia, dividido uma vez por base
+@st.cache_resource(max_entries=4)
+def get_cubo(chave, _df):
+    return CuboParadas(_df)
+
+# Índice de filtros construído uma vez por base (mesma chave do conteúdo)
+@st.cache_resource(max_entries=4)
+def get_indice_filtros(chave, _df):
+    return IndiceFiltros(_df)
+
+# Métricas de latência por etapa, acumuladas entre sessões
+@st.cache_resource
+def get_metricas():
+    configurar_log()
+    return MetricasEtapas()
+
 # Função para carregar dados via upload
 def load_data():
-    uploaded_file = st.file_uploader("📤 Faça upload da sua base de dados Excel", type=["xlsx", "xls"])
+    uploaded_file = st.file_uploader("📤 Faça upload da sua base de dados Excel", type=["xlsx", "xls", "csv"])
+    registro_bases = get_registro_bases()
+    id_sessao = st.session_state.setdefault('id_sessao', uuid4().hex)
+    chave_anterior = st.session_state.get('chave_registrada')
     
     if uploaded_file is not None:
         try:
-            # Ler o arquivo Excel
-            df = pd.read_excel(uploaded_file)
-            
-            # Verificar colunas obrigatórias
-            colunas_obrigatorias = ['Data Início', 'Status']
-            colunas_faltantes = [col for col in colunas_obrigatorias if col not in df.columns]
+            # Ler o arquivo Excel (apenas uma vez por conteúdo, no processo inteiro)
+            dados = uploaded_file.getvalue()
+            chave = hash_conteudo(dados)
+            if chave_anterior not in (None, chave):
+                registro_bases.liberar(chave_anterior, id_sessao, descartar=st.session_state.get('consulta_registrada', False))
+            base = registro_bases.adquirir(chave, id_sessao, lambda: carregar_base(chave, uploaded_file.name, dados))
+            st.session_state['chave_registrada'] = chave
+            st.session_state['consulta_registrada'] = False
+            df = base.df
             
-            if colunas_faltantes:
-                st.error(f"❌ Colunas obrigatórias não encontradas: {', '.join(colunas_faltantes)}")
-                st.info("ℹ️ As colunas necessárias são: 'Data Início' e 'Status'")
-                return pd.DataFrame()
-            
-            # Converter colunas de data
-            df['Data Início'] = pd.to_datetime(df['Data Início'], errors='coerce')
-            
-            if 'Data Fim' in df.columns:
-                df['Data Fim'] = pd.to_datetime(df['Data Fim'], errors='coerce')
-            
-            # Calcular tempo de parada se não existir
             if 'Tempo de Parada (h)' not in df.columns:
-                if 'Data Fim' in df.columns:
-                    mask = df['Data Fim'].notna() & df['Data Início'].notna()
-                    df.loc[mask, 'Tempo de Parada (h)'] = (df.loc[mask, 'Data Fim'] - df.loc[mask, 'Data Início']).dt.total_seconds() / 3600
-                else:
-                    st.warning("⚠️ Coluna 'Data Fim' não encontrada. Não foi possível calcular tempo de parada.")
+                st.warning("⚠️ Coluna 'Data Fim' não encontrada. Não foi possível calcular tempo de parada.")
             
             # Mostrar preview dos dados com toggle
             st.success("✅ Arquivo carregado com sucesso!")
@@ -62,7 +172,7 @@ def load_data():
             
             # Mostrar informações do dataset
             st.write("📊 **Informações do dataset:**")
-            col_info1, col_info2, col_info3 = st.columns(3)
+            col_info1, col_info2, col_info3, col_info4 = st.columns(4)
             with col_info1:
                 st.write(f"**Total de registros:** {len(df)}")
             with col_info2:
@@ -72,6 +182,13 @@ def load_data():
                 st.write(f"**Período:** {date_range}")
             with col_info3:
                 st.write(f"**Colunas disponíveis:** {len(df.columns)}")
+            with col_info4:
+                memoria = f"**Memória:** {uso_memoria(df) / 1024**2:.1f} MB"
+                if base.memoria_antes is not None:
+                    memoria += f" (antes {base.memoria_antes / 1024**2:.1f} MB)"
+                if base.mapeada:
+                    memoria += " · compartilhada"
+                st.write(memoria)
             
             # Mostrar lista de colunas disponíveis com toggle
             show_columns = st.checkbox("📋 Mostrar lista de colunas disponíveis", value=False)
@@ -80,12 +197,20 @@ def load_data():
                 for i, col in enumerate(df.columns, 1):
                     st.write(f"{i}. {col}")
             
-            return df
+            return df, chave
             
+        except ColunasFaltantesError as e:
+            st.error(f"❌ {e}")
+            st.info("ℹ️ As colunas necessárias são: 'Data Início' e 'Status'")
+            return pd.DataFrame(), None
         except Exception as e:
             st.error(f"❌ Erro ao carregar o arquivo: {e}")
-            return pd.DataFrame()
+            return pd.DataFrame(), None
     else:
+        if chave_anterior is not None:
+            registro_bases.liberar(chave_anterior, id_sessao, descartar=st.session_state.get('consulta_registrada', False))
+            del st.session_state['chave_registrada']
+
         # Instruções para o usuário
         st.info("""
         📝 **Instruções para upload:**
@@ -94,7 +219,7 @@ def load_data():
            - `Data Início` (obrigatório)
            - `Status` (obrigatório)
            - `Data Fim` (opcional, mas recomendado)
-        3. Formatos suportados: .xlsx, .xls
+        3. Formatos suportados: .xlsx, .xls, .csv
         """)
         
         # Exemplo de estrutura esperada
@@ -109,68 +234,155 @@ def load_data():
         }
         st.dataframe(pd.DataFrame(exemplo_data))
         
-        return pd.DataFrame()
-
-# Carregar dados
-df = load_data()
-
-# Verificar se os dados foram carregados
-if df.empty:
-    st.warning("⏳ Aguardando upload do arquivo para análise...")
-    st.stop()
+        return pd.DataFrame(), None
+
+ORIGEM_UPLOAD = "Upload de arquivo"
+ORIGEM_FONTE = "Banco SQLite/DuckDB ou Parquet particionado"
+
+# Fonte externa aberta uma vez por caminho e versão dos arquivos, compartilhada entre sessões
+@st.cache_resource(max_entries=4)
+def get_fonte(caminho, tabela, assinatura):
+    return abrir_fonte(caminho, tabela)
+
+# Escolha da fonte externa: só o catálogo (colunas, valores e datas) é lido aqui
+def selecionar_fonte():
+    col_caminho, col_tabela = st.columns([3, 1])
+    with col_caminho:
+        caminho = st.text_input(
+            "Caminho do arquivo .sqlite/.duckdb ou do diretório Parquet:", value=os.environ.get('PARADAS_FONTE', '')
+        )
+    with col_tabela:
+        tabela = st.text_input("Tabela (SQLite/DuckDB):", value=TABELA_PADRAO)
+    if not caminho:
+        st.info(
+            "📝 Informe um banco SQLite/DuckDB com a tabela de paradas ou um diretório Parquet particionado "
+            "por `Local=<valor>/mes=<AAAA-MM>` (gerado por `python -m paradas <diretorio> --particionar <destino>`)."
+        )
+        return None
+    try:
+        with st.spinner("Lendo catálogo da fonte..."):
+            return get_fonte(caminho, tabela, assinatura_fonte(caminho))
+    except ColunasFaltantesError as e:
+        st.error(f"❌ {e}")
+        st.info("ℹ️ As colunas necessárias são: 'Data Início' e 'Status'")
+    except Exception as e:
+        st.error(f"❌ Erro ao abrir a fonte: {e}")
+    return None
+
+# Leitura só das linhas e colunas dos filtros ativos, executada pela primeira sessão que pede a consulta
+def carregar_consulta(fonte, selecoes, periodo):
+    with st.spinner("Consultando a fonte com os filtros..."):
+        df = fonte.ler(selecoes, periodo)
+        memoria_antes = uso_memoria(df)
+        return compactar(df), memoria_antes
+
+def ler_fonte(fonte, selecoes, periodo):
+    registro_bases = get_registro_bases()
+    id_sessao = st.session_state.setdefault('id_sessao', uuid4().hex)
+    chave_anterior = st.session_state.get('chave_registrada')
+    chave = fonte.chave(selecoes, periodo)
+    if chave_anterior not in (None, chave):
+        registro_bases.liberar(chave_anterior, id_sessao, descartar=st.session_state.get('consulta_registrada', False))
+    base = registro_bases.adquirir(chave, id_sessao, lambda: carregar_consulta(fonte, selecoes, periodo))
+    st.session_state['chave_registrada'] = chave
+    # O resultado da consulta anterior sai do registro assim que a sessão muda de filtro
+    st.session_state['consulta_registrada'] = True
+    st.caption(
+        f"🔌 {fonte.descricao}: {len(base.df)} linhas lidas com os filtros aplicados na fonte "
+        f"({uso_memoria(base.df) / 1024**2:.1f} MB)"
+    )
+    return base.df, chave
+
+# Cronometragem das etapas desta execução (memória só com o painel de performance ativo)
+perfil = PerfilExecucao(medir_memoria=st.session_state.get('mostrar_perfil', False))
+
+origem = st.radio("📂 Origem dos dados:", [ORIGEM_UPLOAD, ORIGEM_FONTE], horizontal=True)
+
+if origem == ORIGEM_UPLOAD:
+    # Carregar dados
+    with perfil.etapa('leitura') as registro:
+        df, chave_base = load_data()
+        registro['linhas'] = len(df)
+
+    # Verificar se os dados foram carregados
+    if df.empty:
+        st.warning("⏳ Aguardando upload do arquivo para análise...")
+        st.stop()
+    fonte = FonteMemoria(df)
+else:
+    # A base só é lida depois da sidebar, já com os filtros
+    fonte = selecionar_fonte()
+    if fonte is None:
+        st.stop()
+colunas_fonte = fonte.colunas
 
 # Sidebar com filtros
 st.sidebar.header("🔧 Filtros")
 
+if origem == ORIGEM_FONTE:
+    # Fontes externas nunca são lidas inteiras sem pedido: a janela padrão é sempre empurrada para a leitura
+    ler_tudo = st.sidebar.checkbox(f"📦 Ler a fonte inteira (padrão: últimos {PERIODO_INICIAL_DIAS} dias)", value=False)
+    periodo_fonte = fonte.periodo_padrao(None if ler_tudo else PERIODO_INICIAL_DIAS)
+
+def todos_os_valores(coluna):
+    # Catálogo incompleto (valores demais): seleção vazia, que não filtra
+    return fonte.valores_distintos(coluna) if fonte.catalogo_completo(coluna) else []
+
+def avisar_catalogo(coluna):
+    if not fonte.catalogo_completo(coluna):
+        st.sidebar.caption(f"Mais de {LIMITE_CATALOGO} valores de '{coluna}': deixe vazio para considerar todos.")
+
 # Checkbox para mostrar/ocultar filtros avançados
 show_advanced_filters = st.sidebar.checkbox("🎛️ Mostrar filtros avançados", value=True)
 
 if show_advanced_filters:
     # Filtro por local (se a coluna existir)
-    if 'Local' in df.columns:
-        locais = list(df['Local'].unique())
+    if 'Local' in colunas_fonte:
+        locais = fonte.valores_distintos('Local')
         locais_selecionados = st.sidebar.multiselect(
             'Selecione os Locais:',
             options=locais,
-            default=locais
+            default=todos_os_valores('Local')
         )
+        avisar_catalogo('Local')
     else:
         st.sidebar.warning("⚠️ Coluna 'Local' não encontrada nos dados.")
         locais_selecionados = []
 
     # Filtro por equipamento (se a coluna existir)
-    if 'Equipamento' in df.columns:
-        equipamentos = list(df['Equipamento'].unique())
+    if 'Equipamento' in colunas_fonte:
+        equipamentos = fonte.valores_distintos('Equipamento')
         equipamentos_selecionados = st.sidebar.multiselect(
             'Selecione os Equipamentos:',
             options=equipamentos,
-            default=equipamentos
+            default=todos_os_valores('Equipamento')
         )
+        avisar_catalogo('Equipamento')
     else:
         st.sidebar.warning("⚠️ Coluna 'Equipamento' não encontrada nos dados.")
         equipamentos_selecionados = []
 
     # Filtro por status
-    if 'Status' in df.columns:
-        status = list(df['Status'].unique())
+    if 'Status' in colunas_fonte:
+        status = fonte.valores_distintos('Status')
         status_selecionados = st.sidebar.multiselect(
             'Selecione os Status:',
             options=status,
-            default=status
+            default=todos_os_valores('Status')
         )
+        avisar_catalogo('Status')
     else:
         st.sidebar.warning("⚠️ Coluna 'Status' não encontrada nos dados.")
         status_selecionados = []
 
     # Filtro por período
-    if 'Data Início' in df.columns:
-        min_date = df['Data Início'].min()
-        max_date = df['Data Início'].max()
+    if 'Data Início' in colunas_fonte:
+        min_date, max_date = fonte.intervalo_datas()
 
         if pd.notna(min_date) and pd.notna(max_date):
             periodo = st.sidebar.date_input(
                 'Selecione o Período:',
-                value=(min_date, max_date),
+                value=(min_date, max_date) if origem == ORIGEM_UPLOAD else periodo_fonte,
                 min_value=min_date,
                 max_value=max_date
             )
@@ -182,69 +394,77 @@ if show_advanced_filters:
         periodo = []
 else:
     # Se filtros avançados estiverem ocultos, usar todos os dados
-    locais_selecionados = list(df['Local'].unique()) if 'Local' in df.columns else []
-    equipamentos_selecionados = list(df['Equipamento'].unique()) if 'Equipamento' in df.columns else []
-    status_selecionados = list(df['Status'].unique()) if 'Status' in df.columns else []
+    locais_selecionados = todos_os_valores('Local') if 'Local' in colunas_fonte else []
+    equipamentos_selecionados = todos_os_valores('Equipamento') if 'Equipamento' in colunas_fonte else []
+    status_selecionados = todos_os_valores('Status') if 'Status' in colunas_fonte else []
     periodo = []
 
-# Aplicar filtros
-df_filtrado = df.copy()
-
-if 'Local' in df.columns and locais_selecionados:
-    df_filtrado = df_filtrado[df_filtrado['Local'].isin(locais_selecionados)]
-
-if 'Equipamento' in df.columns and equipamentos_selecionados:
-    df_filtrado = df_filtrado[df_filtrado['Equipamento'].isin(equipamentos_selecionados)]
-
-if 'Status' in df.columns and status_selecionados:
-    df_filtrado = df_filtrado[df_filtrado['Status'].isin(status_selecionados)]
+if origem == ORIGEM_FONTE and len(periodo) != 2:
+    # Filtros ocultos ou período ainda sendo escolhido: vale a janela padrão
+    periodo = periodo_fonte
 
-if 'Data Início' in df.columns and len(periodo) == 2:
-    data_inicio = pd.to_datetime(periodo[0])
-    data_fim = pd.to_datetime(periodo[1])
-    df_filtrado = df_filtrado[
-        (df_filtrado['Data Início'] >= data_inicio) &
-        (df_filtrado['Data Início'] <= data_fim)
-    ]
-
-# Cálculo dos KPIs CORRETOS
-paradas_fechadas = df_filtrado[df_filtrado['Status'] == 'Fechado']
-paradas_abertas = df_filtrado[df_filtrado['Status'] == 'Aberto']
+# Aplicar filtros pelo índice pré-calculado (sem cópia da base)
+selecoes = {
+    'Local': locais_selecionados,
+    'Equipamento': equipamentos_selecionados,
+    'Status': status_selecionados,
+}
+if origem == ORIGEM_FONTE:
+    # Só as linhas e colunas dos filtros saem da fonte; o índice abaixo aplica a seleção exata
+    with perfil.etapa('leitura') as registro:
+        try:
+            df, chave_base = ler_fonte(fonte, selecoes, periodo)
+        except Exception as e:
+            st.error(f"❌ Erro ao consultar a fonte: {e}")
+            st.stop()
+        registro['linhas'] = len(df)
+    if df.empty:
+        st.warning("⚠️ Nenhuma parada na fonte para os filtros selecionados.")
+        st.stop()
+
+with perfil.etapa('filtros') as registro:
+    indice_filtros = get_indice_filtros(chave_base, df)
+    posicoes_filtradas = indice_filtros.filtrar(selecoes, periodo=periodo)
+    df_filtrado = aplicar(df, posicoes_filtradas)
+    registro['linhas'] = len(df_filtrado)
+
+# Impressão digital dos filtros ativos, usada como chave dos gráficos
+impressao = impressao_filtros(chave_base, selecoes, periodo)
+cache_graficos = get_cache_graficos()
+
+# Seções pesadas agendadas em segundo plano logo após o upload/filtro; a página não espera por elas.
+# Só as seções visíveis (caixas de seleção lidas do estado da sessão) são agendadas; as tarefas
+# que esta sessão pediu para filtros anteriores e ainda não começaram são canceladas
+tarefas = get_executor_tarefas()
+chaves_tarefas = []
+
+def agendar(chave, funcao, *args):
+    chaves_tarefas.append(chave)
+    return tarefas.agendar(chave, funcao, *args)
+
+niveis_disponiveis = [nivel for nivel, chaves in NIVEIS.items() if all(c in df_filtrado.columns for c in chaves)]
+if niveis_disponiveis and st.session_state.get('mostrar_kpis_grupo', False):
+    tarefa_kpis_grupo = agendar((impressao, 'kpis_por_grupo'), tabela_kpis, df_filtrado, niveis_disponiveis)
+if 'Causa' in df.columns and st.session_state.get('mostrar_graficos', True):
+    tarefa_indice_causas = agendar((chave_base, 'indice_causas'), IndiceCausas, df['Causa'])
+    tarefa_tipos = agendar((chave_base, 'tipos_manutencao'), get_classificador().classificar, df['Causa'])
+if 'Equipamento' in df.columns and 'Tempo de Parada (h)' in df.columns and st.session_state.get('mostrar_confiabilidade', False):
+    tarefa_confiabilidade = agendar((impressao, 'confiabilidade'), analisar_confiabilidade, df_filtrado)
+tarefas.manter_apenas(st.session_state['id_sessao'], chaves_tarefas)
+
+# Cálculo dos KPIs CORRETOS (fórmulas em paradas/kpis.py)
+with perfil.etapa('kpis', linhas=len(df_filtrado)):
+    kpis = calcular_kpis(df_filtrado)
 
 # Verificar se temos dados suficientes para cálculos
-dados_suficientes = len(paradas_fechadas) > 0 and 'Tempo de Parada (h)' in df_filtrado.columns
+dados_suficientes = kpis['Dados Suficientes']
 
 if dados_suficientes:
-    # MTTR (CORRETO)
-    mttr = paradas_fechadas['Tempo de Parada (h)'].mean()
-
-    # MTBF e Disponibilidade (CORRIGIDOS)
-    if len(paradas_fechadas) > 1:
-        paradas_ordenadas = paradas_fechadas.sort_values('Data Início')
-        
-        # Tempo total do período analisado
-        tempo_total_periodo = (paradas_ordenadas['Data Início'].max() - 
-                              paradas_ordenadas['Data Início'].min()).total_seconds() / 3600
-        
-        # MTBF = Tempo operacional / Número de falhas
-        tempo_operacional = tempo_total_periodo - paradas_fechadas['Tempo de Parada (h)'].sum()
-        mtbf = tempo_operacional / len(paradas_fechadas)
-        
-        # Disponibilidade = Tempo operacional / Tempo total
-        disponibilidade = (tempo_operacional / tempo_total_periodo) * 100
-        
-    elif len(paradas_fechadas) == 1:
-        # Caso com apenas uma parada
-        mtbf = 0
-        disponibilidade = 100
-    else:
-        mtbf = 0
-        disponibilidade = 100
-
-    # Outros cálculos
-    tempo_total_parada = paradas_fechadas['Tempo de Parada (h)'].sum()
-    tempo_operacional_calc = (paradas_ordenadas['Data Início'].max() - paradas_ordenadas['Data Início'].min()).total_seconds() / 3600 - tempo_total_parada if len(paradas_fechadas) > 1 else 0
-    
+    mttr = kpis['MTTR (h)']
+    mtbf = kpis['MTBF (h)']
+    disponibilidade = kpis['Disponibilidade (%)']
+    tempo_total_parada = kpis['Tempo Total Parada (h)']
+    tempo_operacional_calc = kpis['Tempo Operacional (h)']
 else:
     # Valores padrão quando não há dados suficientes
     mttr = 0
@@ -254,8 +474,8 @@ else:
     tempo_operacional_calc = 0
 
 # Total de paradas
-total_paradas = len(df_filtrado)
-paradas_abertas_count = len(paradas_abertas)
+total_paradas = kpis['Total de Paradas']
+paradas_abertas_count = kpis['Paradas Abertas']
 
 # Exibir KPIs
 st.markdown("### 📈 KPIs de Manutenção")
@@ -279,14 +499,75 @@ if dados_suficientes:
         eficiencia_manutencao = (1 - (mttr/mtbf)) * 100 if mtbf > 0 else 0
         st.metric("Eficiência Manutenção", f"{eficiencia_manutencao:.1f}%", "MTTR/MTBF")
     with col7:
-        taxa_falhas = 1/mtbf if mtbf > 0 else 0
+        taxa_falhas = kpis['Taxa de Falhas (1/h)']
         st.metric("Taxa de Falhas", f"{taxa_falhas:.4f}", "Falhas por hora")
     with col8:
-        confiabilidade = np.exp(-tempo_operacional_calc/mtbf) * 100 if mtbf > 0 else 100
+        confiabilidade = kpis['Confiabilidade (%)']
         st.metric("Confiabilidade", f"{confiabilidade:.1f}%", "Probabilidade de operação")
 else:
     st.warning("⚠️ Dados insuficientes para calcular todos os KPIs. Verifique se existe a coluna 'Tempo de Parada (h)' e paradas fechadas.")
 
+# KPIs por equipamento e por local
+show_kpis_grupo = st.checkbox("🏭 Mostrar KPIs por Equipamento e Local", value=False, key='mostrar_kpis_grupo')
+
+if show_kpis_grupo:
+    if niveis_disponiveis:
+        tabela_kpis_grupo = aguardar(tarefa_kpis_grupo, "KPIs por grupo")
+        if tabela_kpis_grupo is not None:
+            nivel_selecionado = st.selectbox("Agrupar por:", niveis_disponiveis)
+            with perfil.etapa('kpis_por_grupo', linhas=len(df_filtrado)):
+                st.dataframe(
+                    tabela_kpis_grupo[tabela_kpis_grupo['Nível'] == nivel_selecionado]
+                    .dropna(axis=1, how='all')
+                    .sort_values('Tempo Total Parada (h)', ascending=False),
+                    hide_index=True,
+                )
+            st.download_button(
+                label="📥 Baixar KPIs por grupo (CSV)",
+                data=lambda: tabela_kpis_grupo.to_csv(index=False, encoding='utf-8'),
+                file_name="kpis_por_grupo.csv",
+                mime="text/csv",
+                on_click="ignore",
+            )
+    else:
+        st.info("ℹ️ As colunas 'Local' e 'Equipamento' são necessárias para os KPIs por grupo.")
+
+# Equipamentos parados ao mesmo tempo em cada local (paradas unidas por equipamento)
+if dados_suficientes and 'Local' in df_filtrado.columns:
+    show_simultaneas = st.checkbox("🔀 Mostrar paradas simultâneas por local", value=False)
+    if show_simultaneas:
+        with perfil.etapa('paradas_simultaneas', linhas=len(df_filtrado)):
+            tabela_simultaneas = cache_graficos.obter(
+                (impressao, 'paradas_simultaneas'), lambda: paradas_simultaneas(df_filtrado)
+            )
+        st.dataframe(tabela_simultaneas, hide_index=True)
+
+# Histórico acumulado: KPIs a partir dos agregados diários de todos os arquivos já incluídos
+show_historico = st.checkbox("📚 Mostrar histórico acumulado de KPIs", value=False)
+
+if show_historico:
+    historico = get_historico()
+    if origem == ORIGEM_FONTE:
+        # Consultas que se sobrepõem contariam as mesmas paradas duas vezes
+        st.caption("ℹ️ Só arquivos enviados podem ser acrescentados ao histórico; resultados de consulta a uma fonte não.")
+    elif chave_base in historico.arquivos():
+        st.write("✅ Este arquivo já está incluído no histórico.")
+    elif st.button("➕ Acrescentar este arquivo ao histórico"):
+        historico.acrescentar(df, chave_base)
+        st.success("✅ Arquivo acrescentado ao histórico.")
+
+    baldes = selecionar(
+        historico.carregar(),
+        locais=locais_selecionados,
+        equipamentos=equipamentos_selecionados,
+        periodo=periodo,
+    )
+    st.write(f"**Arquivos no histórico:** {len(historico.arquivos())} | **Baldes (local, equipamento, dia) selecionados:** {len(baldes)}")
+    st.caption("ℹ️ O histórico segue os filtros de Local, Equipamento e período (dias inteiros); o filtro de Status não se aplica aos agregados.")
+    if len(baldes):
+        st.dataframe(kpis_de_agregados(baldes), hide_index=True)
+        st.dataframe(kpis_de_agregados(baldes, ['Equipamento']), hide_index=True)
+
 # PIRÂMIDE DE BIRD
 st.markdown("---")
 st.markdown("### 🏗️ Pirâmide de Bird - Análise de Segurança")
@@ -328,7 +609,7 @@ fig_piramide.update_layout(
     xaxis_type="log"
 )
 
-st.plotly_chart(fig_piramide, use_container_width=True)
+st.plotly_chart(limitar_figura(fig_piramide), use_container_width=True)
 
 # Análise da pirâmide
 col9, col10 = st.columns(2)
@@ -361,7 +642,7 @@ st.markdown("---")
 st.markdown("### 📊 Análise Detalhada das Paradas")
 
 # Checkbox para mostrar/ocultar gráficos
-show_charts = st.checkbox("📈 Mostrar gráficos de análise", value=True)
+show_charts = st.checkbox("📈 Mostrar gráficos de análise", value=True, key='mostrar_graficos')
 
 if show_charts:
     # Gráficos condicionais baseados nas colunas disponíveis
@@ -372,85 +653,148 @@ if show_charts:
         
         with col11:
             # Paradas por Local
-            paradas_por_local = df_filtrado['Local'].value_counts()
-            fig_local = px.bar(
-                x=paradas_por_local.index,
-                y=paradas_por_local.values,
-                labels={'x': 'Local', 'y': 'Número de Paradas'},
-                title="Paradas por Local",
-                color=paradas_por_local.values,
-                color_continuous_scale='Blues'
-            )
-            st.plotly_chart(fig_local, use_container_width=True)
+            with perfil.etapa('grafico:local', linhas=len(df_filtrado)):
+                fig_local = cache_graficos.obter(
+                    (impressao, 'local'), lambda: figura_paradas_por_local(df_filtrado)
+                )
+                st.plotly_chart(fig_local, use_container_width=True)
+            with st.expander("🔎 Números exatos por local"):
+                st.dataframe(
+                    cache_graficos.obter((impressao, 'detalhamento', 'Local'), lambda: detalhamento(df_filtrado, 'Local')),
+                    hide_index=True,
+                )
 
         with col12:
             if 'Equipamento' in colunas_disponiveis:
                 # Paradas por Equipamento
-                paradas_por_equipamento = df_filtrado['Equipamento'].value_counts()
-                fig_equipamento = px.pie(
-                    values=paradas_por_equipamento.values,
-                    names=paradas_por_equipamento.index,
-                    title="Distribuição de Paradas por Equipamento"
-                )
-                st.plotly_chart(fig_equipamento, use_container_width=True)
+                with perfil.etapa('grafico:equipamento', linhas=len(df_filtrado)):
+                    fig_equipamento = cache_graficos.obter(
+                        (impressao, 'equipamento'), lambda: figura_paradas_por_equipamento(df_filtrado)
+                    )
+                    st.plotly_chart(fig_equipamento, use_container_width=True)
+                with st.expander("🔎 Números exatos por equipamento"):
+                    st.dataframe(
+                        cache_graficos.obter(
+                            (impressao, 'detalhamento', 'Equipamento'), lambda: detalhamento(df_filtrado, 'Equipamento')
+                        ),
+                        hide_index=True,
+                    )
 
     if 'Data Início' in colunas_disponiveis:
         col13, col14 = st.columns(2)
         
         with col13:
-            # Tempo de Parada por Mês
-            df_filtrado['Mês'] = df_filtrado['Data Início'].dt.to_period('M').astype(str)
-            tempo_por_mes = df_filtrado.groupby('Mês')['Tempo de Parada (h)'].sum().reset_index() if 'Tempo de Parada (h)' in colunas_disponiveis else df_filtrado.groupby('Mês').size().reset_index(name='Count')
-            fig_tempo_mes = px.line(
-                tempo_por_mes,
-                x='Mês',
-                y='Tempo de Parada (h)' if 'Tempo de Parada (h)' in colunas_disponiveis else 'Count',
-                title="Tendência de Paradas por Mês",
-                markers=True
-            )
-            st.plotly_chart(fig_tempo_mes, use_container_width=True)
+            # Tempo de parada por período, fatiado do cubo (horas divididas entre os períodos)
+            col_gran, col_det = st.columns(2)
+            with col_gran:
+                granularidade = st.selectbox("Granularidade:", GRANULARIDADES, index=GRANULARIDADES.index('Mês'))
+            with col_det:
+                dimensoes = [d for d in DIMENSOES if d in colunas_disponiveis]
+                detalhar_por = st.selectbox("Detalhar por:", ["Total"] + dimensoes)
+            coluna_y = 'Tempo de Parada (h)' if 'Tempo de Parada (h)' in colunas_disponiveis else 'Paradas'
+            if detalhar_por != "Total" and coluna_y != 'Tempo de Parada (h)':
+                detalhar_por = "Total"
+
+            with perfil.etapa('grafico:tendencia', linhas=len(df_filtrado)):
+                cubo = get_cubo(chave_base, df)
+                serie_tendencia = cache_graficos.obter(
+                    (impressao, 'serie_tendencia', granularidade),
+                    lambda: cubo.serie(posicoes_filtradas, granularidade),
+                )
+                if detalhar_por == "Total":
+                    fig_tendencia = cache_graficos.obter(
+                        (impressao, 'tendencia', granularidade),
+                        lambda: figura_tendencia(serie_tendencia, granularidade, coluna_y),
+                    )
+                else:
+                    fig_tendencia = cache_graficos.obter(
+                        (impressao, 'tendencia', granularidade, detalhar_por),
+                        lambda: figura_tendencia_por_grupo(
+                            cubo.serie_por_grupo(detalhar_por, posicoes_filtradas, granularidade), detalhar_por, granularidade
+                        ),
+                    )
+                st.plotly_chart(fig_tendencia, use_container_width=True)
+            if granularidade == 'Hora':
+                st.caption(f"Série horária limitada aos últimos {LIMITE_DIAS_HORA} dias da seleção.")
+            if coluna_y == 'Tempo de Parada (h)':
+                with st.expander("📅 Disponibilidade por período"):
+                    ativos = cache_graficos.obter((impressao, 'ativos'), lambda: cubo.ativos(posicoes_filtradas))
+                    st.caption(
+                        f"1 - horas paradas (sobreposições unidas) / ({ativos} ativo(s) Local/Equipamento × horas do período)"
+                    )
+                    st.dataframe(serie_tendencia, hide_index=True)
 
         with col14:
             if 'Causa' in colunas_disponiveis:
-                # Tipo de Manutenção
-                def classificar_manutencao(causa):
-                    if pd.isna(causa):
-                        return "Não Especificada"
-                    causa_lower = str(causa).lower()
-                    if any(word in causa_lower for word in ['preventiv', 'lavagem', 'programada', 'manutenção preventiva', 'preventiva']):
-                        return "Preventiva"
-                    else:
-                        return "Corretiva"
-
-                df_filtrado['Tipo Manutenção'] = df_filtrado['Causa'].apply(classificar_manutencao)
-                manutencao_por_tipo = df_filtrado['Tipo Manutenção'].value_counts()
-                fig_tipo = px.pie(
-                    values=manutencao_por_tipo.values,
-                    names=manutencao_por_tipo.index,
-                    title="Distribuição por Tipo de Manutenção"
-                )
-                st.plotly_chart(fig_tipo, use_container_width=True)
+                # Tipo de Manutenção (regras em paradas/classificacao.py), classificado uma vez por base
+                tipos_manutencao = aguardar(tarefa_tipos, "tipos de manutenção")
+                if tipos_manutencao is not None:
+                    with perfil.etapa('grafico:tipo_manutencao', linhas=len(df_filtrado)):
+                        fig_tipo = cache_graficos.obter(
+                            (impressao, 'tipo_manutencao'),
+                            lambda: figura_tipo_manutencao(tipos_manutencao.iloc[posicoes_filtradas]),
+                        )
+                        st.plotly_chart(fig_tipo, use_container_width=True)
 
     # Análise de causas
     if 'Causa' in colunas_disponiveis:
         st.markdown("### 🔍 Análise de Causas")
         
-        causas_texto = ' '.join(df_filtrado['Causa'].dropna().astype(str))
-        palavras_chave = [word for word in causas_texto.lower().split() if len(word) > 4]
-        if palavras_chave:
-            palavras_frequentes = pd.Series(palavras_chave).value_counts().head(10)
-            
-            fig_causas = px.bar(
-                x=palavras_frequentes.values, 
-                y=palavras_frequentes.index,
-                orientation='h',
-                title="Palavras-chave Mais Frequentes nas Causas",
-                labels={'x': 'Frequência', 'y': 'Palavra-chave'},
-                color=palavras_frequentes.values,
-                color_continuous_scale='Reds'
+        tipo_termo = st.radio("Analisar:", ["Palavras", "Pares de palavras"], horizontal=True)
+        usar_bigramas = tipo_termo == "Pares de palavras"
+        indice_causas = aguardar(tarefa_indice_causas, "índice de termos das causas")
+        if indice_causas is not None:
+            with perfil.etapa('causas', linhas=len(df_filtrado)):
+                palavras_frequentes = cache_graficos.obter(
+                    (impressao, 'palavras_chave', usar_bigramas),
+                    lambda: indice_causas.top_termos(posicoes_filtradas, n=10, bigramas=usar_bigramas),
+                )
+        if indice_causas is not None and len(palavras_frequentes):
+            fig_causas = cache_graficos.obter(
+                (impressao, 'fig_palavras_chave', usar_bigramas), lambda: figura_palavras_chave(palavras_frequentes)
             )
             st.plotly_chart(fig_causas, use_container_width=True)
 
+            if 'Equipamento' in colunas_disponiveis:
+                with st.expander("🔧 Termos mais frequentes por equipamento"):
+                    termos_por_equipamento = cache_graficos.obter(
+                        (impressao, 'termos_por_equipamento', usar_bigramas),
+                        lambda: indice_causas.top_termos_por_grupo(
+                            df['Equipamento'], posicoes_filtradas, n=5, bigramas=usar_bigramas
+                        ),
+                    )
+                    st.caption(f"Os {MAX_GRUPOS} equipamentos com mais causas registradas na seleção.")
+                    st.dataframe(termos_por_equipamento, hide_index=True)
+
+# Confiabilidade: tempo entre falhas por equipamento (paradas em aberto são censuradas)
+if 'Equipamento' in df_filtrado.columns and 'Tempo de Parada (h)' in df_filtrado.columns:
+    st.markdown("---")
+    st.markdown("### 🛡️ Confiabilidade por Equipamento (Kaplan-Meier e Weibull)")
+    show_confiabilidade = st.checkbox("📉 Mostrar análise de sobrevivência", value=False, key='mostrar_confiabilidade')
+
+    if show_confiabilidade:
+        resultado_confiabilidade = aguardar(tarefa_confiabilidade, "curvas de sobrevivência")
+        if resultado_confiabilidade is not None:
+            resumo_confiabilidade, curvas_km, curva_frota = resultado_confiabilidade
+            if len(curva_frota):
+                mais_falhas = resumo_confiabilidade['Equipamento'].head(20).tolist()
+                selecionados = st.multiselect(
+                    "Comparar equipamentos (mais falhas primeiro):", mais_falhas, default=mais_falhas[:3]
+                )
+                fig_sobrevivencia = cache_graficos.obter(
+                    (impressao, 'fig_sobrevivencia', tuple(selecionados)),
+                    lambda: figura_sobrevivencia(curva_frota, curvas_km, 'Equipamento', selecionados),
+                )
+                st.plotly_chart(fig_sobrevivencia, use_container_width=True)
+                st.caption(
+                    f"Weibull por máxima verossimilhança com censura (equipamentos com 2+ falhas). "
+                    f"β < 1: falhas prematuras; β ≈ 1: aleatórias; β > 1: desgaste. "
+                    f"R({HORIZONTE_PADRAO_H} h) é a probabilidade de operar {HORIZONTE_PADRAO_H} h sem falha."
+                )
+                st.dataframe(resumo_confiabilidade, hide_index=True)
+            else:
+                st.info("ℹ️ São necessárias ao menos duas paradas de um mesmo equipamento para estimar o tempo entre falhas.")
+
 # Recomendações finais
 st.markdown("---")
 st.markdown("### 🎯 Recomendações Estratégicas")
@@ -478,32 +822,71 @@ for prioridade, itens in recomendacoes.items():
         for item in itens:
             st.write(f"• {item}")
 
-# Tabela com dados detalhados
-st.markdown("---")
-st.markdown("### 📋 Dados Detalhados das Paradas")
-
-# Checkbox para mostrar/ocultar tabela completa
-show_full_table = st.checkbox("📊 Mostrar tabela completa de dados", value=False)
+# Tabela com dados detalhados (fragmento: seus widgets não reexecutam o restante da página)
+@st.fragment
+def secao_dados_detalhados(df_filtrado, posicoes_filtradas, impressao):
+    # Numa reexecução só do fragmento, o perfil da execução completa já foi finalizado
+    perfil_secao = PerfilExecucao(medir_memoria=perfil.medir_memoria) if perfil.finalizado else perfil
+
+    st.markdown("---")
+    st.markdown("### 📋 Dados Detalhados das Paradas")
+
+    # Checkbox para mostrar/ocultar tabela completa
+    show_full_table = st.checkbox("📊 Mostrar tabela completa de dados", value=False)
+
+    if show_full_table:
+        # Ordenação, busca e paginação no servidor: só a página visível é enviada
+        indice_tabela = get_indice_tabela(chave_base, df)
+        colunas = list(df.columns)
+        col_ord, col_dir, col_busca, col_termo = st.columns([3, 2, 3, 3])
+        with col_ord:
+            ordenar_por = st.selectbox("Ordenar por:", ["(ordem original)"] + colunas)
+        with col_dir:
+            crescente = st.radio("Ordem:", ["Crescente", "Decrescente"], horizontal=True) == "Crescente"
+        with col_busca:
+            coluna_busca = st.selectbox("Buscar na coluna:", colunas)
+        with col_termo:
+            termo = st.text_input("Contém:", value="").strip()
+
+        ordenar_por = None if ordenar_por == "(ordem original)" else ordenar_por
+        with perfil_secao.etapa('tabela:consulta', linhas=len(posicoes_filtradas)) as registro:
+            posicoes_tabela = get_cache_tabela().obter(
+                (impressao, 'tabela', ordenar_por, crescente, coluna_busca, termo),
+                lambda: indice_tabela.consultar(posicoes_filtradas, ordenar_por, crescente, coluna_busca, termo),
+            )
+            registro['linhas'] = len(posicoes_tabela)
+
+        col_tam, col_pag = st.columns(2)
+        with col_tam:
+            tamanho_pagina = st.selectbox("Linhas por página:", [50, 100, 250, 500], index=1)
+        paginas = total_paginas(len(posicoes_tabela), tamanho_pagina)
+        with col_pag:
+            pagina = st.number_input("Página:", min_value=1, max_value=paginas, value=1, step=1)
+
+        with perfil_secao.etapa('tabela:pagina', linhas=tamanho_pagina):
+            st.dataframe(indice_tabela.pagina(posicoes_tabela, int(pagina), tamanho_pagina))
+        st.caption(f"Página {int(pagina)} de {paginas} ({len(posicoes_tabela)} registros)")
+    else:
+        st.write(f"**Total de registros filtrados:** {len(df_filtrado)}")
+        st.write("💡 Marque a caixa acima para visualizar a tabela completa")
 
-if show_full_table:
-    st.dataframe(df_filtrado)
-else:
-    st.write(f"**Total de registros filtrados:** {len(df_filtrado)}")
-    st.write("💡 Marque a caixa acima para visualizar a tabela completa")
+    # Download dos dados filtrados: o arquivo só é gerado (em blocos) quando o botão é usado
+    formatos = [f for f in FORMATOS if f != 'xlsx' or len(posicoes_filtradas) <= LIMITE_LINHAS_XLSX]
+    formato = st.selectbox("Formato do download:", formatos, format_func=str.upper)
+    cache_exportacoes = get_cache_exportacoes()
 
-# Download dos dados filtrados
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False, encoding='utf-8')
+    st.download_button(
+        label=f"📥 Baixar dados filtrados ({formato.upper()})",
+        data=lambda: cache_exportacoes.exportar(df, posicoes_filtradas, formato, impressao).read_bytes(),
+        file_name=f"paradas_manutencao_analise.{formato}",
+        mime=FORMATOS[formato],
+        on_click="ignore",
+    )
 
-csv = convert_df_to_csv(df_filtrado)
+    if perfil_secao is not perfil:
+        perfil_secao.finalizar(get_metricas(), chave=chave_base, fragmento='dados_detalhados', linhas_filtradas=len(df_filtrado))
 
-st.download_button(
-    label="📥 Baixar dados filtrados (CSV)",
-    data=csv,
-    file_name="paradas_manutencao_analise.csv",
-    mime="text/csv",
-)
+secao_dados_detalhados(df_filtrado, posicoes_filtradas, impressao)
 
 # Informações finais na sidebar
 st.sidebar.markdown("---")
@@ -523,6 +906,8 @@ st.sidebar.markdown("""
 **Disponibilidade:**
 - Percentual de tempo operacional
 - Fórmula: (Tempo operacional / Tempo total) × 100
+- Tempo total: período observado × nº de equipamentos com paradas
+- Paradas sobrepostas do mesmo equipamento contam uma vez
 - Meta: >95%
 
 **🏗️ Pirâmide de Bird:**
@@ -531,9 +916,34 @@ Relação 1-3-8-20-600 mostra que para cada acidente grave, existem 600 atos ins
 
 st.sidebar.info("""
 **ℹ️ Informações:**
-- Upload de arquivos Excel suportado
+- Upload de arquivos Excel e CSV suportado
 - Colunas obrigatórias: Data Início, Status
 - Colunas recomendadas: Data Fim, Local, Equipamento, Causa
 - KPIs calculados automaticamente
 - Use os toggles para controlar a visualização
-""")
\ No newline at end of file
+""")
+
+# Estatísticas do cache de gráficos
+estatisticas_graficos = cache_graficos.estatisticas()
+st.sidebar.caption(
+    f"📈 Cache de gráficos: {estatisticas_graficos['acertos']} acertos, "
+    f"{estatisticas_graficos['falhas']} falhas, {estatisticas_graficos['entradas']} entradas"
+)
+estatisticas_tarefas = tarefas.estatisticas()
+st.sidebar.caption(
+    f"⚙️ Tarefas em segundo plano: {estatisticas_tarefas['pendentes']} em cálculo, "
+    f"{estatisticas_tarefas['concluidas']} concluídas ({estatisticas_tarefas['bytes'] / 1024**2:.1f} MB)"
+)
+estatisticas_registro = get_registro_bases().estatisticas()
+st.sidebar.caption(
+    f"🗂️ Bases compartilhadas: {estatisticas_registro['bases']} base(s), "
+    f"{estatisticas_registro['sessoes']} sessão(ões), {estatisticas_registro['mapeado_bytes'] / 1024**2:.1f} MB mapeados"
+)
+
+# Painel de performance: tempos desta execução e log/métricas acumuladas
+mostrar_perfil = st.sidebar.checkbox("⏱️ Mostrar painel de performance", value=False, key='mostrar_perfil')
+total_execucao = perfil.finalizar(get_metricas(), chave=chave_base, linhas=len(df), linhas_filtradas=len(df_filtrado))
+if mostrar_perfil:
+    with st.sidebar.expander("⏱️ Performance desta execução", expanded=True):
+        st.dataframe(perfil.tabela(), hide_index=True)
+        st.caption(f"Total da execução: {total_execucao:.3f} s (memória: pico alocado pelo Python em cada etapa)")
@@ -0,0 +1,35 @@
+"""Motor de dados do dashboard de paradas de equipamentos."""
+
+from paradas.agregados import HistoricoAgregados, agregar, combinar, kpis_de_agregados
+from paradas.causas import IndiceCausas
+from paradas.classificacao import ClassificadorManutencao
+from paradas.compactacao import compactar, uso_memoria
+from paradas.confiabilidade import analisar_confiabilidade, ajustar_weibull, kaplan_meier
+from paradas.cubo import CuboParadas
+from paradas.filtros import IndiceFiltros, aplicar
+from paradas.fontes import (
+    FonteDuckDB,
+    FonteMemoria,
+    FonteParquetParticionada,
+    FonteSQLite,
+    abrir_fonte,
+    gravar_particionado,
+)
+from paradas.intervalos import paradas_simultaneas, unir_intervalos
+from paradas.graficos import CacheGraficos, impressao_filtros
+from paradas.ingestao import (
+    CacheParquet,
+    ColunasFaltantesError,
+    carregar_arquivo,
+    gravar_parquet_em_blocos,
+    hash_conteudo,
+    ler_arquivo,
+    ler_em_blocos,
+    normalizar,
+)
+from paradas.kpis import calcular_kpis, kpis_por_grupo, tabela_kpis
+from paradas.perfil import MetricasEtapas, PerfilExecucao
+from paradas.reducao import detalhamento, limitar_figura, lttb, top_n
+from paradas.registro import RegistroBases
+from paradas.tabela import IndiceTabela
+from paradas.tarefas import ExecutorTarefas
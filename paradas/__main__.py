@@ -0,0 +1,5 @@
+import sys
+
+from paradas.lote import main
+
+sys.exit(main())
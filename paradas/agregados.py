@@ -0,0 +1,231 @@
+"""Agregados parciais dos KPIs por (Local, Equipamento, dia).
+
+Cada balde guarda apenas totais combináveis (somas, contagens, primeiro
+início e último fim das paradas fechadas), então dois conjuntos de baldes
+podem ser unidos sem voltar às linhas originais. Os KPIs de qualquer período
+ou seleção de Local/Equipamento saem da combinação dos baldes, com as mesmas
+fórmulas de paradas/kpis.py.
+
+O tempo parado de cada balde já vem das paradas unidas por ativo e divididas
+nos dias que atravessam (como no cubo). A união acontece dentro de cada
+arquivo: uma parada de um delta sobreposta a outra de um delta anterior
+conta as duas vezes.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from paradas.cubo import HORAS_DIA, dividir_intervalos
+from paradas.intervalos import unir_intervalos
+from paradas.kpis import COLUNAS_KPI, colunas_auxiliares, derivar_kpis
+
+CHAVES_BALDE = ['Local', 'Equipamento', 'Dia']
+
+# Como cada coluna do estado parcial é combinada
+COMBINACAO = {
+    'total': 'sum',
+    'abertas': 'sum',
+    'fechadas': 'sum',
+    'soma_tempo': 'sum',
+    'n_tempo': 'sum',
+    'tempo_parado': 'sum',
+    'primeiro_inicio': 'min',
+    'ultimo_fim': 'max',
+}
+
+# Metadado do Parquet com a lista de arquivos já incluídos
+CHAVE_ARQUIVOS = b'paradas.arquivos'
+
+DIRETORIO_HISTORICO_PADRAO = Path(
+    os.environ.get('PARADAS_HISTORICO_DIR', Path.home() / '.local' / 'share' / 'dashboard_paradas')
+)
+
+
+def _vazio():
+    indice = pd.MultiIndex.from_arrays([[], [], pd.DatetimeIndex([])], names=CHAVES_BALDE)
+    return pd.DataFrame({col: pd.Series(dtype='float64') for col in COMBINACAO}, index=indice)
+
+
+def agregar(df):
+    """Estado parcial dos KPIs de ``df`` por (Local, Equipamento, dia).
+
+    Linhas sem 'Data Início' não pertencem a nenhum dia e ficam de fora.
+    """
+    aux = colunas_auxiliares(df)
+    for col in ['Local', 'Equipamento']:
+        aux[col] = df[col].astype('string').fillna('') if col in df.columns else ''
+
+    # Tempo parado sem sobreposições, dividido nos dias de cada ativo
+    ativos = aux['ativo'].to_numpy()
+    ativo, inicio, fim = unir_intervalos(ativos, aux['inicio'].to_numpy(), (aux['inicio'] + aux['tempo']).to_numpy())
+    indice, dia, horas = dividir_intervalos(inicio, fim, HORAS_DIA)
+    linha_do_ativo = np.zeros(ativos.max(initial=-1) + 1, dtype=np.int64)
+    linha_do_ativo[ativos] = np.arange(len(aux))
+    linhas = linha_do_ativo[ativo[indice]]
+    parado = pd.DataFrame({
+        'Local': aux['Local'].to_numpy()[linhas],
+        'Equipamento': aux['Equipamento'].to_numpy()[linhas],
+        'Dia': dia.astype('datetime64[D]').astype('datetime64[ns]'),
+        'tempo_parado': horas,
+    }).groupby(CHAVES_BALDE, sort=True).sum()
+
+    # Os baldes guardam início e fim como datas (formato já gravado no histórico)
+    data_inicio = df['Data Início'].to_numpy(dtype='datetime64[ns]')
+    duracao = pd.to_timedelta(np.fmax(aux['tempo'].to_numpy(), 0), unit='h').to_numpy()
+    aux['inicio'] = np.where(aux['fechada'], data_inicio, np.datetime64('NaT'))
+    aux['fim'] = np.where(aux['fechada'], data_inicio + duracao, np.datetime64('NaT'))
+    aux['Dia'] = df['Data Início'].dt.floor('D')
+    aux['n_tempo'] = aux['tempo'].notna()
+
+    parcial = aux.groupby(CHAVES_BALDE, observed=True, sort=True).agg(
+        total=('fechada', 'size'),
+        abertas=('aberta', 'sum'),
+        fechadas=('fechada', 'sum'),
+        soma_tempo=('tempo', 'sum'),
+        n_tempo=('n_tempo', 'sum'),
+        primeiro_inicio=('inicio', 'min'),
+        ultimo_fim=('fim', 'max'),
+    )
+    # Dias atravessados por uma parada sem nenhum início formam baldes próprios
+    parcial = combinar(parcial.assign(tempo_parado=0.0), parado)
+    return parcial.astype({col: 'float64' for col, funcao in COMBINACAO.items() if funcao == 'sum'})
+
+
+def combinar(*parciais, chaves=CHAVES_BALDE):
+    """Une estados parciais, somando/reduzindo os baldes com as mesmas ``chaves``."""
+    partes = [parcial for parcial in parciais if len(parcial)]
+    if not partes:
+        return _vazio()
+    unidos = pd.concat(partes)
+    return unidos.groupby(level=chaves, sort=True).agg(COMBINACAO)
+
+
+def selecionar(parcial, locais=None, equipamentos=None, periodo=None):
+    """Baldes que atendem aos filtros de Local, Equipamento e período (dias inteiros).
+
+    Os baldes não separam as paradas por Status, então esse filtro não se
+    aplica aos agregados.
+    """
+    mascara = np.ones(len(parcial), dtype=bool)
+    if locais:
+        mascara &= parcial.index.get_level_values('Local').isin([str(v) for v in locais])
+    if equipamentos:
+        mascara &= parcial.index.get_level_values('Equipamento').isin([str(v) for v in equipamentos])
+    if periodo is not None and len(periodo) == 2:
+        dias = parcial.index.get_level_values('Dia')
+        mascara &= (dias >= pd.Timestamp(periodo[0]).floor('D')) & (dias <= pd.Timestamp(periodo[1]).floor('D'))
+    return parcial[mascara]
+
+
+def kpis_de_agregados(parcial, chaves=()):
+    """KPIs a partir dos baldes, gerais (``chaves`` vazio) ou por 'Local'/'Equipamento'.
+
+    Como em paradas/kpis.py, o tempo total é o período vezes o nº de ativos
+    (Local/Equipamento) com paradas fechadas.
+    """
+    chaves = list(chaves)
+    por_ativo = parcial.groupby(level=['Local', 'Equipamento'], sort=True).agg(COMBINACAO)
+    por_ativo['ativos'] = por_ativo['n_tempo'] > 0
+    combinacao = {**COMBINACAO, 'ativos': 'sum'}
+    if chaves:
+        totais = por_ativo.groupby(level=chaves, sort=True).agg(combinacao)
+    else:
+        totais = por_ativo.agg(combinacao).to_frame().T
+
+    periodo_h = (
+        pd.to_datetime(totais['ultimo_fim']) - pd.to_datetime(totais['primeiro_inicio'])
+    ).dt.total_seconds() / 3600
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_tempo = totais['soma_tempo'] / totais['n_tempo']
+
+    tabela = pd.DataFrame(
+        derivar_kpis(totais['fechadas'], totais['tempo_parado'], media_tempo, periodo_h, totais['ativos']),
+        index=totais.index,
+    )
+    tabela['Total de Paradas'] = totais['total'].astype(int)
+    tabela['Paradas Abertas'] = totais['abertas'].astype(int)
+    tabela['Paradas Fechadas'] = totais['fechadas'].astype(int)
+    tabela = tabela[COLUNAS_KPI]
+    return tabela.reset_index() if chaves else tabela.reset_index(drop=True)
+
+
+class HistoricoAgregados:
+    """Estado parcial persistido entre sessões, atualizado com arquivos delta.
+
+    Cada arquivo acrescentado é identificado pelo hash do conteúdo, para que
+    o mesmo delta não seja contado duas vezes. Os deltas devem trazer apenas
+    registros novos: uma parada reenviada com outro status soma de novo.
+
+    A lista de arquivos incluídos é gravada nos metadados do próprio Parquet
+    dos baldes, então uma única troca de arquivo (``os.replace``) publica as
+    duas coisas juntas; uma trava serializa os acréscimos das sessões do
+    processo.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_HISTORICO_PADRAO):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._caminho_baldes = self.diretorio / 'agregados.parquet'
+        # Lista de arquivos de versões anteriores, gravada à parte
+        self._caminho_arquivos = self.diretorio / 'arquivos.json'
+        self._trava = threading.Lock()
+
+    def _arquivos(self, metadados):
+        if CHAVE_ARQUIVOS in (metadados or {}):
+            return set(json.loads(metadados[CHAVE_ARQUIVOS]))
+        try:
+            return set(json.loads(self._caminho_arquivos.read_text()))
+        except FileNotFoundError:
+            return set()
+
+    def _ler(self):
+        """(baldes, arquivos incluídos) de uma mesma versão gravada."""
+        try:
+            tabela = pq.read_table(self._caminho_baldes)
+        except (FileNotFoundError, OSError):
+            return _vazio(), set()
+
+        parcial = tabela.to_pandas()
+        if 'ultimo_fim' not in parcial.columns:
+            # Histórico gravado antes da união das paradas: tempo somado e último início
+            parcial = parcial.rename(columns={'ultimo_inicio': 'ultimo_fim'})
+            parcial['tempo_parado'] = parcial['soma_tempo']
+        parcial = parcial.set_index(CHAVES_BALDE)[list(COMBINACAO)].sort_index()
+        return parcial, self._arquivos(tabela.schema.metadata)
+
+    def carregar(self):
+        return self._ler()[0]
+
+    def arquivos(self):
+        try:
+            # Só o esquema: a lista fica nos metadados do arquivo
+            metadados = pq.read_schema(self._caminho_baldes).metadata
+        except (FileNotFoundError, OSError):
+            return set()
+        return self._arquivos(metadados)
+
+    def acrescentar(self, df, chave):
+        """Soma ``df`` ao histórico; retorna False se o arquivo já foi incluído."""
+        delta = agregar(df)
+        with self._trava:
+            atual, arquivos = self._ler()
+            if chave in arquivos:
+                return False
+
+            # Apenas os baldes tocados pelo delta são recombinados
+            afetados = atual.index.isin(delta.index)
+            atualizado = pd.concat([atual[~afetados], combinar(atual[afetados], delta)]).sort_index()
+
+            tabela = pa.Table.from_pandas(atualizado.reset_index(), preserve_index=False)
+            metadados = {**(tabela.schema.metadata or {}), CHAVE_ARQUIVOS: json.dumps(sorted(arquivos | {chave}))}
+            temporario = self._caminho_baldes.with_suffix('.tmp')
+            pq.write_table(tabela.replace_schema_metadata(metadados), temporario)
+            os.replace(temporario, self._caminho_baldes)
+        return True
@@ -0,0 +1,150 @@
+"""Índice de termos das causas para a análise de palavras-chave.
+
+O texto é tokenizado uma única vez por causa distinta (sem acentos, sem
+stopwords) e guardado como uma matriz esparsa causa -> termo. A contagem de
+termos de um subconjunto de linhas é o número de ocorrências de cada causa
+no subconjunto multiplicado por essa matriz, sem refazer a tokenização.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+STOPWORDS_PT = frozenset("""
+a o as os um uma uns umas de da do das dos em na no nas nos num numa ao aos
+à às pelo pela pelos pelas por para pra com sem sob sobre entre até após ante
+desde e ou mas nem que se não sim já mais menos muito muita muitos muitas
+pouco pouca este esta estes estas esse essa esses essas isto isso aquele
+aquela aquilo seu sua seus suas meu minha foi ser está estava estão era
+há tem tinha ter vez como quando onde qual quais devido durante mesmo
+""".split())
+
+_PALAVRA = re.compile(r'\w+')
+
+# Grupos (ex.: equipamentos) na tabela de termos por grupo
+MAX_GRUPOS = 50
+
+
+def sem_acento(texto):
+    """Remove acentos e cedilhas (ex.: 'manutenção' -> 'manutencao')."""
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class IndiceCausas:
+    """Matrizes causa -> termo (palavras e pares de palavras) alinhadas às linhas da base."""
+
+    def __init__(self, causas, stopwords=STOPWORDS_PT, tamanho_minimo=5):
+        if isinstance(causas.dtype, pd.CategoricalDtype):
+            codigos = causas.cat.codes.to_numpy()
+            distintos = causas.cat.categories
+        else:
+            codigos, distintos = pd.factorize(causas, use_na_sentinel=True)
+        self.codigos = np.asarray(codigos, dtype=np.int64)
+        self.n_causas = len(distintos)
+        # Códigos das colunas de grupo já fatorizadas (a base do índice não muda)
+        self._grupos = {}
+
+        stopwords = {sem_acento(palavra) for palavra in stopwords}
+        vocabulario = {}
+        vocabulario_pares = {}
+        formas = {}
+        linhas, colunas, linhas_pares, colunas_pares = [], [], [], []
+
+        for i, causa in enumerate(distintos):
+            termos = []
+            for palavra in _PALAVRA.findall(str(causa).lower()):
+                termo = sem_acento(palavra)
+                if len(termo) < tamanho_minimo or termo in stopwords or termo.isdigit():
+                    continue
+                termos.append(termo)
+                formas.setdefault(termo, Counter())[palavra] += 1
+            for termo in termos:
+                linhas.append(i)
+                colunas.append(vocabulario.setdefault(termo, len(vocabulario)))
+            for par in zip(termos, termos[1:]):
+                linhas_pares.append(i)
+                colunas_pares.append(vocabulario_pares.setdefault(par, len(vocabulario_pares)))
+
+        # Termos repetidos na mesma causa são somados na construção da matriz
+        self.matriz = sparse.csr_matrix(
+            (np.ones(len(linhas)), (linhas, colunas)), shape=(self.n_causas, len(vocabulario))
+        )
+        self.matriz_pares = sparse.csr_matrix(
+            (np.ones(len(linhas_pares)), (linhas_pares, colunas_pares)),
+            shape=(self.n_causas, len(vocabulario_pares)),
+        )
+
+        # Rótulo exibido: a grafia original mais comum de cada termo
+        rotulo = {termo: contagem.most_common(1)[0][0] for termo, contagem in formas.items()}
+        self.termos = np.array([rotulo[termo] for termo in vocabulario], dtype=object)
+        self.pares = np.array(
+            [f'{rotulo[a]} {rotulo[b]}' for a, b in vocabulario_pares], dtype=object
+        )
+
+    def _matriz(self, bigramas):
+        return (self.matriz_pares, self.pares) if bigramas else (self.matriz, self.termos)
+
+    def ocorrencias_causas(self, posicoes=None):
+        """Quantas vezes cada causa distinta aparece nas linhas ``posicoes``."""
+        codigos = self.codigos if posicoes is None else self.codigos[posicoes]
+        return np.bincount(codigos[codigos >= 0], minlength=self.n_causas)
+
+    def top_termos(self, posicoes=None, n=10, bigramas=False):
+        """Termos mais frequentes nas linhas ``posicoes`` (todas, se None)."""
+        matriz, rotulos = self._matriz(bigramas)
+        contagem = np.asarray(matriz.T @ self.ocorrencias_causas(posicoes)).ravel()
+        if not len(contagem):
+            return pd.Series(dtype='int64')
+        mais_frequentes = np.argsort(-contagem, kind='stable')[:n]
+        mais_frequentes = mais_frequentes[contagem[mais_frequentes] > 0]
+        return pd.Series(contagem[mais_frequentes].astype('int64'), index=rotulos[mais_frequentes])
+
+    def _codigos_grupo(self, grupos):
+        chave = grupos.name
+        if chave not in self._grupos:
+            self._grupos[chave] = pd.factorize(grupos, use_na_sentinel=True)
+        return self._grupos[chave]
+
+    def top_termos_por_grupo(self, grupos, posicoes=None, n=5, bigramas=False, max_grupos=MAX_GRUPOS):
+        """Termos mais frequentes de cada grupo (ex.: 'Equipamento') das linhas ``posicoes``.
+
+        ``grupos`` é uma coluna alinhada às linhas da base indexada; sua
+        fatoração é guardada pelo nome da coluna. Só os ``max_grupos`` grupos
+        com mais causas nas linhas entram na tabela.
+        """
+        matriz, rotulos = self._matriz(bigramas)
+        codigos_grupo, nomes_grupo = self._codigos_grupo(grupos)
+        if posicoes is not None:
+            codigos_grupo = codigos_grupo[posicoes]
+            codigos_causa = self.codigos[posicoes]
+        else:
+            codigos_causa = self.codigos
+        validas = (codigos_grupo >= 0) & (codigos_causa >= 0)
+
+        # Matriz grupo -> causa com o número de ocorrências, depois grupo -> termo
+        grupo_causa = sparse.csr_matrix(
+            (np.ones(validas.sum()), (codigos_grupo[validas], codigos_causa[validas])),
+            shape=(len(nomes_grupo), self.n_causas),
+        )
+        grupo_termo = (grupo_causa @ matriz).tocoo()
+        tabela = pd.DataFrame({
+            'grupo': grupo_termo.row,
+            'termo': grupo_termo.col,
+            'Frequência': grupo_termo.data.astype('int64'),
+        })
+        tabela = tabela[tabela['Frequência'] > 0]
+        ocorrencias = np.asarray(grupo_causa.sum(axis=1)).ravel()
+        principais = np.argsort(-ocorrencias, kind='stable')[:max_grupos]
+        tabela = tabela[np.isin(tabela['grupo'].to_numpy(), principais)]
+        tabela = tabela.sort_values(['grupo', 'Frequência'], ascending=[True, False], kind='stable')
+        tabela = tabela.groupby('grupo', sort=False).head(n)
+        return pd.DataFrame({
+            grupos.name or 'Grupo': np.asarray(nomes_grupo)[tabela['grupo'].to_numpy()],
+            'Termo': rotulos[tabela['termo'].to_numpy()],
+            'Frequência': tabela['Frequência'].to_numpy(),
+        })
@@ -0,0 +1,75 @@
+"""Classificação do tipo de manutenção a partir do texto da 'Causa'.
+
+As regras são avaliadas apenas sobre os valores distintos de 'Causa' e o
+resultado de cada texto fica memorizado, então o custo cresce com o número
+de causas diferentes e não com o número de linhas.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Regras em ordem de prioridade: a primeira que casar define o tipo
+REGRAS_PADRAO = {
+    'Preventiva': ['preventiv', 'lavagem', 'programada', 'manutenção preventiva', 'preventiva'],
+    'Preditiva': ['preditiv', 'termograf', 'análise de vibração', 'análise de óleo'],
+}
+TIPO_PADRAO = 'Corretiva'
+TIPO_SEM_CAUSA = 'Não Especificada'
+
+
+def carregar_regras(caminho):
+    """Lê regras de um JSON no formato ``{"Tipo": ["termo", ...], ...}``."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+class ClassificadorManutencao:
+    """Classifica causas por termos, com memória por texto de causa."""
+
+    def __init__(self, regras=None, tipo_padrao=TIPO_PADRAO, tipo_sem_causa=TIPO_SEM_CAUSA):
+        if regras is None:
+            caminho = os.environ.get('PARADAS_REGRAS_MANUTENCAO')
+            regras = carregar_regras(caminho) if caminho else REGRAS_PADRAO
+        self.regras = [
+            (tipo, re.compile('|'.join(re.escape(termo.lower()) for termo in termos)))
+            for tipo, termos in regras.items()
+            if termos
+        ]
+        self.tipo_padrao = tipo_padrao
+        self.tipo_sem_causa = tipo_sem_causa
+        self.tipos = list(dict.fromkeys([tipo for tipo, _ in self.regras] + [tipo_padrao, tipo_sem_causa]))
+        self._memoria = {}
+
+    def _classificar_textos(self, textos):
+        # Classifica os textos ainda não vistos, de uma vez, regra a regra
+        novos = [texto for texto in dict.fromkeys(textos) if texto not in self._memoria]
+        if novos:
+            minusculos = pd.Series([str(texto) for texto in novos], dtype=object).str.lower()
+            tipos = np.full(len(novos), self.tipo_padrao, dtype=object)
+            pendentes = np.ones(len(novos), dtype=bool)
+            for tipo, padrao in self.regras:
+                casou = pendentes & minusculos.str.contains(padrao, na=False).to_numpy(dtype=bool)
+                tipos[casou] = tipo
+                pendentes &= ~casou
+            self._memoria.update(zip(novos, tipos))
+        return [self._memoria[texto] for texto in textos]
+
+    def classificar(self, causas):
+        """Tipo de manutenção de cada linha de ``causas``, como categórico."""
+        if isinstance(causas.dtype, pd.CategoricalDtype):
+            codigos = causas.cat.codes.to_numpy()
+            distintos = causas.cat.categories
+        else:
+            codigos, distintos = pd.factorize(causas, use_na_sentinel=True)
+
+        # Última posição da tabela representa a causa vazia (código -1)
+        tipos_distintos = self._classificar_textos(list(distintos)) + [self.tipo_sem_causa]
+        posicao_tipo = {tipo: i for i, tipo in enumerate(self.tipos)}
+        tabela = np.array([posicao_tipo[tipo] for tipo in tipos_distintos], dtype=np.int32)
+
+        resultado = pd.Categorical.from_codes(tabela[codigos], categories=self.tipos)
+        return pd.Series(resultado, index=causas.index, name='Tipo Manutenção')
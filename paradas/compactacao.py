@@ -0,0 +1,42 @@
+"""Representação compacta da base em memória."""
+
+import pandas as pd
+
+# Colunas de baixa cardinalidade usadas nos filtros e gráficos
+COLUNAS_CATEGORICAS = ['Local', 'Equipamento', 'Status', 'Causa']
+
+# Demais colunas de texto viram categoria se repetirem bastante os valores
+LIMITE_CARDINALIDADE = 0.5
+
+
+def uso_memoria(df):
+    """Memória ocupada pela base em bytes, incluindo o conteúdo dos textos."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def compactar(df):
+    """Converte textos repetidos em categorias e reduz a precisão numérica.
+
+    - 'Local', 'Equipamento', 'Status' e 'Causa' (e outros textos com
+      poucos valores distintos) viram ``category``; filtros ``isin`` e
+      comparações de igualdade passam a operar sobre os códigos inteiros;
+    - 'Tempo de Parada (h)' vira ``float32`` e inteiros são reduzidos ao
+      menor tipo que comporta os valores;
+    - as datas continuam em ``datetime64``, que já é um epoch int64.
+    """
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(serie):
+            continue
+        if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            if col in COLUNAS_CATEGORICAS or serie.nunique(dropna=True) <= LIMITE_CARDINALIDADE * len(serie):
+                df[col] = serie.astype('category')
+        elif pd.api.types.is_bool_dtype(serie):
+            continue
+        elif pd.api.types.is_integer_dtype(serie):
+            df[col] = pd.to_numeric(serie, downcast='integer')
+
+    if 'Tempo de Parada (h)' in df.columns:
+        df['Tempo de Parada (h)'] = pd.to_numeric(df['Tempo de Parada (h)'], errors='coerce').astype('float32')
+
+    return df
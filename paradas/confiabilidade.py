@@ -0,0 +1,190 @@
+"""Análise de sobrevivência (Kaplan-Meier) e ajuste de Weibull por equipamento.
+
+As observações são os tempos de funcionamento entre paradas de cada ativo
+(Local/Equipamento): do fim da parada anterior ao início da seguinte. O
+tempo que termina numa parada 'Aberto', e o trecho entre a última parada e
+o fim dos dados, são censurados: sabe-se apenas que o ativo funcionou pelo
+menos até ali. Paradas sobrepostas a uma anterior do mesmo ativo não geram
+observação.
+
+Todos os grupos são calculados de uma vez, sem laços por grupo: somas por
+``np.bincount`` e somas acumuladas segmentadas sobre as observações
+ordenadas por (grupo, tempo).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.special import gamma
+
+from paradas.intervalos import codigos_ativo, fim_acumulado_por_ativo, horas_desde_epoca
+
+# Horizonte da confiabilidade R(t) informada no resumo
+HORIZONTE_PADRAO_H = 720
+
+def _soma_segmentada(valores, inicio_segmento):
+    """Soma acumulada que recomeça em cada posição marcada em ``inicio_segmento``."""
+    acumulada = np.cumsum(valores)
+    antes = np.concatenate([[0], acumulada[:-1]])
+    # Posição do início do segmento de cada elemento
+    inicio = np.maximum.accumulate(np.where(inicio_segmento, np.arange(len(valores)), 0))
+    return acumulada - antes[inicio]
+
+
+def tempos_entre_falhas(df):
+    """Tempos de funcionamento (h), marca de falha (False = censurado) e linha de origem de cada observação."""
+    ativo = codigos_ativo(df)
+    inicio = horas_desde_epoca(df['Data Início'])
+    tempo = df['Tempo de Parada (h)'].to_numpy(dtype=float) if 'Tempo de Parada (h)' in df.columns else np.full(len(df), np.nan)
+    fechada = (df['Status'] == 'Fechado').to_numpy()
+    aberta = (df['Status'] == 'Aberto').to_numpy()
+
+    # Só paradas com desfecho conhecido: fechadas com duração ou em aberto
+    validas = np.flatnonzero(~np.isnan(inicio) & ((fechada & ~np.isnan(tempo)) | aberta))
+    if not len(validas):
+        return np.array([]), np.array([], dtype=bool), np.array([], dtype=np.int64)
+    ordem = np.argsort(inicio[validas])
+    ordem = validas[ordem[np.argsort(ativo[validas][ordem], kind='stable')]]
+    ativo, inicio, aberta = ativo[ordem], inicio[ordem], aberta[ordem]
+    fim = np.where(aberta, inicio, inicio + np.fmax(tempo[ordem], 0))
+
+    # Maior fim entre as paradas até aqui do mesmo ativo
+    troca, fim_acumulado = fim_acumulado_por_ativo(ativo, inicio, fim)
+    # Depois de uma parada em aberto o ativo segue parado: nada mais é observado
+    abertas_ate_aqui = _soma_segmentada(aberta.astype(np.int64), troca)
+
+    anterior = np.concatenate([[np.nan], fim_acumulado[:-1]])
+    anterior[troca] = np.nan
+    abertas_antes = abertas_ate_aqui - aberta
+    tempos = inicio - anterior
+    usar = (tempos > 0) & (abertas_antes == 0)
+
+    # Trecho final de cada ativo, até o fim dos dados, censurado
+    ultimo = np.append(troca[1:], True)
+    cauda = fim.max() - fim_acumulado
+    usar_cauda = ultimo & (abertas_ate_aqui == 0) & (cauda > 0)
+    return (
+        np.concatenate([tempos[usar], cauda[usar_cauda]]),
+        np.concatenate([~aberta[usar], np.zeros(usar_cauda.sum(), dtype=bool)]),
+        np.concatenate([ordem[usar], ordem[usar_cauda]]),
+    )
+
+
+def kaplan_meier(grupo, tempo, falha):
+    """Curvas de Kaplan-Meier de todos os grupos de uma vez.
+
+    Retorna um DataFrame com um ponto por (grupo, tempo com falha): em
+    risco, falhas e sobrevivência S(t) logo após o tempo.
+    """
+    colunas = ['grupo', 'Tempo (h)', 'Em Risco', 'Falhas', 'Sobrevivência']
+    if not len(tempo):
+        return pd.DataFrame(columns=colunas)
+
+    ordem = np.lexsort((tempo, grupo))
+    grupo, tempo, falha = grupo[ordem], tempo[ordem], falha[ordem]
+    n = len(tempo)
+
+    # Em risco no tempo t: observações do grupo com tempo >= t
+    novo_grupo = np.empty(n, dtype=bool)
+    novo_grupo[0] = True
+    novo_grupo[1:] = grupo[1:] != grupo[:-1]
+    fim_grupo = np.append(np.flatnonzero(novo_grupo)[1:], n)[np.cumsum(novo_grupo) - 1]
+    em_risco = fim_grupo - np.arange(n)
+
+    # Empates de tempo viram um único ponto (em risco do primeiro, falhas somadas)
+    novo_ponto = novo_grupo.copy()
+    novo_ponto[1:] |= tempo[1:] != tempo[:-1]
+    pontos = np.flatnonzero(novo_ponto)
+    falhas = np.add.reduceat(falha.astype(np.int64), pontos)
+    grupo, tempo, em_risco = grupo[pontos], tempo[pontos], em_risco[pontos]
+    inicio_grupo = novo_grupo[pontos]
+
+    fator = 1 - falhas / em_risco
+    zerou = _soma_segmentada((fator <= 0).astype(np.int64), inicio_grupo) > 0
+    log_s = _soma_segmentada(np.log(np.where(fator > 0, fator, 1)), inicio_grupo)
+    sobrevivencia = np.where(zerou, 0.0, np.exp(log_s))
+
+    curvas = pd.DataFrame({
+        'grupo': grupo, 'Tempo (h)': tempo, 'Em Risco': em_risco, 'Falhas': falhas, 'Sobrevivência': sobrevivencia,
+    })
+    return curvas[falhas > 0].reset_index(drop=True)
+
+
+def ajustar_weibull(grupo, tempo, falha, n_grupos, iteracoes=100, tolerancia=1e-8):
+    """Máxima verossimilhança da Weibull com censura, por Newton em todos os grupos juntos.
+
+    Retorna (forma β, escala η) de cada grupo; NaN para grupos com menos de
+    duas falhas ou sem variação nos tempos.
+    """
+    falha = falha.astype(float)
+    r = np.bincount(grupo, weights=falha, minlength=n_grupos)
+    contagem = np.bincount(grupo, minlength=n_grupos)
+    # Tempos normalizados pela média do grupo, para t^β não estourar
+    escala_grupo = np.bincount(grupo, weights=tempo, minlength=n_grupos) / np.maximum(contagem, 1)
+    x = tempo / escala_grupo[grupo]
+    log_x = np.log(x)
+    media_log_falhas = np.bincount(grupo, weights=falha * log_x, minlength=n_grupos) / np.maximum(r, 1)
+    variacao = np.bincount(grupo, weights=log_x ** 2, minlength=n_grupos) - (
+        np.bincount(grupo, weights=log_x, minlength=n_grupos) ** 2 / np.maximum(contagem, 1)
+    )
+    validos = (r >= 2) & (variacao > 1e-12)
+
+    forma = np.ones(n_grupos)
+    for _ in range(iteracoes):
+        potencia = x ** forma[grupo]
+        a = np.bincount(grupo, weights=potencia, minlength=n_grupos)
+        b = np.bincount(grupo, weights=potencia * log_x, minlength=n_grupos)
+        c = np.bincount(grupo, weights=potencia * log_x ** 2, minlength=n_grupos)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            funcao = b / a - 1 / forma - media_log_falhas
+            derivada = c / a - (b / a) ** 2 + 1 / forma ** 2
+            passo = np.where(validos, funcao / derivada, 0.0)
+        # Passo amortecido: a forma continua positiva
+        nova_forma = np.clip(forma - passo, forma / 2, forma * 2)
+        convergiu = np.nanmax(np.abs(nova_forma - forma), initial=0) < tolerancia
+        forma = nova_forma
+        if convergiu:
+            break
+
+    potencia = x ** forma[grupo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        escala = (np.bincount(grupo, weights=potencia, minlength=n_grupos) / r) ** (1 / forma) * escala_grupo
+    forma = np.where(validos, forma, np.nan)
+    escala = np.where(validos, escala, np.nan)
+    return forma, escala
+
+
+def analisar_confiabilidade(df, coluna='Equipamento', horizonte_h=HORIZONTE_PADRAO_H):
+    """Resumo por ``coluna`` (KM + Weibull), curvas de KM por grupo e a curva da frota inteira."""
+    tempo, falha, linhas = tempos_entre_falhas(df)
+    codigos, categorias = pd.factorize(df[coluna], sort=True)
+    grupo = codigos[linhas]
+    manter = grupo >= 0
+    tempo, falha, grupo = tempo[manter], falha[manter], grupo[manter]
+    n_grupos = len(categorias)
+
+    curvas = kaplan_meier(grupo, tempo, falha)
+    frota = kaplan_meier(np.zeros(len(tempo), dtype=np.int64), tempo, falha).drop(columns='grupo')
+
+    # Mediana: primeiro tempo em que S(t) <= 0.5
+    abaixo = curvas[curvas['Sobrevivência'] <= 0.5].groupby('grupo')['Tempo (h)'].first()
+    mediana = np.full(n_grupos, np.nan)
+    mediana[abaixo.index.to_numpy(dtype=np.int64)] = abaixo.to_numpy()
+
+    forma, escala = ajustar_weibull(grupo, tempo, falha, n_grupos)
+    observacoes = np.bincount(grupo, minlength=n_grupos)
+    falhas = np.bincount(grupo, weights=falha, minlength=n_grupos).astype(int)
+    resumo = pd.DataFrame({
+        coluna: np.asarray(categorias),
+        'Observações': observacoes,
+        'Falhas': falhas,
+        'Censuradas': observacoes - falhas,
+        'Mediana KM (h)': mediana,
+        'Weibull Forma (β)': forma,
+        'Weibull Escala (η, h)': escala,
+        'MTBF Weibull (h)': escala * gamma(1 + 1 / forma),
+        f'R({horizonte_h:g} h) Weibull (%)': np.exp(-(horizonte_h / escala) ** forma) * 100,
+    })
+    resumo = resumo[observacoes > 0].sort_values('Falhas', ascending=False, kind='stable', ignore_index=True)
+
+    curvas.insert(0, coluna, np.asarray(categorias)[curvas.pop('grupo').to_numpy(dtype=np.int64)])
+    return resumo, curvas, frota
@@ -0,0 +1,236 @@
+"""Cubo de tempo de parada por período (hora, dia, semana, mês).
+
+O tempo parado segue a mesma definição dos KPIs (paradas/kpis.py): as
+paradas fechadas de cada ativo (Local/Equipamento) são unidas antes da soma,
+então paradas sobrepostas ou duplicadas contam uma vez. Os intervalos unidos
+são divididos nos dias que atravessam: uma parada que cruza a virada do mês
+conta as horas de cada mês no mês certo. A base inteira é unida e dividida
+uma vez; uma seleção dos filtros é unida de novo a partir das suas linhas, e
+o detalhamento por 'Local' ou 'Equipamento' sai do grupo de cada ativo.
+
+Semanas (de segunda a domingo) e meses são somas exatas dos dias. A
+granularidade horária é dividida sob demanda, nos últimos
+``LIMITE_DIAS_HORA`` dias da seleção.
+"""
+
+import numpy as np
+import pandas as pd
+
+from paradas.intervalos import horas_desde_epoca, unir_intervalos
+from paradas.kpis import colunas_auxiliares
+
+GRANULARIDADES = ['Hora', 'Dia', 'Semana', 'Mês']
+
+DIMENSOES = ['Local', 'Equipamento']
+
+# Janela máxima da série horária (em dias)
+LIMITE_DIAS_HORA = 92
+
+HORAS_DIA = 24
+
+
+def dividir_intervalos(inicio, fim, tamanho):
+    """Divide os intervalos [inicio, fim) (em horas) em baldes de ``tamanho`` horas.
+
+    Retorna (índice do intervalo, balde, horas no balde) de cada pedaço.
+    """
+    primeiro = np.floor(inicio / tamanho).astype(np.int64)
+    ultimo = np.ceil(fim / tamanho).astype(np.int64) - 1
+    pedacos = np.maximum(ultimo - primeiro + 1, 1)
+
+    indice = np.repeat(np.arange(len(inicio)), pedacos)
+    deslocamento = np.arange(len(indice)) - np.repeat(np.cumsum(pedacos) - pedacos, pedacos)
+    balde = primeiro[indice] + deslocamento
+    horas = np.minimum(fim[indice], (balde + 1) * tamanho) - np.maximum(inicio[indice], balde * tamanho)
+    return indice, balde, horas
+
+
+def _rotulos(baldes, granularidade):
+    if granularidade == 'Hora':
+        return baldes.astype('datetime64[h]').astype('datetime64[us]')
+    if granularidade == 'Dia':
+        return baldes.astype('datetime64[D]').astype('datetime64[us]')
+    if granularidade == 'Semana':
+        return (baldes * 7 - 3).astype('datetime64[D]').astype('datetime64[us]')
+    return baldes.astype('datetime64[M]').astype('datetime64[us]')
+
+
+def _horas_balde(baldes, granularidade):
+    if granularidade == 'Hora':
+        return np.ones(len(baldes))
+    if granularidade == 'Dia':
+        return np.full(len(baldes), float(HORAS_DIA))
+    if granularidade == 'Semana':
+        return np.full(len(baldes), 7.0 * HORAS_DIA)
+    meses = baldes.astype('datetime64[M]')
+    return ((meses + 1).astype('datetime64[D]') - meses.astype('datetime64[D]')).astype(float) * HORAS_DIA
+
+
+def _dia_para_balde(dias, granularidade):
+    if granularidade == 'Dia':
+        return dias
+    if granularidade == 'Semana':
+        # 01/01/1970 foi uma quinta-feira: +3 alinha as semanas na segunda
+        return (dias + 3) // 7
+    return dias.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+class CuboParadas:
+    """Células (ativo, dia, início, fim) do tempo parado unido por ativo, mais os inícios de cada linha."""
+
+    def __init__(self, df):
+        self.n_linhas = len(df)
+        inicio = horas_desde_epoca(df['Data Início'])
+        self._inicio = inicio
+        self._dia_inicio = np.floor(inicio / HORAS_DIA)
+        self._linhas_com_inicio = np.flatnonzero(~np.isnan(inicio))
+
+        # Paradas fechadas, com o ativo de cada linha (as mesmas dos KPIs)
+        aux = colunas_auxiliares(df)
+        self._ativo = aux['ativo'].to_numpy()
+        self._inicio_parada = aux['inicio'].to_numpy()
+        self._fim_parada = self._inicio_parada + aux['tempo'].to_numpy()
+        self._linhas_paradas = np.flatnonzero(~np.isnan(self._fim_parada))
+
+        self.codigos = {}
+        self.categorias = {}
+        self._grupo_ativo = {}
+        for coluna in DIMENSOES:
+            if coluna in df.columns:
+                codigos, categorias = pd.factorize(df[coluna], sort=True)
+                self.codigos[coluna] = codigos
+                self.categorias[coluna] = categorias
+                # Cada ativo pertence a um único Local e a um único Equipamento
+                grupo = np.full(self._ativo.max(initial=-1) + 1, -1, dtype=np.int64)
+                grupo[self._ativo] = codigos
+                self._grupo_ativo[coluna] = grupo
+
+        self._base = self._unir(None)
+
+    def _selecao(self, posicoes):
+        if posicoes is None or len(posicoes) == self.n_linhas:
+            return None
+        selecionadas = np.zeros(self.n_linhas, dtype=bool)
+        selecionadas[posicoes] = True
+        return selecionadas
+
+    def _unir(self, selecionadas):
+        """Intervalos unidos por ativo das linhas selecionadas, divididos por dia."""
+        linhas = self._linhas_paradas
+        if selecionadas is not None:
+            linhas = linhas[selecionadas[linhas]]
+        ativo, inicio, fim = unir_intervalos(self._ativo[linhas], self._inicio_parada[linhas], self._fim_parada[linhas])
+        indice, dia, _ = dividir_intervalos(inicio, fim, HORAS_DIA)
+        return (
+            ativo[indice],
+            dia,
+            np.maximum(inicio[indice], dia * HORAS_DIA),
+            np.minimum(fim[indice], (dia + 1) * HORAS_DIA),
+        )
+
+    def _unidas(self, selecionadas):
+        return self._base if selecionadas is None else self._unir(selecionadas)
+
+    def _celulas(self, unidas, granularidade, primeiro_dia=None):
+        """Ativo, balde e horas paradas das células unidas na granularidade pedida."""
+        ativo, dia, inicio, fim = unidas
+        if primeiro_dia is not None:
+            manter = dia >= primeiro_dia
+            ativo, dia, inicio, fim = ativo[manter], dia[manter], inicio[manter], fim[manter]
+        if granularidade != 'Hora':
+            return ativo, _dia_para_balde(dia, granularidade), fim - inicio
+
+        # Série horária: divide as células de cada dia em horas
+        indice, hora, horas = dividir_intervalos(inicio, fim, 1)
+        return ativo[indice], hora, horas
+
+    @staticmethod
+    def _contar_ativos(unidas):
+        ativo = unidas[0]
+        # Células ordenadas por ativo: cada troca é um ativo novo
+        return len(np.flatnonzero(np.diff(ativo))) + 1 if len(ativo) else 0
+
+    def ativos(self, posicoes=None):
+        """Nº de ativos (Local/Equipamento) com paradas fechadas na seleção, como nos KPIs."""
+        return self._contar_ativos(self._unidas(self._selecao(posicoes)))
+
+    def _linhas(self, selecionadas):
+        linhas = self._linhas_com_inicio
+        return linhas if selecionadas is None else linhas[selecionadas[linhas]]
+
+    def _janela_horaria(self, selecionadas, unidas):
+        """Primeiro dia da série horária: os últimos ``LIMITE_DIAS_HORA`` dias da seleção."""
+        ultimo = self._dia_inicio[self._linhas(selecionadas)].max(initial=-np.inf)
+        if len(unidas[1]):
+            ultimo = max(ultimo, unidas[1].max())
+        return None if ultimo == -np.inf else int(ultimo) - LIMITE_DIAS_HORA + 1
+
+    def _contagem(self, selecionadas, granularidade, primeiro_dia=None):
+        """Nº de paradas por balde do dia de início."""
+        linhas = self._linhas(selecionadas)
+        if primeiro_dia is not None:
+            linhas = linhas[self._dia_inicio[linhas] >= primeiro_dia]
+        if granularidade == 'Hora':
+            return np.floor(self._inicio[linhas]).astype(np.int64)
+        return _dia_para_balde(self._dia_inicio[linhas].astype(np.int64), granularidade)
+
+    def serie(self, posicoes=None, granularidade='Mês'):
+        """Tempo de parada, nº de paradas e disponibilidade por período.
+
+        A disponibilidade de cada período é 1 - horas paradas / (nº de ativos
+        com paradas na seleção × horas do período); períodos sem paradas
+        aparecem com zero.
+        """
+        selecionadas = self._selecao(posicoes)
+        unidas = self._unidas(selecionadas)
+        primeiro_dia = self._janela_horaria(selecionadas, unidas) if granularidade == 'Hora' else None
+        _, baldes, horas = self._celulas(unidas, granularidade, primeiro_dia)
+        inicios = self._contagem(selecionadas, granularidade, primeiro_dia)
+        if not len(baldes) and not len(inicios):
+            return pd.DataFrame(columns=['Período', 'Tempo de Parada (h)', 'Paradas', 'Disponibilidade (%)'])
+
+        primeiro = min(valores.min() for valores in (baldes, inicios) if len(valores))
+        ultimo = max(valores.max() for valores in (baldes, inicios) if len(valores))
+        tamanho = int(ultimo - primeiro + 1)
+        todos = np.arange(primeiro, ultimo + 1)
+        tempo = np.bincount(baldes - primeiro, weights=horas, minlength=tamanho)
+        paradas = np.bincount(inicios - primeiro, minlength=tamanho)
+        capacidade = max(self._contar_ativos(unidas), 1) * _horas_balde(todos, granularidade)
+        return pd.DataFrame({
+            'Período': _rotulos(todos, granularidade),
+            'Tempo de Parada (h)': tempo,
+            'Paradas': paradas,
+            'Disponibilidade (%)': (1 - tempo / capacidade) * 100,
+        })
+
+    def serie_por_grupo(self, coluna, posicoes=None, granularidade='Mês', n=10):
+        """Tempo de parada por período dos ``n`` grupos de ``coluna`` com mais horas paradas."""
+        selecionadas = self._selecao(posicoes)
+        unidas = self._unidas(selecionadas)
+        primeiro_dia = self._janela_horaria(selecionadas, unidas) if granularidade == 'Hora' else None
+        ativo, baldes, horas = self._celulas(unidas, granularidade, primeiro_dia)
+        codigos = self._grupo_ativo[coluna][ativo]
+        validos = codigos >= 0
+        codigos, baldes, horas = codigos[validos], baldes[validos], horas[validos]
+        if not len(baldes):
+            return pd.DataFrame(columns=['Período', coluna, 'Tempo de Parada (h)'])
+
+        n_grupos = len(self.categorias[coluna])
+        totais = np.bincount(codigos, weights=horas, minlength=n_grupos)
+        principais = np.argsort(-totais, kind='stable')[:n]
+        principais = principais[totais[principais] != 0]
+        posicao_grupo = np.full(n_grupos, -1)
+        posicao_grupo[principais] = np.arange(len(principais))
+
+        grupo = posicao_grupo[codigos]
+        manter = grupo >= 0
+        primeiro, ultimo = baldes.min(), baldes.max()
+        tamanho = int(ultimo - primeiro + 1)
+        tempo = np.bincount(
+            grupo[manter] * tamanho + (baldes[manter] - primeiro), weights=horas[manter], minlength=len(principais) * tamanho
+        ).reshape(len(principais), tamanho)
+        return pd.DataFrame({
+            'Período': np.tile(_rotulos(np.arange(primeiro, ultimo + 1), granularidade), len(principais)),
+            coluna: np.repeat(np.asarray(self.categorias[coluna])[principais], tamanho),
+            'Tempo de Parada (h)': tempo.ravel(),
+        })
@@ -0,0 +1,121 @@
+"""Exportação das linhas filtradas em CSV, Parquet ou XLSX, bloco a bloco.
+
+Os arquivos são escritos em disco a partir das posições filtradas, sem
+montar o conteúdo inteiro em memória, e ficam em um cache LRU chaveado
+pela impressão digital dos filtros.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import openpyxl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from paradas.ingestao import DIRETORIO_CACHE_PADRAO, LIMITE_CACHE_PADRAO_MB, limpar_lru
+
+TAMANHO_BLOCO_EXPORTACAO = 100_000
+
+# Limite de linhas de uma planilha do Excel (uma linha fica para o cabeçalho)
+LIMITE_LINHAS_XLSX = 1_048_576 - 1
+
+FORMATOS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _blocos(df, posicoes, tamanho_bloco):
+    for inicio in range(0, len(posicoes), tamanho_bloco):
+        yield df.iloc[posicoes[inicio:inicio + tamanho_bloco]]
+
+
+def escrever_csv(df, posicoes, destino, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    with open(destino, 'w', encoding='utf-8', newline='') as arquivo:
+        if not len(posicoes):
+            df.iloc[:0].to_csv(arquivo, index=False)
+        for i, bloco in enumerate(_blocos(df, posicoes, tamanho_bloco)):
+            bloco.to_csv(arquivo, index=False, header=i == 0)
+
+
+def escrever_parquet(df, posicoes, destino, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    esquema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for bloco in _blocos(df, posicoes, tamanho_bloco):
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+
+
+def escrever_xlsx(df, posicoes, destino, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    if len(posicoes) > LIMITE_LINHAS_XLSX:
+        raise ValueError(
+            f'O Excel suporta até {LIMITE_LINHAS_XLSX} linhas; use CSV ou Parquet para {len(posicoes)} registros.'
+        )
+    # Modo write_only do openpyxl grava as linhas sem manter a planilha em memória
+    wb = openpyxl.Workbook(write_only=True)
+    planilha = wb.create_sheet('Paradas')
+    planilha.append([str(col) for col in df.columns])
+    for bloco in _blocos(df, posicoes, tamanho_bloco):
+        valores = bloco.astype(object).where(bloco.notna(), None)
+        for linha in valores.itertuples(index=False, name=None):
+            planilha.append(linha)
+    wb.save(destino)
+
+
+ESCRITORES = {
+    'csv': escrever_csv,
+    'parquet': escrever_parquet,
+    'xlsx': escrever_xlsx,
+}
+
+
+class CacheExportacoes:
+    """Arquivos exportados em disco, reaproveitados enquanto os filtros não mudam."""
+
+    def __init__(self, diretorio=DIRETORIO_CACHE_PADRAO / 'exportacoes', limite_bytes=LIMITE_CACHE_PADRAO_MB * 1024 * 1024):
+        self.diretorio = Path(diretorio)
+        self.limite_bytes = limite_bytes
+        # Arquivos em geração ficam numa subpasta, fora da limpeza LRU
+        self._temporarios = self.diretorio / 'tmp'
+        self._temporarios.mkdir(parents=True, exist_ok=True)
+        self._travas_geracao = {}
+        self._trava = threading.Lock()
+
+    def _pronto(self, caminho):
+        try:
+            # Marcar como usado recentemente
+            os.utime(caminho)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def exportar(self, df, posicoes, formato, impressao):
+        """Caminho do arquivo exportado para ``impressao``, gerando-o se necessário.
+
+        Arquivos já gerados saem sem trava; a geração trava só o próprio
+        arquivo, então uma exportação grande não segura as das outras sessões.
+        """
+        caminho = self.diretorio / f'{impressao}.{formato}'
+        if self._pronto(caminho):
+            return caminho
+
+        with self._trava:
+            trava_geracao = self._travas_geracao.setdefault(caminho, threading.Lock())
+        with trava_geracao:
+            # Outra sessão pode ter gerado o mesmo arquivo enquanto esta esperava
+            if self._pronto(caminho):
+                return caminho
+            temporario = self._temporarios / caminho.name
+            try:
+                ESCRITORES[formato](df, posicoes, temporario)
+                os.replace(temporario, caminho)
+            except BaseException:
+                temporario.unlink(missing_ok=True)
+                raise
+            finally:
+                # Só depois do replace: quem chegar sem esta trava já encontra o arquivo
+                with self._trava:
+                    self._travas_geracao.pop(caminho, None)
+        limpar_lru(self.diretorio, '*.*', self.limite_bytes)
+        return caminho
@@ -0,0 +1,96 @@
+"""Índice de filtros construído uma vez por base.
+
+As colunas categóricas são guardadas como códigos inteiros e a coluna de
+data como uma ordenação pré-calculada, de forma que uma seleção da sidebar
+vira um AND de máscaras por código e uma busca binária no período.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_FILTRO = ['Local', 'Equipamento', 'Status']
+
+
+class IndiceFiltros:
+    """Resolve as seleções da sidebar em posições de linhas da base."""
+
+    def __init__(self, df, colunas=COLUNAS_FILTRO, coluna_data='Data Início'):
+        self.n_linhas = len(df)
+        self.codigos = {}
+        self.categorias = {}
+        for col in colunas:
+            if col not in df.columns:
+                continue
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                codigos = df[col].cat.codes.to_numpy()
+                categorias = df[col].cat.categories
+            else:
+                codigos, categorias = pd.factorize(df[col], use_na_sentinel=True)
+            # Código -1 (vazio) passa a ser o último slot da tabela de consulta
+            self.codigos[col] = np.where(codigos < 0, len(categorias), codigos).astype(np.int32)
+            self.categorias[col] = pd.Index(categorias)
+
+        self.coluna_data = coluna_data if coluna_data in df.columns else None
+        if self.coluna_data is not None:
+            datas = df[coluna_data].to_numpy(dtype='datetime64[ns]')
+            validas = ~np.isnat(datas)
+            # NaT nunca entra num período: fica fora da parte ordenada
+            self.ordem_datas = np.flatnonzero(validas)[np.argsort(datas[validas], kind='stable')]
+            self.datas_ordenadas = datas[self.ordem_datas]
+
+    def mascara_categoria(self, col, valores):
+        """Máscara das linhas cujo valor em ``col`` está em ``valores``.
+
+        Equivale ao OR dos bitmaps de cada valor selecionado, calculado como
+        uma consulta aos códigos. Retorna None quando a seleção não restringe
+        nada (vazia ou com todos os valores).
+        """
+        if col not in self.codigos or not len(valores):
+            return None
+        categorias = self.categorias[col]
+        valores = list(valores)
+        inclui_vazio = any(pd.isna(v) for v in valores)
+        posicoes = categorias.get_indexer([v for v in valores if not pd.isna(v)])
+
+        permitido = np.zeros(len(categorias) + 1, dtype=bool)
+        permitido[posicoes[posicoes >= 0]] = True
+        permitido[-1] = inclui_vazio
+        if permitido.all():
+            return None
+        return permitido[self.codigos[col]]
+
+    def intervalo_datas(self, inicio, fim):
+        """Posições (na ordem das datas) com ``inicio <= data <= fim``."""
+        inicio = np.datetime64(pd.Timestamp(inicio), 'ns')
+        fim = np.datetime64(pd.Timestamp(fim), 'ns')
+        lo = np.searchsorted(self.datas_ordenadas, inicio, side='left')
+        hi = np.searchsorted(self.datas_ordenadas, fim, side='right')
+        return self.ordem_datas[lo:hi]
+
+    def filtrar(self, selecoes, periodo=None):
+        """Posições das linhas que atendem a todas as seleções, na ordem original.
+
+        ``selecoes`` mapeia coluna -> valores selecionados; ``periodo`` é um
+        par (início, fim) aplicado sobre a coluna de data.
+        """
+        mascara = None
+        for col, valores in selecoes.items():
+            parcial = self.mascara_categoria(col, valores)
+            if parcial is not None:
+                mascara = parcial if mascara is None else mascara & parcial
+
+        if self.coluna_data is not None and periodo is not None and len(periodo) == 2:
+            no_periodo = np.zeros(self.n_linhas, dtype=bool)
+            no_periodo[self.intervalo_datas(*periodo)] = True
+            mascara = no_periodo if mascara is None else mascara & no_periodo
+
+        if mascara is None:
+            return np.arange(self.n_linhas)
+        return np.flatnonzero(mascara)
+
+
+def aplicar(df, posicoes):
+    """Seleciona as linhas filtradas; sem filtro efetivo devolve a própria base."""
+    if len(posicoes) == len(df):
+        return df
+    return df.iloc[posicoes]
@@ -0,0 +1,468 @@
+"""Fontes de dados com os filtros da sidebar empurrados para a leitura.
+
+- ``FonteMemoria``: a base enviada por upload, já inteira em memória;
+- ``FonteSQLite``/``FonteDuckDB``: uma tabela de um arquivo de banco local;
+- ``FonteParquetParticionada``: um diretório Parquet particionado no estilo
+  Hive por ``Local=<valor>/mes=<AAAA-MM>`` (ver ``gravar_particionado``).
+
+As fontes externas respondem ao catálogo da sidebar (colunas, valores
+distintos, intervalo de datas) sem ler a base inteira, e ``ler`` traz só
+as linhas que atendem às seleções de Local/Equipamento/Status e ao período,
+com as colunas usadas pelo dashboard. O filtro empurrado pode trazer
+linhas a mais, nunca a menos: o ``IndiceFiltros`` continua aplicando a
+seleção exata sobre o resultado.
+"""
+
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from paradas.filtros import COLUNAS_FILTRO
+from paradas.ingestao import COLUNAS_DATA, COLUNAS_OBRIGATORIAS, ColunasFaltantesError, hash_conteudo, normalizar
+
+# Colunas lidas das fontes externas (as demais nunca saem do disco)
+COLUNAS_DASHBOARD = ['Data Início', 'Data Fim', 'Tempo de Parada (h)', 'Local', 'Equipamento', 'Causa', 'Status']
+
+TABELA_PADRAO = 'paradas'
+
+# Janela lida das fontes externas quando o usuário não pede outra (dias até a data mais recente)
+PERIODO_INICIAL_DIAS = 365
+
+# Máximo de valores distintos por coluna no catálogo da sidebar
+LIMITE_CATALOGO = 5000
+
+EXTENSOES_SQLITE = ('.sqlite', '.sqlite3', '.db')
+EXTENSOES_DUCKDB = ('.duckdb', '.ddb')
+
+# Partição de mês dos diretórios Parquet
+COLUNA_MES = 'mes'
+
+# Valores distintos gravados junto com as partições (ignorados pelo pyarrow, que pula nomes com '_')
+PREFIXO_CATALOGO = '_catalogo-'
+
+PARTICIONAMENTO = ds.partitioning(pa.schema([('Local', pa.string()), (COLUNA_MES, pa.string())]), flavor='hive')
+
+
+def _limites_periodo(periodo):
+    """(início, fim exclusivo) do período, alargado para dias inteiros; None sem período."""
+    if periodo is None or len(periodo) != 2:
+        return None
+    inicio = pd.Timestamp(periodo[0]).normalize()
+    fim = pd.Timestamp(periodo[1]).normalize() + pd.Timedelta(days=1)
+    return inicio, fim
+
+
+def assinatura_fonte(caminho):
+    """Impressão digital da fonte pelo tamanho e data de modificação dos arquivos."""
+    caminho = Path(caminho)
+    arquivos = sorted(caminho.rglob('*.parquet')) if caminho.is_dir() else [caminho]
+    partes = [str(caminho.resolve())]
+    for arquivo in arquivos:
+        info = arquivo.stat()
+        partes.append(f'{arquivo.relative_to(caminho) if caminho.is_dir() else arquivo.name}:{info.st_size}:{info.st_mtime_ns}')
+    return hash_conteudo('\x1e'.join(partes).encode('utf-8'))
+
+
+class FonteDados(ABC):
+    """Catálogo da sidebar e leitura filtrada de uma fonte."""
+
+    descricao = ''
+
+    def __init__(self):
+        self._distintos = {}
+        self._incompletos = set()
+
+    @property
+    @abstractmethod
+    def colunas(self):
+        """Colunas disponíveis na fonte."""
+
+    @abstractmethod
+    def _valores_distintos(self, coluna, limite):
+        """Valores distintos de ``coluna``, em qualquer ordem; basta trazer até ``limite + 1``."""
+
+    @abstractmethod
+    def intervalo_datas(self):
+        """(menor, maior) 'Data Início' da fonte."""
+
+    @abstractmethod
+    def ler(self, selecoes=None, periodo=None):
+        """Base normalizada com as linhas das ``selecoes`` e do ``periodo``."""
+
+    def valores_distintos(self, coluna):
+        """Valores de ``coluna`` para as opções da sidebar (vazio por último).
+
+        Acima de ``LIMITE_CATALOGO`` valores, a lista é cortada e a coluna
+        fica marcada como incompleta (ver ``catalogo_completo``).
+        """
+        if coluna not in self._distintos:
+            valores = list(self._valores_distintos(coluna, LIMITE_CATALOGO))
+            preenchidos = sorted((valor for valor in valores if not pd.isna(valor)), key=str)
+            vazio = [None] if len(preenchidos) < len(valores) else []
+            if len(valores) > LIMITE_CATALOGO:
+                self._incompletos.add(coluna)
+                preenchidos = preenchidos[:LIMITE_CATALOGO]
+            self._distintos[coluna] = preenchidos + vazio
+        return self._distintos[coluna]
+
+    def catalogo_completo(self, coluna):
+        """Se ``valores_distintos(coluna)`` traz todos os valores da fonte."""
+        self.valores_distintos(coluna)
+        return coluna not in self._incompletos
+
+    def periodo_padrao(self, dias=PERIODO_INICIAL_DIAS):
+        """(início, fim) em datas: os últimos ``dias`` da fonte, ou o intervalo inteiro com ``dias=None``."""
+        menor, maior = self.intervalo_datas()
+        if pd.isna(menor) or pd.isna(maior):
+            return ()
+        if dias is not None:
+            menor = max(menor, maior - pd.Timedelta(days=dias))
+        return menor.date(), maior.date()
+
+    def restricoes(self, selecoes):
+        """{coluna: (valores, inclui_vazio)} das seleções que de fato restringem.
+
+        Como no ``IndiceFiltros``, seleção vazia ou com todos os valores não
+        filtra nada; com o catálogo incompleto, toda seleção não vazia filtra.
+        """
+        resultado = {}
+        for coluna, valores in (selecoes or {}).items():
+            if coluna not in COLUNAS_FILTRO or coluna not in self.colunas or not len(valores):
+                continue
+            valores = list(valores)
+            preenchidos = sorted({valor for valor in valores if not pd.isna(valor)}, key=str)
+            inclui_vazio = len(preenchidos) < len(valores)
+            catalogo = self.valores_distintos(coluna)
+            if self.catalogo_completo(coluna) and set(preenchidos) >= {
+                valor for valor in catalogo if valor is not None
+            } and (inclui_vazio or None not in catalogo):
+                continue
+            resultado[coluna] = (preenchidos, inclui_vazio)
+        return resultado
+
+    def chave(self, selecoes=None, periodo=None):
+        """Chave do resultado de ``ler``: mesma fonte e mesmos filtros efetivos."""
+        partes = [self.assinatura, repr(sorted(self.restricoes(selecoes).items())), repr(_limites_periodo(periodo))]
+        return hash_conteudo('\x1e'.join(partes).encode('utf-8'))
+
+    def _colunas_lidas(self):
+        return [coluna for coluna in COLUNAS_DASHBOARD if coluna in self.colunas]
+
+
+class FonteMemoria(FonteDados):
+    """Base já carregada (upload): o catálogo vem dela e a filtragem fica com o ``IndiceFiltros``."""
+
+    descricao = 'Arquivo enviado'
+
+    def __init__(self, df):
+        super().__init__()
+        self.df = df
+
+    @property
+    def colunas(self):
+        return list(self.df.columns)
+
+    def _valores_distintos(self, coluna, limite=None):
+        return self.df[coluna].unique()
+
+    def valores_distintos(self, coluna):
+        # Mesma ordem de sempre na sidebar: a de aparição na base
+        return list(self._valores_distintos(coluna))
+
+    def intervalo_datas(self):
+        return self.df['Data Início'].min(), self.df['Data Início'].max()
+
+    def ler(self, selecoes=None, periodo=None):
+        return self.df
+
+
+def _citar(nome):
+    return '"' + str(nome).replace('"', '""') + '"'
+
+
+class FonteSQL(FonteDados):
+    """Tabela de um banco local, com os filtros traduzidos para um WHERE parametrizado."""
+
+    def __init__(self, caminho, tabela=TABELA_PADRAO):
+        super().__init__()
+        self.caminho = Path(caminho)
+        self.tabela = tabela
+        self.assinatura = hash_conteudo(f'{assinatura_fonte(caminho)}:{tabela}'.encode('utf-8'))
+        self.descricao = f'{self.caminho.name} ({tabela})'
+        self._colunas = list(self._consultar(f'SELECT * FROM {_citar(tabela)} LIMIT 0', []).columns)
+
+    @abstractmethod
+    def _conectar(self):
+        """Conexão DB-API somente leitura ao arquivo."""
+
+    @abstractmethod
+    def _consultar(self, sql, parametros):
+        """Resultado de ``sql`` (parâmetros ``?``) como DataFrame."""
+
+    def _parametro_data(self, data):
+        return data.to_pydatetime()
+
+    @property
+    def colunas(self):
+        return self._colunas
+
+    def _valores_distintos(self, coluna, limite):
+        # O banco deduplica; só até limite + 1 valores saem dele
+        sql = f'SELECT DISTINCT {_citar(coluna)} FROM {_citar(self.tabela)} LIMIT {int(limite) + 1}'
+        return self._consultar(sql, [])[coluna]
+
+    def intervalo_datas(self):
+        coluna = _citar('Data Início')
+        limites = self._consultar(f'SELECT MIN({coluna}) AS menor, MAX({coluna}) AS maior FROM {_citar(self.tabela)}', [])
+        return (
+            pd.to_datetime(limites['menor'].iloc[0], errors='coerce'),
+            pd.to_datetime(limites['maior'].iloc[0], errors='coerce'),
+        )
+
+    def where(self, selecoes=None, periodo=None):
+        """Cláusula WHERE e parâmetros das seleções e do período."""
+        condicoes, parametros = [], []
+        for coluna, (valores, inclui_vazio) in self.restricoes(selecoes).items():
+            alternativas = []
+            if valores:
+                alternativas.append(f'{_citar(coluna)} IN ({", ".join("?" * len(valores))})')
+                parametros.extend(valores)
+            if inclui_vazio:
+                alternativas.append(f'{_citar(coluna)} IS NULL')
+            condicoes.append('(' + ' OR '.join(alternativas) + ')')
+
+        limites = _limites_periodo(periodo)
+        if limites is not None and 'Data Início' in self.colunas:
+            condicoes.append(f'{_citar("Data Início")} >= ? AND {_citar("Data Início")} < ?')
+            parametros.extend(self._parametro_data(limite) for limite in limites)
+        return (' WHERE ' + ' AND '.join(condicoes) if condicoes else ''), parametros
+
+    def ler(self, selecoes=None, periodo=None):
+        where, parametros = self.where(selecoes, periodo)
+        colunas = ', '.join(_citar(coluna) for coluna in self._colunas_lidas())
+        return normalizar(self._consultar(f'SELECT {colunas} FROM {_citar(self.tabela)}{where}', parametros))
+
+
+class FonteSQLite(FonteSQL):
+    """Tabela SQLite, aberta só para leitura. Datas em texto ISO 8601 (o padrão do SQLite)."""
+
+    def _conectar(self):
+        return sqlite3.connect(f'{self.caminho.resolve().as_uri()}?mode=ro', uri=True)
+
+    def _parametro_data(self, data):
+        # Datas são texto: comparar pelo dia aceita 'AAAA-MM-DD', com ' ' ou 'T' antes da hora
+        return data.strftime('%Y-%m-%d')
+
+    def _consultar(self, sql, parametros):
+        conexao = self._conectar()
+        try:
+            df = pd.read_sql_query(sql, conexao, params=parametros)
+        finally:
+            conexao.close()
+        for coluna in COLUNAS_DATA:
+            if coluna in df.columns:
+                # Formato inferido pelo pandas vale para a coluna inteira: ' ' e 'T' misturados viram NaT
+                df[coluna] = pd.to_datetime(df[coluna], format='ISO8601', errors='coerce')
+        return df
+
+
+class FonteDuckDB(FonteSQL):
+    """Tabela DuckDB, aberta só para leitura (requer o pacote ``duckdb``)."""
+
+    def _conectar(self):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("Leitura de arquivos DuckDB requer o pacote 'duckdb' (pip install duckdb).") from e
+        return duckdb.connect(str(self.caminho), read_only=True)
+
+    def _consultar(self, sql, parametros):
+        conexao = self._conectar()
+        try:
+            return conexao.execute(sql, parametros).fetch_arrow_table().to_pandas()
+        finally:
+            conexao.close()
+
+
+class FonteParquetParticionada(FonteDados):
+    """Diretório Parquet particionado por Local e mês.
+
+    Local e período descartam diretórios inteiros; Equipamento, Status e as
+    datas dentro do mês usam as estatísticas dos row groups. Os valores de
+    Equipamento e Status da sidebar vêm dos catálogos gravados por
+    ``gravar_particionado``; sem eles, a coluna é varrida até o limite do
+    catálogo.
+    """
+
+    def __init__(self, diretorio):
+        super().__init__()
+        self.diretorio = Path(diretorio)
+        self.assinatura = assinatura_fonte(diretorio)
+        self.descricao = f'{self.diretorio.name}/ (Parquet particionado)'
+        self._dataset = ds.dataset(self.diretorio, format='parquet', partitioning=PARTICIONAMENTO)
+        fragmentos = list(self._dataset.get_fragments())
+        self._particoes = [ds.get_partition_keys(fragmento.partition_expression) for fragmento in fragmentos]
+        self._catalogos = self._ler_catalogos({Path(fragmento.path).name.rsplit('-', 1)[0] for fragmento in fragmentos})
+
+    def _ler_catalogos(self, prefixos):
+        """Valores por coluna dos catálogos, ou None se algum arquivo de dados não tem catálogo."""
+        valores = {}
+        for prefixo in prefixos:
+            caminho = self.diretorio / f'{PREFIXO_CATALOGO}{prefixo}.json'
+            try:
+                catalogo = json.loads(caminho.read_text(encoding='utf-8'))
+            except (FileNotFoundError, ValueError):
+                return None
+            for coluna, lista in catalogo.items():
+                valores.setdefault(coluna, set()).update(lista)
+        return valores
+
+    @property
+    def colunas(self):
+        return [coluna for coluna in self._dataset.schema.names if coluna != COLUNA_MES]
+
+    def _valores_distintos(self, coluna, limite):
+        if coluna == 'Local':
+            # Só os nomes dos diretórios
+            return {particao.get('Local') for particao in self._particoes}
+        if self._catalogos is not None and coluna in self._catalogos:
+            return self._catalogos[coluna]
+        valores = set()
+        for lote in self._dataset.to_batches(columns=[coluna]):
+            valores.update(pc.unique(lote.column(0)).to_pylist())
+            if len(valores) > limite:
+                break
+        return valores
+
+    def intervalo_datas(self):
+        meses = sorted({particao[COLUNA_MES] for particao in self._particoes if particao.get(COLUNA_MES)})
+        if not meses:
+            return pd.NaT, pd.NaT
+        # Só o primeiro e o último mês são lidos
+        menor = self._dataset.to_table(columns=['Data Início'], filter=ds.field(COLUNA_MES) == meses[0])
+        maior = self._dataset.to_table(columns=['Data Início'], filter=ds.field(COLUNA_MES) == meses[-1])
+        return (
+            pd.Timestamp(pc.min(menor.column(0)).as_py()),
+            pd.Timestamp(pc.max(maior.column(0)).as_py()),
+        )
+
+    def filtro(self, selecoes=None, periodo=None):
+        """Expressão do pyarrow com as seleções e o período (None sem filtro)."""
+        condicoes = []
+        for coluna, (valores, inclui_vazio) in self.restricoes(selecoes).items():
+            tipo = self._dataset.schema.field(coluna).type
+            if pa.types.is_dictionary(tipo):
+                tipo = tipo.value_type
+            condicao = ds.field(coluna).isin(pa.array(valores, type=tipo))
+            if inclui_vazio:
+                condicao = condicao | ds.field(coluna).is_null()
+            condicoes.append(condicao)
+
+        limites = _limites_periodo(periodo)
+        if limites is not None:
+            inicio, fim = limites
+            ultimo_mes = (fim - pd.Timedelta(days=1)).strftime('%Y-%m')
+            condicoes.append((ds.field(COLUNA_MES) >= inicio.strftime('%Y-%m')) & (ds.field(COLUNA_MES) <= ultimo_mes))
+            tipo_data = self._dataset.schema.field('Data Início').type
+            condicoes.append(
+                (ds.field('Data Início') >= pa.scalar(inicio.to_pydatetime(), type=tipo_data))
+                & (ds.field('Data Início') < pa.scalar(fim.to_pydatetime(), type=tipo_data))
+            )
+
+        filtro = None
+        for condicao in condicoes:
+            filtro = condicao if filtro is None else filtro & condicao
+        return filtro
+
+    def ler(self, selecoes=None, periodo=None):
+        tabela = self._dataset.to_table(columns=self._colunas_lidas(), filter=self.filtro(selecoes, periodo))
+        return normalizar(tabela.to_pandas())
+
+
+def remover_particionado(diretorio, prefixo):
+    """Apaga os arquivos e o catálogo de uma gravação anterior com ``prefixo``."""
+    diretorio = Path(diretorio)
+    if not diretorio.exists():
+        return
+    for caminho in diretorio.rglob(f'{prefixo}-*.parquet'):
+        # Só <prefixo>-<i>.parquet: outro prefixo pode começar com este
+        if caminho.stem[len(prefixo) + 1:].isdigit():
+            caminho.unlink()
+    (diretorio / f'{PREFIXO_CATALOGO}{prefixo}.json').unlink(missing_ok=True)
+
+
+def gravar_particionado(df, diretorio, prefixo=None):
+    """Grava a base em um diretório Parquet particionado por Local e mês.
+
+    Os arquivos desta gravação se chamam ``<prefixo>-<i>.parquet`` (prefixo
+    aleatório por padrão) e os valores distintos de Equipamento e Status vão
+    para ``_catalogo-<prefixo>.json``, lido pela sidebar. Uma nova gravação
+    com o mesmo ``prefixo`` substitui a anterior em vez de duplicar as linhas.
+
+    Retorna o número de linhas gravadas.
+    """
+    if 'Local' not in df.columns:
+        raise ColunasFaltantesError(['Local'])
+    prefixo = prefixo or uuid4().hex
+    remover_particionado(diretorio, prefixo)
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        # Categorias viram texto: o filtro por valores não depende do dicionário de cada arquivo
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(serie.cat.categories.dtype)
+        colunas[str(coluna)] = serie
+    colunas[COLUNA_MES] = df['Data Início'].dt.strftime('%Y-%m')
+    tabela = pa.Table.from_pandas(pd.DataFrame(colunas), preserve_index=False)
+    tabela = tabela.set_column(
+        tabela.schema.get_field_index('Local'), 'Local', pc.cast(tabela.column('Local'), pa.string())
+    )
+    ds.write_dataset(
+        tabela,
+        diretorio,
+        format='parquet',
+        partitioning=PARTICIONAMENTO,
+        existing_data_behavior='overwrite_or_ignore',
+        basename_template=f'{prefixo}-{{i}}.parquet',
+    )
+
+    catalogo = {
+        coluna: pc.unique(tabela.column(coluna)).to_pylist()
+        for coluna in COLUNAS_FILTRO if coluna != 'Local' and coluna in tabela.column_names
+    }
+    caminho = Path(diretorio) / f'{PREFIXO_CATALOGO}{prefixo}.json'
+    temporario = caminho.with_suffix('.tmp')
+    temporario.write_text(json.dumps(catalogo, ensure_ascii=False, default=str), encoding='utf-8')
+    os.replace(temporario, caminho)
+    return tabela.num_rows
+
+
+def abrir_fonte(caminho, tabela=TABELA_PADRAO):
+    """Fonte externa pelo caminho: diretório Parquet, arquivo SQLite ou DuckDB."""
+    caminho = Path(caminho).expanduser()
+    if not caminho.exists():
+        raise FileNotFoundError(f'Fonte não encontrada: {caminho}')
+    if caminho.is_dir():
+        fonte = FonteParquetParticionada(caminho)
+    elif caminho.suffix.lower() in EXTENSOES_DUCKDB:
+        fonte = FonteDuckDB(caminho, tabela)
+    elif caminho.suffix.lower() in EXTENSOES_SQLITE:
+        fonte = FonteSQLite(caminho, tabela)
+    else:
+        raise ValueError(
+            f"Fonte não suportada: {caminho.name} "
+            f"(use um diretório Parquet ou um arquivo {', '.join(EXTENSOES_SQLITE + EXTENSOES_DUCKDB)})"
+        )
+
+    faltantes = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in fonte.colunas]
+    if faltantes:
+        raise ColunasFaltantesError(faltantes)
+    return fonte
@@ -0,0 +1,185 @@
+"""Figuras Plotly do dashboard e cache das figuras por estado dos filtros."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from paradas.reducao import TOP_N_PADRAO, limitar_figura, modo_render, reduzir_serie, top_n
+
+
+def impressao_filtros(chave_base, selecoes, periodo=None):
+    """Impressão digital barata do estado dos filtros (não do DataFrame filtrado).
+
+    Duas execuções com a mesma base e as mesmas seleções produzem a mesma
+    impressão, independentemente dos demais widgets da página.
+    """
+    partes = [str(chave_base)]
+    for col in sorted(selecoes):
+        valores = sorted(str(valor) for valor in selecoes[col])
+        partes.append(f'{col}={len(valores)}:' + '\x1f'.join(valores))
+    if periodo is not None and len(periodo) == 2:
+        partes.append(f'periodo={pd.Timestamp(periodo[0])}/{pd.Timestamp(periodo[1])}')
+    return hashlib.blake2b('\x1e'.join(partes).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def tamanho_estimado(valor):
+    """Estimativa dos bytes ocupados por um resultado em cache, sem serializar figuras."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, tuple):
+        return sum(tamanho_estimado(parte) for parte in valor)
+    if hasattr(valor, 'to_plotly_json'):
+        total = 0
+        for trace in valor.data:
+            for atributo in ('x', 'y', 'values', 'labels', 'customdata', 'text'):
+                pontos = getattr(trace, atributo, None)
+                if pontos is not None and not isinstance(pontos, str):
+                    total += 16 * len(pontos)
+        return total
+    # Demais objetos (índices, classificadores): os arrays e tabelas que guardam
+    return sum(tamanho_estimado(atributo) for atributo in getattr(valor, '__dict__', {}).values())
+
+
+class CacheGraficos:
+    """Cache LRU de figuras e dados derivados, com limite de entradas e de bytes."""
+
+    def __init__(self, max_entradas=128, max_bytes=64 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+
+    def obter(self, chave, construir):
+        """Devolve o valor em cache para ``chave`` ou o constrói com ``construir()``.
+
+        Um valor maior que ``max_bytes`` é devolvido sem entrar no cache
+        (guardá-lo expulsaria todas as outras entradas e depois ele mesmo).
+        """
+        with self._trava:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave][0]
+            self.falhas += 1
+
+        valor = construir()
+        tamanho = tamanho_estimado(valor)
+        if tamanho > self.max_bytes:
+            return valor
+        with self._trava:
+            if chave in self._entradas:
+                self._bytes -= self._entradas.pop(chave)[1]
+            self._entradas[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            while self._entradas and (len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes):
+                _, (_, tamanho_removido) = self._entradas.popitem(last=False)
+                self._bytes -= tamanho_removido
+        return valor
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+            }
+
+
+def figura_paradas_por_local(df, n=TOP_N_PADRAO):
+    paradas_por_local = top_n(df['Local'].value_counts(), n)
+    return limitar_figura(px.bar(
+        x=paradas_por_local.index,
+        y=paradas_por_local.values,
+        labels={'x': 'Local', 'y': 'Número de Paradas'},
+        title="Paradas por Local",
+        color=paradas_por_local.values,
+        color_continuous_scale='Blues'
+    ))
+
+
+def figura_paradas_por_equipamento(df, n=TOP_N_PADRAO):
+    paradas_por_equipamento = top_n(df['Equipamento'].value_counts(), n)
+    return limitar_figura(px.pie(
+        values=paradas_por_equipamento.values,
+        names=paradas_por_equipamento.index,
+        title="Distribuição de Paradas por Equipamento"
+    ))
+
+
+def figura_tendencia(serie, granularidade, coluna_y='Tempo de Parada (h)'):
+    """Linha do tempo de parada (ou nº de paradas) por período, a partir do cubo."""
+    serie = reduzir_serie(serie, 'Período', coluna_y)
+    return limitar_figura(px.line(
+        serie,
+        x='Período',
+        y=coluna_y,
+        title=f"Tendência de Paradas por {granularidade}",
+        markers=len(serie) <= 120,
+        render_mode=modo_render(len(serie))
+    ))
+
+
+def figura_tendencia_por_grupo(tabela, coluna, granularidade):
+    tabela = reduzir_serie(tabela, 'Período', 'Tempo de Parada (h)', grupo=coluna)
+    return limitar_figura(px.line(
+        tabela,
+        x='Período',
+        y='Tempo de Parada (h)',
+        color=coluna,
+        title=f"Tempo de Parada por {granularidade} e {coluna}",
+        render_mode=modo_render(len(tabela))
+    ))
+
+
+def figura_tipo_manutencao(tipos):
+    manutencao_por_tipo = top_n(tipos.value_counts())
+    return limitar_figura(px.pie(
+        values=manutencao_por_tipo.values,
+        names=manutencao_por_tipo.index,
+        title="Distribuição por Tipo de Manutenção"
+    ))
+
+
+def figura_palavras_chave(palavras_frequentes):
+    return limitar_figura(px.bar(
+        x=palavras_frequentes.values,
+        y=palavras_frequentes.index,
+        orientation='h',
+        title="Palavras-chave Mais Frequentes nas Causas",
+        labels={'x': 'Frequência', 'y': 'Palavra-chave'},
+        color=palavras_frequentes.values,
+        color_continuous_scale='Reds'
+    ))
+
+
+def figura_sobrevivencia(frota, curvas, coluna, selecionados=()):
+    """Curvas de Kaplan-Meier em degraus: a frota inteira e os grupos ``selecionados``."""
+    partes = [frota.assign(**{coluna: 'Frota'})]
+    partes += [curvas[curvas[coluna] == grupo] for grupo in selecionados]
+    tabela = pd.concat(partes, ignore_index=True)
+    # Cada curva começa em S(0) = 1
+    inicio = pd.DataFrame({coluna: tabela[coluna].unique(), 'Tempo (h)': 0.0, 'Sobrevivência': 1.0})
+    tabela = pd.concat([inicio, tabela], ignore_index=True)
+    tabela = reduzir_serie(tabela, 'Tempo (h)', 'Sobrevivência', grupo=coluna)
+    return limitar_figura(px.line(
+        tabela,
+        x='Tempo (h)',
+        y='Sobrevivência',
+        color=coluna,
+        line_shape='hv',
+        title="Curva de Sobrevivência (Kaplan-Meier) - Tempo entre Falhas",
+        labels={'Sobrevivência': 'Probabilidade de operar sem falha'},
+        render_mode=modo_render(len(tabela))
+    ))
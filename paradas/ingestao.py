@@ -0,0 +1,353 @@
+"""Ingestão das bases de paradas: leitura, normalização e cache em disco."""
+
+import hashlib
+import os
+from io import BytesIO
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from paradas.compactacao import COLUNAS_CATEGORICAS
+
+# Incrementar sempre que a normalização mudar, para invalidar o cache antigo
+VERSAO_CACHE = 2
+
+COLUNAS_OBRIGATORIAS = ['Data Início', 'Status']
+
+DIRETORIO_CACHE_PADRAO = Path(
+    os.environ.get('PARADAS_CACHE_DIR', Path.home() / '.cache' / 'dashboard_paradas')
+)
+LIMITE_CACHE_PADRAO_MB = int(os.environ.get('PARADAS_CACHE_MAX_MB', '1024'))
+
+# Número de linhas lidas por vez na ingestão em blocos
+TAMANHO_BLOCO_PADRAO = 50_000
+
+COLUNAS_DATA = ['Data Início', 'Data Fim']
+
+
+class ColunasFaltantesError(ValueError):
+    """A base não possui as colunas obrigatórias."""
+
+    def __init__(self, colunas):
+        self.colunas = list(colunas)
+        super().__init__(f"Colunas obrigatórias não encontradas: {', '.join(self.colunas)}")
+
+    def __reduce__(self):
+        # Permite devolver o erro de um processo filho (processamento em lote)
+        return type(self), (self.colunas,)
+
+
+def hash_conteudo(dados):
+    """Chave estável para o conteúdo de um arquivo enviado."""
+    return hashlib.blake2b(dados, digest_size=16).hexdigest()
+
+
+def normalizar(df):
+    """Valida colunas, converte datas e calcula 'Tempo de Parada (h)'."""
+    colunas_faltantes = [col for col in COLUNAS_OBRIGATORIAS if col not in df.columns]
+    if colunas_faltantes:
+        raise ColunasFaltantesError(colunas_faltantes)
+
+    # Converter colunas de data
+    df['Data Início'] = pd.to_datetime(df['Data Início'], errors='coerce')
+
+    if 'Data Fim' in df.columns:
+        df['Data Fim'] = pd.to_datetime(df['Data Fim'], errors='coerce')
+
+    # Calcular tempo de parada se não existir
+    if 'Tempo de Parada (h)' not in df.columns and 'Data Fim' in df.columns:
+        mask = df['Data Fim'].notna() & df['Data Início'].notna()
+        df.loc[mask, 'Tempo de Parada (h)'] = (df.loc[mask, 'Data Fim'] - df.loc[mask, 'Data Início']).dt.total_seconds() / 3600
+
+    return df
+
+
+def _abrir(fonte):
+    # Aceita tanto os bytes do upload quanto um caminho no disco
+    return BytesIO(fonte) if isinstance(fonte, (bytes, bytearray)) else fonte
+
+
+def ler_arquivo(dados, nome):
+    """Lê os bytes de um arquivo Excel ou CSV e devolve a base normalizada."""
+    if str(nome).lower().endswith('.csv'):
+        df = pd.read_csv(_abrir(dados))
+    else:
+        df = pd.read_excel(_abrir(dados))
+    return normalizar(df)
+
+
+def _linhas_xlsx(fonte):
+    # Modo read_only do openpyxl: as linhas são lidas sob demanda, sem montar a planilha inteira
+    wb = openpyxl.load_workbook(_abrir(fonte), read_only=True, data_only=True)
+    try:
+        linhas = wb.active.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        colunas = [
+            col if col is not None else f'Unnamed: {i}'
+            for i, col in enumerate(cabecalho)
+        ]
+        yield colunas
+        yield from linhas
+    finally:
+        wb.close()
+
+
+def ler_em_blocos(fonte, nome, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """Gera a base normalizada em blocos de até ``tamanho_bloco`` linhas.
+
+    Usa o modo read_only do openpyxl para .xlsx e o leitor em blocos do
+    pandas para CSV; arquivos .xls não têm leitura incremental e são lidos
+    de uma vez.
+    """
+    nome = str(nome).lower()
+    if nome.endswith('.csv'):
+        for bloco in pd.read_csv(_abrir(fonte), chunksize=tamanho_bloco):
+            yield normalizar(bloco)
+    elif nome.endswith('.xls'):
+        yield ler_arquivo(fonte, nome)
+    else:
+        linhas = _linhas_xlsx(fonte)
+        colunas = next(linhas, None)
+        if colunas is None:
+            return
+        buffer = []
+        for linha in linhas:
+            buffer.append(linha)
+            if len(buffer) >= tamanho_bloco:
+                yield normalizar(pd.DataFrame(buffer, columns=colunas).dropna(how='all'))
+                buffer = []
+        if buffer:
+            yield normalizar(pd.DataFrame(buffer, columns=colunas).dropna(how='all'))
+
+
+def _tipo_serie(col, serie):
+    # Tipo Arrow dos valores do bloco: datas em timestamp, inteiros em int64,
+    # números em float64 (coluna vazia também, como no pandas) e o restante texto
+    if col in COLUNAS_DATA:
+        return pa.timestamp('us')
+    if col == 'Tempo de Parada (h)':
+        return pa.float64()
+    if pd.api.types.is_bool_dtype(serie):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(serie):
+        return pa.int64()
+    if pd.api.types.is_float_dtype(serie) or serie.isna().all():
+        return pa.float64()
+    return pa.string()
+
+
+def _unir_tipos(atual, novo):
+    if atual == novo:
+        return atual
+    if {atual, novo} == {pa.int64(), pa.float64()}:
+        return pa.float64()
+    if pa.types.is_timestamp(atual):
+        return atual
+    return pa.string()
+
+
+def _unir_esquemas(esquema, tabela):
+    """Esquema que comporta os blocos já gravados e ``tabela`` (inteiro → float → texto)."""
+    if esquema is None:
+        return tabela.schema
+    tipos = {campo.name: campo.type for campo in esquema}
+    for campo in tabela.schema:
+        tipos[campo.name] = _unir_tipos(tipos[campo.name], campo.type) if campo.name in tipos else campo.type
+    return pa.schema([pa.field(nome, tipo) for nome, tipo in tipos.items()])
+
+
+def _para_tabela(bloco):
+    colunas = {}
+    for col in bloco.columns:
+        serie = bloco[col]
+        tipo = _tipo_serie(col, serie)
+        if pa.types.is_timestamp(tipo):
+            serie = pd.to_datetime(serie, errors='coerce').astype('datetime64[us]')
+        elif pa.types.is_floating(tipo):
+            serie = pd.to_numeric(serie, errors='coerce').astype('float64')
+        elif pa.types.is_string(tipo):
+            serie = serie.astype('string')
+        colunas[str(col)] = pa.array(serie, type=tipo, from_pandas=True)
+    return pa.table(colunas)
+
+
+def _ajustar(tabela, esquema):
+    # Colunas ausentes no bloco entram vazias; as demais são convertidas pelo Arrow
+    colunas = [
+        tabela.column(campo.name).cast(campo.type) if campo.name in tabela.column_names
+        else pa.nulls(tabela.num_rows, campo.type)
+        for campo in esquema
+    ]
+    return pa.Table.from_arrays(colunas, schema=esquema)
+
+
+def _regravar(escritor, destino, esquema):
+    """Fecha ``escritor`` e regrava o que já está em ``destino`` no esquema alargado."""
+    escritor.close()
+    anterior = Path(destino).with_suffix('.anterior')
+    os.replace(destino, anterior)
+    escritor = pq.ParquetWriter(destino, esquema)
+    try:
+        for lote in pq.ParquetFile(anterior).iter_batches():
+            escritor.write_table(_ajustar(pa.Table.from_batches([lote]), esquema))
+    finally:
+        anterior.unlink(missing_ok=True)
+    return escritor
+
+
+def gravar_parquet_em_blocos(fonte, nome, destino, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """Converte o arquivo em Parquet bloco a bloco, com memória limitada ao bloco.
+
+    O esquema parte do primeiro bloco e é alargado quando um bloco seguinte
+    discorda (inteiro → float → texto): o que já foi gravado é regravado no
+    esquema novo, no máximo uma vez por alargamento. Texto que aparece depois
+    de números não vira NaN, como em ``pd.read_csv``.
+
+    Retorna o número de linhas gravadas.
+    """
+    escritor = None
+    esquema = None
+    total = 0
+    try:
+        for bloco in ler_em_blocos(fonte, nome, tamanho_bloco):
+            tabela = _para_tabela(bloco)
+            novo = _unir_esquemas(esquema, tabela)
+            if escritor is None:
+                escritor = pq.ParquetWriter(destino, novo)
+            elif not novo.equals(esquema):
+                escritor = _regravar(escritor, destino, novo)
+            esquema = novo
+            escritor.write_table(_ajustar(tabela, esquema))
+            total += len(bloco)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return total
+
+
+def limpar_lru(diretorio, padrao, limite_bytes):
+    """Apaga os arquivos de ``diretorio`` menos usados (mtime) até caberem em ``limite_bytes``."""
+    entradas = []
+    for caminho in Path(diretorio).glob(padrao):
+        try:
+            info = caminho.stat()
+        except FileNotFoundError:
+            continue
+        entradas.append((info.st_mtime, info.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        caminho.unlink(missing_ok=True)
+        total -= tamanho
+
+
+def ler_parquet_categorico(caminho):
+    """Lê o Parquet com as colunas de ``COLUNAS_CATEGORICAS`` já como ``category``.
+
+    O Arrow lê essas colunas como dicionário (cada texto distinto uma vez),
+    então o pico da leitura não passa pela base com um texto por célula; as
+    demais colunas ficam para ``compactar``.
+    """
+    textos = [
+        campo.name for campo in pq.read_schema(caminho)
+        if campo.name in COLUNAS_CATEGORICAS and (pa.types.is_string(campo.type) or pa.types.is_large_string(campo.type))
+    ]
+    tabela = pq.read_table(caminho, read_dictionary=textos)
+    df = tabela.to_pandas(split_blocks=True, self_destruct=True)
+    del tabela
+    for col in textos:
+        # Mesma ordem de ``astype('category')`` (ordenação e gráficos seguem as categorias)
+        df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    return df
+
+
+class CacheParquet:
+    """Cache LRU em disco das bases já normalizadas, em formato Parquet.
+
+    Cada entrada é um arquivo ``<hash>.v<versão>.parquet``; a data de
+    modificação marca o último acesso e as entradas mais antigas são
+    removidas quando o tamanho total passa de ``limite_bytes``.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE_PADRAO, limite_bytes=LIMITE_CACHE_PADRAO_MB * 1024 * 1024):
+        self.diretorio = Path(diretorio)
+        self.limite_bytes = limite_bytes
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    def _caminho(self, chave):
+        return self.diretorio / f'{chave}.v{VERSAO_CACHE}.parquet'
+
+    def obter(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            df = ler_parquet_categorico(caminho)
+        except (FileNotFoundError, OSError):
+            return None
+        # Marcar como usado recentemente
+        os.utime(caminho)
+        return df
+
+    def salvar(self, chave, df):
+        caminho = self._caminho(chave)
+        temporario = caminho.with_suffix('.tmp')
+        try:
+            df.to_parquet(temporario, index=False)
+        except (ValueError, TypeError, OSError):
+            # Colunas com tipos mistos não são serializáveis; seguir sem cache
+            temporario.unlink(missing_ok=True)
+            return
+        os.replace(temporario, caminho)
+        self.limpar()
+
+    def salvar_em_blocos(self, chave, fonte, nome, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+        """Grava o arquivo direto no cache, sem carregá-lo inteiro em memória."""
+        caminho = self._caminho(chave)
+        temporario = caminho.with_suffix('.tmp')
+        try:
+            linhas = gravar_parquet_em_blocos(fonte, nome, temporario, tamanho_bloco)
+        except BaseException:
+            temporario.unlink(missing_ok=True)
+            raise
+        if not linhas:
+            temporario.unlink(missing_ok=True)
+            return caminho
+        os.replace(temporario, caminho)
+        self.limpar()
+        return caminho
+
+    def limpar(self):
+        """Remove as entradas menos usadas até respeitar o limite de tamanho."""
+        limpar_lru(self.diretorio, '*.parquet', self.limite_bytes)
+
+
+def carregar_arquivo(dados, nome, cache=None, chave=None, em_blocos=False):
+    """Carrega a base a partir dos bytes enviados, reaproveitando o cache em disco.
+
+    Com ``em_blocos=True`` o arquivo é convertido para o cache em blocos e
+    só então lido do Parquet, mantendo o pico de memória da leitura estável.
+    O que vem do cache já tem os textos como categorias
+    (``ler_parquet_categorico``).
+    """
+    if cache is None:
+        return ler_arquivo(dados, nome)
+
+    chave = chave or hash_conteudo(dados)
+    df = cache.obter(chave)
+    if df is None:
+        if em_blocos:
+            cache.salvar_em_blocos(chave, dados, nome)
+            df = cache.obter(chave)
+            if df is None:
+                # Arquivo sem linhas: manter o caminho comum de leitura
+                df = ler_arquivo(dados, nome)
+        else:
+            df = ler_arquivo(dados, nome)
+            cache.salvar(chave, df)
+    return df
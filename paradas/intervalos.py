@@ -0,0 +1,132 @@
+"""Operações vetorizadas sobre intervalos de parada [início, fim), em horas.
+
+- ``fim_acumulado_por_ativo``: maior fim até cada intervalo de um ativo;
+- ``unir_intervalos``: une as paradas sobrepostas (ou duplicadas) de cada
+  ativo numa única varredura depois de uma ordenação, O(n log n);
+- ``concorrencia``/``pico_por_grupo``: nº de ativos parados ao mesmo tempo,
+  por varredura de eventos de início (+1) e fim (-1).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def horas_desde_epoca(serie):
+    """Datas da série em horas desde 1970 (NaN para datas ausentes)."""
+    valores = serie.to_numpy(dtype='datetime64[us]')
+    horas = valores.astype(np.int64) / 3.6e9
+    horas[np.isnat(valores)] = np.nan
+    return horas
+
+
+def codigos_ativo(df):
+    """Código de cada linha por ativo: o par (Local, Equipamento) das colunas existentes.
+
+    Sem essas colunas, a base inteira é tratada como um único ativo.
+    """
+    codigos = np.zeros(len(df), dtype=np.int64)
+    for coluna in ['Local', 'Equipamento']:
+        if coluna in df.columns:
+            # Valores ausentes formam um ativo próprio
+            codigos_coluna, valores = pd.factorize(df[coluna], use_na_sentinel=False)
+            codigos = codigos * max(len(valores), 1) + codigos_coluna
+    return codigos
+
+
+def fim_acumulado_por_ativo(ativo, inicio, fim):
+    """Maior fim até cada intervalo, sem passar de um ativo para o seguinte.
+
+    ``ativo``, ``inicio`` e ``fim`` (sem NaN) vêm ordenados por ativo e
+    início. Retorna também a marca do primeiro intervalo de cada ativo.
+    """
+    troca = np.empty(len(ativo), dtype=bool)
+    troca[0] = True
+    troca[1:] = ativo[1:] != ativo[:-1]
+    # O deslocamento pela ordem do ativo impede que o acumulado de um ativo invada o seguinte
+    base = inicio.min()
+    amplitude = fim.max() - base + 1
+    deslocamento = np.cumsum(troca) * amplitude
+    return troca, np.maximum.accumulate(fim - base + deslocamento) - deslocamento + base
+
+
+def unir_intervalos(ativo, inicio, fim):
+    """Une os intervalos sobrepostos de cada ativo.
+
+    Retorna (ativo, início, fim) dos intervalos unidos, ordenados por ativo e
+    início. Intervalos sem início ou fim são ignorados; fim antes do início
+    (dado inconsistente) vira um intervalo vazio.
+    """
+    validos = ~(np.isnan(inicio) | np.isnan(fim))
+    ativo, inicio = ativo[validos], inicio[validos]
+    fim = np.maximum(fim[validos], inicio)
+    if not len(ativo):
+        return ativo, inicio, fim
+
+    # Duas ordenações (a segunda estável) saem mais baratas que um lexsort
+    ordem = np.argsort(inicio)
+    ordem = ordem[np.argsort(ativo[ordem], kind='stable')]
+    ativo, inicio, fim = ativo[ordem], inicio[ordem], fim[ordem]
+
+    troca, fim_acumulado = fim_acumulado_por_ativo(ativo, inicio, fim)
+    novo = troca.copy()
+    novo[1:] |= inicio[1:] > fim_acumulado[:-1]
+    blocos = np.flatnonzero(novo)
+    return ativo[blocos], inicio[blocos], np.maximum.reduceat(fim, blocos)
+
+
+def _eventos(grupo, inicio, fim):
+    # Em um mesmo instante, fins vêm antes de inícios (intervalos semiabertos)
+    grupos = np.concatenate([grupo, grupo])
+    instantes = np.concatenate([inicio, fim])
+    variacao = np.concatenate([np.ones(len(inicio), dtype=np.int64), -np.ones(len(fim), dtype=np.int64)])
+    ordem = np.lexsort((variacao, instantes, grupos))
+    return grupos[ordem], instantes[ordem], variacao[ordem]
+
+
+def concorrencia(grupo, inicio, fim):
+    """Nº de intervalos abertos em cada grupo logo após cada evento.
+
+    Retorna (grupo, instante, nível). Os eventos de cada grupo somam zero,
+    então a soma acumulada global já recomeça do zero a cada grupo.
+    """
+    grupos, instantes, variacao = _eventos(grupo, inicio, fim)
+    return grupos, instantes, np.cumsum(variacao)
+
+
+def pico_por_grupo(grupo, inicio, fim, n_grupos):
+    """Maior nº de intervalos simultâneos de cada grupo e o instante em que começou."""
+    grupos, instantes, nivel = concorrencia(grupo, inicio, fim)
+    pico = np.zeros(n_grupos, dtype=np.int64)
+    np.maximum.at(pico, grupos, nivel)
+    inicio_pico = np.full(n_grupos, np.nan)
+    no_pico = np.flatnonzero((nivel == pico[grupos]) & (nivel > 0))
+    primeiros, indices = np.unique(grupos[no_pico], return_index=True)
+    inicio_pico[primeiros] = instantes[no_pico[indices]]
+    return pico, inicio_pico
+
+
+def paradas_simultaneas(df, coluna='Local'):
+    """Pico de ativos parados ao mesmo tempo por ``coluna`` (paradas fechadas)."""
+    fechada = (df['Status'] == 'Fechado').to_numpy()
+    inicio = horas_desde_epoca(df['Data Início'])
+    fim = inicio + df['Tempo de Parada (h)'].to_numpy(dtype=float)
+    ativo = codigos_ativo(df)
+    grupo, categorias = pd.factorize(df[coluna], sort=True)
+    validos = fechada & (grupo >= 0)
+
+    # Cada ativo conta uma vez, mesmo com paradas sobrepostas
+    ativo_unido, inicio_unido, fim_unido = unir_intervalos(ativo[validos], inicio[validos], fim[validos])
+    grupo_do_ativo = np.zeros(ativo.max(initial=-1) + 1, dtype=np.int64)
+    grupo_do_ativo[ativo[validos]] = grupo[validos]
+    pico, inicio_pico = pico_por_grupo(grupo_do_ativo[ativo_unido], inicio_unido, fim_unido, len(categorias))
+
+    ativos = np.zeros(len(categorias), dtype=np.int64)
+    unicos = np.unique(ativo[validos])
+    np.add.at(ativos, grupo_do_ativo[unicos], 1)
+    tabela = pd.DataFrame({
+        coluna: np.asarray(categorias),
+        'Equipamentos com Paradas': ativos,
+        'Pico de Parados Simultâneos': pico,
+        'Início do Pico': pd.to_datetime(np.round(inicio_pico * 3600), unit='s'),
+    })
+    return tabela.sort_values('Pico de Parados Simultâneos', ascending=False, kind='stable', ignore_index=True)
@@ -0,0 +1,213 @@
+"""Cálculo dos KPIs de manutenção (MTTR, MTBF, disponibilidade...).
+
+Os KPIs seguem as mesmas fórmulas do painel geral:
+
+- MTTR = média do tempo de parada das paradas fechadas;
+- tempo total = intervalo entre o primeiro início e o último fim das paradas
+  fechadas, multiplicado pelo nº de ativos (Local/Equipamento) com paradas;
+- tempo parado = soma das paradas já unidas por ativo (paradas sobrepostas
+  ou duplicadas do mesmo equipamento contam uma vez, ver paradas/intervalos.py);
+- tempo operacional = tempo total - tempo parado;
+- MTBF = tempo operacional / nº de paradas fechadas (exige 2+ paradas);
+- disponibilidade = tempo operacional / tempo total × 100;
+- taxa de falhas = 1 / MTBF e confiabilidade = exp(-tempo operacional / MTBF).
+"""
+
+import numpy as np
+import pandas as pd
+
+from paradas.intervalos import codigos_ativo, horas_desde_epoca, unir_intervalos
+
+NIVEIS = {
+    'Equipamento': ['Equipamento'],
+    'Local': ['Local'],
+    'Local/Equipamento': ['Local', 'Equipamento'],
+}
+
+COLUNAS_KPI = [
+    'Total de Paradas',
+    'Paradas Abertas',
+    'Paradas Fechadas',
+    'Tempo Total Parada (h)',
+    'Tempo Operacional (h)',
+    'MTTR (h)',
+    'MTBF (h)',
+    'Disponibilidade (%)',
+    'Taxa de Falhas (1/h)',
+    'Confiabilidade (%)',
+]
+
+
+def derivar_kpis(fechadas, soma_tempo, media_tempo, periodo_h, ativos=1):
+    """Aplica as fórmulas dos KPIs, vetorizadas, a partir dos totais de cada grupo.
+
+    ``soma_tempo`` é o tempo parado já sem sobreposições; ``periodo_h`` é
+    multiplicado pelo nº de ``ativos`` para formar o tempo total.
+    """
+    fechadas = np.asarray(fechadas, dtype=float)
+    soma_tempo = np.nan_to_num(np.asarray(soma_tempo, dtype=float))
+    periodo_h = np.nan_to_num(np.asarray(periodo_h, dtype=float)) * np.maximum(np.asarray(ativos, dtype=float), 1)
+
+    com_periodo = (fechadas > 1) & (periodo_h > 0)
+    tempo_operacional = np.where(com_periodo, periodo_h - soma_tempo, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mtbf = np.where(com_periodo, tempo_operacional / fechadas, 0.0)
+        disponibilidade = np.where(com_periodo, tempo_operacional / periodo_h * 100, 100.0)
+        taxa_falhas = np.where(mtbf > 0, 1 / mtbf, 0.0)
+        confiabilidade = np.where(mtbf > 0, np.exp(-tempo_operacional / mtbf) * 100, 100.0)
+
+    return {
+        'Tempo Total Parada (h)': soma_tempo,
+        'Tempo Operacional (h)': tempo_operacional,
+        'MTTR (h)': np.nan_to_num(np.asarray(media_tempo, dtype=float)),
+        'MTBF (h)': mtbf,
+        'Disponibilidade (%)': disponibilidade,
+        'Taxa de Falhas (1/h)': taxa_falhas,
+        'Confiabilidade (%)': confiabilidade,
+    }
+
+
+def colunas_auxiliares(df):
+    """Marcas de parada aberta/fechada, tempo/início/fim (em horas) restritos às fechadas e o ativo."""
+    fechada = (df['Status'] == 'Fechado').to_numpy()
+    tempo = df['Tempo de Parada (h)'].to_numpy(dtype=float) if 'Tempo de Parada (h)' in df.columns else np.full(len(df), np.nan)
+    inicio = np.where(fechada, horas_desde_epoca(df['Data Início']), np.nan)
+    tempo = np.where(fechada, tempo, np.nan)
+    return pd.DataFrame({
+        'aberta': (df['Status'] == 'Aberto').to_numpy(),
+        'fechada': fechada,
+        'tempo': tempo,
+        'inicio': inicio,
+        # Fim da janela observada: paradas com tempo negativo não a recuam
+        'fim': np.fmax(inicio + tempo, inicio),
+        'ativo': codigos_ativo(df),
+    }, index=df.index)
+
+
+def tempo_parado(aux, grupo=None, n_grupos=1):
+    """Tempo parado sem sobreposições e nº de ativos com paradas, por grupo.
+
+    ``grupo`` é o código do grupo de cada linha de ``aux`` (todas no grupo 0
+    por padrão); as paradas são unidas por (grupo, ativo).
+    """
+    grupo = np.zeros(len(aux), dtype=np.int64) if grupo is None else np.asarray(grupo, dtype=np.int64)
+    n_ativos = int(aux['ativo'].max()) + 1 if len(aux) else 1
+    validos = grupo >= 0
+    chave = grupo[validos] * n_ativos + aux['ativo'].to_numpy()[validos]
+    inicio = aux['inicio'].to_numpy()[validos]
+    fim = inicio + aux['tempo'].to_numpy()[validos]
+
+    chave_unida, inicio_unido, fim_unido = unir_intervalos(chave, inicio, fim)
+    parado = np.bincount(chave_unida // n_ativos, weights=fim_unido - inicio_unido, minlength=n_grupos)
+    # Intervalos unidos ordenados pela chave: o primeiro de cada chave conta um ativo
+    primeiros = np.flatnonzero(np.diff(chave_unida, prepend=-1))
+    ativos = np.bincount(chave_unida[primeiros] // n_ativos, minlength=n_grupos)
+    return parado, ativos
+
+
+def parado_por_ativo(aux):
+    """Tempo parado unido de cada ativo e marca de ativo com paradas, numa linha representante.
+
+    As paradas são unidas uma única vez por ativo; o total de cada ativo fica
+    em uma de suas linhas (zero nas demais), então somar as colunas por
+    qualquer agrupamento que contenha ativos inteiros (como os níveis de
+    ``NIVEIS``) dá o tempo parado e o nº de ativos de cada grupo.
+    """
+    ativo = aux['ativo'].to_numpy()
+    inicio = aux['inicio'].to_numpy()
+    ativo_unido, inicio_unido, fim_unido = unir_intervalos(ativo, inicio, inicio + aux['tempo'].to_numpy())
+    n_ativos = ativo.max(initial=-1) + 1
+    parado = np.bincount(ativo_unido, weights=fim_unido - inicio_unido, minlength=n_ativos)
+    com_paradas = np.bincount(ativo_unido, minlength=n_ativos) > 0
+
+    # Os códigos de ativo não são contíguos: só os presentes têm representante
+    representante = np.full(n_ativos, -1, dtype=np.int64)
+    representante[ativo] = np.arange(len(ativo))
+    presentes = np.flatnonzero(representante >= 0)
+    parado_linha = np.zeros(len(ativo))
+    parado_linha[representante[presentes]] = parado[presentes]
+    ativo_linha = np.zeros(len(ativo), dtype=np.int64)
+    ativo_linha[representante[presentes]] = com_paradas[presentes]
+    return parado_linha, ativo_linha
+
+
+def calcular_kpis(df):
+    """KPIs gerais da base (já filtrada), como um dicionário."""
+    aux = colunas_auxiliares(df)
+    fechadas = int(aux['fechada'].sum())
+    periodo_h = aux['fim'].max() - aux['inicio'].min() if fechadas else 0.0
+    parado, ativos = tempo_parado(aux)
+    valores = derivar_kpis([fechadas], parado, [aux['tempo'].mean()], [periodo_h], ativos)
+
+    kpis = {col: float(valor[0]) for col, valor in valores.items()}
+    kpis['Total de Paradas'] = len(df)
+    kpis['Paradas Abertas'] = int(aux['aberta'].sum())
+    kpis['Paradas Fechadas'] = fechadas
+    kpis['Dados Suficientes'] = fechadas > 0 and 'Tempo de Parada (h)' in df.columns
+    return kpis
+
+
+def kpis_por_grupo(df, chaves, aux=None):
+    """KPIs de cada grupo de ``chaves`` em uma única passada de groupby.
+
+    ``aux`` pode trazer as colunas de ``parado_por_ativo`` ('parado' e
+    'com_paradas'), calculadas uma vez para vários agrupamentos por
+    'Local'/'Equipamento'.
+    """
+    aux = (colunas_auxiliares(df) if aux is None else aux).copy(deep=False)
+    if 'parado' not in aux.columns and set(chaves) <= {'Local', 'Equipamento'}:
+        aux['parado'], aux['com_paradas'] = parado_por_ativo(aux)
+    for chave in chaves:
+        aux[chave] = df[chave]
+
+    agrupado = aux.groupby(chaves, observed=True, sort=True)
+    colunas = dict(
+        total=('fechada', 'size'),
+        abertas=('aberta', 'sum'),
+        fechadas=('fechada', 'sum'),
+        media_tempo=('tempo', 'mean'),
+        primeiro_inicio=('inicio', 'min'),
+        ultimo_fim=('fim', 'max'),
+    )
+    if 'parado' in aux.columns:
+        colunas.update(parado=('parado', 'sum'), ativos=('com_paradas', 'sum'))
+    agregado = agrupado.agg(**colunas)
+    periodo_h = agregado['ultimo_fim'] - agregado['primeiro_inicio']
+    if 'parado' in aux.columns:
+        parado, ativos = agregado['parado'], agregado['ativos']
+    else:
+        # ngroup numera os grupos na mesma ordem (ordenada) do agregado
+        parado, ativos = tempo_parado(aux, agrupado.ngroup().to_numpy(), len(agregado))
+
+    tabela = pd.DataFrame(
+        derivar_kpis(agregado['fechadas'], parado, agregado['media_tempo'], periodo_h, ativos),
+        index=agregado.index,
+    )
+    tabela['Total de Paradas'] = agregado['total']
+    tabela['Paradas Abertas'] = agregado['abertas'].astype(int)
+    tabela['Paradas Fechadas'] = agregado['fechadas'].astype(int)
+    return tabela[COLUNAS_KPI].reset_index()
+
+
+def tabela_kpis(df, niveis=tuple(NIVEIS)):
+    """Tabela única (formato longo) com os KPIs por Equipamento, Local e Local/Equipamento.
+
+    Níveis cujas colunas não existem na base são ignorados.
+    """
+    aux = colunas_auxiliares(df)
+    # Os níveis agrupam ativos inteiros: as paradas são unidas uma vez para todos
+    aux['parado'], aux['com_paradas'] = parado_por_ativo(aux)
+    partes = []
+    for nivel in niveis:
+        chaves = NIVEIS[nivel]
+        if not all(chave in df.columns for chave in chaves):
+            continue
+        parte = kpis_por_grupo(df, chaves, aux)
+        parte.insert(0, 'Nível', nivel)
+        partes.append(parte)
+
+    if not partes:
+        return pd.DataFrame(columns=['Nível', 'Local', 'Equipamento'] + COLUNAS_KPI)
+    tabela = pd.concat(partes, ignore_index=True)
+    colunas_grupo = [col for col in ['Local', 'Equipamento'] if col in tabela.columns]
+    return tabela[['Nível'] + colunas_grupo + COLUNAS_KPI]
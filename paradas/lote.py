@@ -0,0 +1,152 @@
+"""Processamento em lote: KPIs por local para um diretório de bases de paradas.
+
+Uso:
+    python -m paradas <diretorio> [--saida DIR] [--formato parquet|csv] [--processos N] [--particionar DIR]
+
+Cada arquivo .xlsx/.csv é processado em um processo separado; para cada um
+é gravada a tabela de KPIs por 'Local' (ou pelo nome do arquivo, se a base
+não tiver essa coluna), além de um consolidado e de um resumo de tempos.
+Com ``--particionar``, as bases também são gravadas em um diretório
+Parquet particionado por Local e mês, que o dashboard lê como fonte; rodar
+de novo substitui as partições de cada arquivo de entrada.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from paradas.compactacao import compactar
+from paradas.fontes import gravar_particionado
+from paradas.ingestao import ler_arquivo
+from paradas.kpis import kpis_por_grupo
+
+EXTENSOES = ('.xlsx', '.csv')
+
+COLUNAS_RESUMO = ['Arquivo', 'Linhas', 'Leitura (s)', 'KPIs (s)', 'Gravação (s)', 'Total (s)', 'Erro']
+
+logger = logging.getLogger('paradas.lote')
+
+
+def listar_arquivos(diretorio):
+    return sorted(
+        caminho for caminho in Path(diretorio).iterdir()
+        if caminho.suffix.lower() in EXTENSOES and not caminho.name.startswith('~$')
+    )
+
+
+def gravar(tabela, destino, formato):
+    if formato == 'parquet':
+        tabela.to_parquet(destino, index=False)
+    else:
+        tabela.to_csv(destino, index=False, encoding='utf-8')
+
+
+def processar_arquivo(caminho, saida, formato, particionar=None):
+    """Lê um arquivo, calcula os KPIs por local e grava o resultado.
+
+    Roda no processo filho; retorna a tabela e os tempos de cada etapa.
+    """
+    caminho = Path(caminho)
+    t0 = time.perf_counter()
+    df = compactar(ler_arquivo(caminho, caminho.name))
+    t1 = time.perf_counter()
+
+    if 'Local' not in df.columns:
+        df['Local'] = caminho.stem
+    tabela = kpis_por_grupo(df, ['Local'])
+    tabela.insert(0, 'Arquivo', caminho.name)
+    t2 = time.perf_counter()
+
+    gravar(tabela, Path(saida) / f'{caminho.stem}_kpis.{formato}', formato)
+    if particionar is not None:
+        # Prefixo fixo por arquivo de entrada: reprocessar substitui as partições
+        prefixo = hashlib.blake2b(caminho.name.encode('utf-8'), digest_size=8).hexdigest()
+        gravar_particionado(df, particionar, prefixo=prefixo)
+    t3 = time.perf_counter()
+
+    return tabela, {
+        'Arquivo': caminho.name,
+        'Linhas': len(df),
+        'Leitura (s)': t1 - t0,
+        'KPIs (s)': t2 - t1,
+        'Gravação (s)': t3 - t2,
+        'Total (s)': t3 - t0,
+        'Erro': '',
+    }
+
+
+def processar_diretorio(diretorio, saida, formato='parquet', processos=None, particionar=None):
+    """Processa todos os arquivos do diretório em paralelo.
+
+    Retorna (consolidado de KPIs, resumo de tempos por arquivo).
+    """
+    arquivos = listar_arquivos(diretorio)
+    Path(saida).mkdir(parents=True, exist_ok=True)
+    logger.info('%d arquivo(s) em %s, %s processo(s)', len(arquivos), diretorio, processos or os.cpu_count())
+
+    tabelas, tempos = [], []
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(processar_arquivo, caminho, saida, formato, particionar): caminho
+            for caminho in arquivos
+        }
+        for i, futuro in enumerate(as_completed(futuros), 1):
+            caminho = futuros[futuro]
+            try:
+                tabela, tempo = futuro.result()
+            except Exception as e:
+                logger.error('[%d/%d] %s: erro: %s', i, len(arquivos), caminho.name, e)
+                tempos.append({'Arquivo': caminho.name, 'Erro': str(e)})
+                continue
+            tabelas.append(tabela)
+            tempos.append(tempo)
+            logger.info(
+                '[%d/%d] %s: %d linhas em %.2f s', i, len(arquivos), caminho.name, tempo['Linhas'], tempo['Total (s)']
+            )
+
+    consolidado = pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame()
+    # Colunas fixas: com todos os arquivos com erro, só 'Arquivo' e 'Erro' viriam preenchidas
+    resumo = pd.DataFrame(tempos, columns=COLUNAS_RESUMO)
+    if len(resumo):
+        resumo = resumo.sort_values('Arquivo', ignore_index=True)
+        resumo['Linhas'] = resumo['Linhas'].astype('Int64')
+
+    if len(consolidado):
+        gravar(consolidado, Path(saida) / f'kpis_consolidado.{formato}', formato)
+    resumo.to_csv(Path(saida) / 'resumo_tempos.csv', index=False, encoding='utf-8')
+    logger.info('Concluído em %.2f s', time.perf_counter() - inicio)
+    return consolidado, resumo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m paradas',
+        description='Calcula KPIs de manutenção por local para um diretório de bases (.xlsx/.csv).',
+    )
+    parser.add_argument('diretorio', help='Diretório com as bases de paradas')
+    parser.add_argument('--saida', default='kpis_lote', help='Diretório de saída (padrão: kpis_lote)')
+    parser.add_argument('--formato', choices=['parquet', 'csv'], default='parquet', help='Formato das tabelas de KPIs')
+    parser.add_argument('--processos', type=int, default=None, help='Número de processos (padrão: nº de CPUs)')
+    parser.add_argument(
+        '--particionar', default=None, help='Também grava as bases em DIR, em Parquet particionado por Local e mês'
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    _, resumo = processar_diretorio(args.diretorio, args.saida, args.formato, args.processos, args.particionar)
+
+    if len(resumo):
+        print(resumo.to_string(index=False, float_format=lambda v: f'{v:.2f}'))
+    return 1 if len(resumo) and resumo['Erro'].fillna('').astype(bool).any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
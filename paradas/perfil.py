@@ -0,0 +1,181 @@
+"""Instrumentação das etapas do pipeline: tempo, pico de memória e nº de linhas.
+
+Cada execução do script usa um ``PerfilExecucao``; as medições também são
+emitidas como log estruturado (uma linha JSON por execução, no logger
+``paradas.perfil``, ativado por ``configurar_log``) e acumuladas em
+``MetricasEtapas``, que grava um arquivo texto no formato OpenMetrics para
+agregação da latência entre sessões.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger('paradas.perfil')
+
+
+def configurar_log(destino=None):
+    """Grava o log das execuções em ``destino`` (ou ``PARADAS_PERFIL_LOG``); '-' é a saída de erro.
+
+    Sem destino o logger fica como está (sem handler, nada é emitido).
+    """
+    destino = destino or os.environ.get('PARADAS_PERFIL_LOG')
+    if not destino or logger.handlers:
+        return
+    handler = logging.StreamHandler() if destino == '-' else logging.FileHandler(destino, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    # Uma linha JSON por execução, sem repetir no log do Streamlit
+    logger.propagate = False
+
+
+_trava_rastreamento = threading.Lock()
+_perfis_medindo = 0
+
+
+def iniciar_rastreamento():
+    """Registra um perfil que mede memória; o primeiro liga o tracemalloc do processo."""
+    global _perfis_medindo
+    with _trava_rastreamento:
+        _perfis_medindo += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def parar_rastreamento():
+    """Encerra um perfil que mede memória; o último desliga o tracemalloc."""
+    global _perfis_medindo
+    with _trava_rastreamento:
+        _perfis_medindo = max(_perfis_medindo - 1, 0)
+        if not _perfis_medindo and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class PerfilExecucao:
+    """Registros de tempo por etapa de uma execução do dashboard.
+
+    Com ``medir_memoria=True`` usa o tracemalloc para medir o pico de memória
+    alocado em cada etapa (alocações do NumPy/pandas; buffers internos do
+    Arrow não entram). O rastreamento tem custo, por isso é opcional, e o
+    pico é do processo: sessões simultâneas se somam. O tracemalloc é global
+    ao processo e deixa todo o código mais lento: fica ligado só enquanto
+    algum perfil que mede memória não foi finalizado (ou coletado, numa
+    execução interrompida por ``st.stop``).
+
+    Depois de ``finalizar``, o perfil não recebe mais etapas; uma reexecução
+    isolada de um fragmento abre o próprio perfil (``finalizado`` indica isso).
+    """
+
+    def __init__(self, medir_memoria=False):
+        self.medir_memoria = medir_memoria
+        self.registros = []
+        self.finalizado = False
+        self._inicio = time.perf_counter()
+        self._rastreando = medir_memoria
+        if medir_memoria:
+            iniciar_rastreamento()
+
+    def _parar_rastreamento(self):
+        if self._rastreando:
+            self._rastreando = False
+            parar_rastreamento()
+
+    def __del__(self):
+        self._parar_rastreamento()
+
+    @contextmanager
+    def etapa(self, nome, linhas=None):
+        """Mede o bloco; o dicionário devolvido aceita ``registro['linhas'] = n``."""
+        registro = {'etapa': nome, 'linhas': linhas}
+        if self._rastreando:
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - t0
+            if self._rastreando:
+                registro['pico_memoria_mb'] = (tracemalloc.get_traced_memory()[1] - memoria_inicial) / 1024**2
+            self.registros.append(registro)
+
+    def total(self):
+        return time.perf_counter() - self._inicio
+
+    def tabela(self):
+        colunas = ['etapa', 'segundos', 'linhas'] + (['pico_memoria_mb'] if self.medir_memoria else [])
+        return pd.DataFrame(self.registros, columns=colunas)
+
+    def finalizar(self, metricas=None, **contexto):
+        """Encerra a execução: log estruturado e acúmulo nas métricas do processo."""
+        total = self.total()
+        self.finalizado = True
+        self._parar_rastreamento()
+        logger.info(json.dumps(
+            {'evento': 'execucao', 'segundos': round(total, 6), **contexto, 'etapas': self.registros},
+            ensure_ascii=False,
+            default=str,
+        ))
+        if metricas is not None:
+            metricas.acumular(self.registros, total)
+        return total
+
+
+class MetricasEtapas:
+    """Contadores de latência por etapa, acumulados entre execuções e sessões."""
+
+    def __init__(self, arquivo=None):
+        arquivo = arquivo or os.environ.get('PARADAS_METRICAS_ARQUIVO')
+        self.arquivo = Path(arquivo) if arquivo else None
+        self._etapas = {}
+        self._execucoes = [0, 0.0]
+        self._trava = threading.Lock()
+
+    def acumular(self, registros, total):
+        with self._trava:
+            self._execucoes[0] += 1
+            self._execucoes[1] += total
+            for registro in registros:
+                contagem = self._etapas.setdefault(registro['etapa'], [0, 0.0, 0.0])
+                contagem[0] += 1
+                contagem[1] += registro['segundos']
+                contagem[2] = max(contagem[2], registro['segundos'])
+            if self.arquivo is not None:
+                # Sob a trava: execuções simultâneas usam o mesmo arquivo temporário
+                temporario = self.arquivo.with_suffix('.tmp')
+                temporario.write_text(self._openmetrics(), encoding='utf-8')
+                os.replace(temporario, self.arquivo)
+
+    def _openmetrics(self):
+        linhas = [
+            '# TYPE paradas_execucao_segundos summary',
+            '# HELP paradas_execucao_segundos Latência de cada execução (rerun) do dashboard.',
+            f'paradas_execucao_segundos_count {self._execucoes[0]}',
+            f'paradas_execucao_segundos_sum {self._execucoes[1]:.6f}',
+            '# TYPE paradas_etapa_segundos summary',
+            '# HELP paradas_etapa_segundos Tempo gasto em cada etapa do pipeline.',
+        ]
+        for etapa, (contagem, soma, _) in sorted(self._etapas.items()):
+            linhas.append(f'paradas_etapa_segundos_count{{etapa="{etapa}"}} {contagem}')
+            linhas.append(f'paradas_etapa_segundos_sum{{etapa="{etapa}"}} {soma:.6f}')
+        linhas += [
+            '# TYPE paradas_etapa_max_segundos gauge',
+            '# HELP paradas_etapa_max_segundos Maior tempo observado em cada etapa.',
+        ]
+        for etapa, (_, _, maximo) in sorted(self._etapas.items()):
+            linhas.append(f'paradas_etapa_max_segundos{{etapa="{etapa}"}} {maximo:.6f}')
+        linhas.append('# EOF')
+        return '\n'.join(linhas) + '\n'
+
+    def openmetrics(self):
+        """Métricas acumuladas no formato texto OpenMetrics."""
+        with self._trava:
+            return self._openmetrics()
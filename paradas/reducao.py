@@ -0,0 +1,176 @@
+"""Redução dos dados enviados ao navegador nas figuras do dashboard.
+
+- categorias: os ``n`` maiores valores e um balde "Outros" com o restante,
+  também aplicado por ``limitar_figura`` a qualquer traço de barras ou pizza;
+- séries: amostragem LTTB (Largest-Triangle-Three-Buckets), que preserva
+  picos e vales, e traços WebGL acima de ``LIMITE_WEBGL`` pontos;
+- teto de bytes da figura serializada: acima dele, os traços de linha são
+  reamostrados pela metade até caberem.
+
+Os números exatos continuam disponíveis nas tabelas de detalhamento.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+TOP_N_PADRAO = 15
+ROTULO_OUTROS = 'Outros'
+
+# Pontos por traço de linha depois da amostragem
+LIMITE_PONTOS = 2000
+# A partir daqui o traço é desenhado em WebGL
+LIMITE_WEBGL = 1000
+
+LIMITE_BYTES_FIGURA = int(os.environ.get('PARADAS_LIMITE_FIGURA_KB', '1024')) * 1024
+
+
+def top_n(contagens, n=TOP_N_PADRAO, rotulo_outros=ROTULO_OUTROS):
+    """Os ``n`` maiores valores de ``contagens`` e a soma dos demais como "Outros (k)"."""
+    contagens = contagens[contagens > 0].sort_values(ascending=False, kind='stable')
+    if len(contagens) <= n + 1:
+        return contagens
+    principais = contagens.iloc[:n]
+    outros = pd.Series([contagens.iloc[n:].sum()], index=[f'{rotulo_outros} ({len(contagens) - n})'])
+    principais.index = principais.index.astype(str)
+    return pd.concat([principais, outros]).rename(contagens.name)
+
+
+def detalhamento(df, coluna):
+    """Números exatos por ``coluna`` (paradas e horas), para o detalhamento do "Outros"."""
+    agrupado = df.groupby(coluna, observed=True, sort=False)
+    tabela = agrupado.size().rename('Paradas').to_frame()
+    if 'Tempo de Parada (h)' in df.columns:
+        tabela['Tempo de Parada (h)'] = agrupado['Tempo de Parada (h)'].sum()
+    tabela = tabela[tabela['Paradas'] > 0].sort_values('Paradas', ascending=False, kind='stable')
+    return tabela.reset_index()
+
+
+def _numerico(valores):
+    valores = np.asarray(valores)
+    if np.issubdtype(valores.dtype, np.datetime64):
+        return valores.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return np.nan_to_num(valores.astype(float))
+
+
+def lttb(x, y, limite=LIMITE_PONTOS):
+    """Índices dos ``limite`` pontos escolhidos pelo LTTB (x crescente).
+
+    O primeiro e o último ponto são mantidos; em cada balde fica o ponto que
+    forma o maior triângulo com o ponto anterior escolhido e a média do balde
+    seguinte.
+    """
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+    x, y = _numerico(x), _numerico(y)
+
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    tamanhos = np.diff(bordas)
+    media_x = np.add.reduceat(x[1:n - 1], bordas[:-1] - 1) / tamanhos
+    media_y = np.add.reduceat(y[1:n - 1], bordas[:-1] - 1) / tamanhos
+    media_x = np.append(media_x[1:], x[-1])
+    media_y = np.append(media_y[1:], y[-1])
+
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        areas = np.abs(
+            (x[anterior] - media_x[i]) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y[i] - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[i + 1] = anterior
+    return escolhidos
+
+
+def reduzir_serie(tabela, x, y, grupo=None, limite=LIMITE_PONTOS):
+    """Linhas de ``tabela`` mantidas pelo LTTB em cada série (uma por valor de ``grupo``)."""
+    if grupo is None:
+        if len(tabela) <= limite:
+            return tabela
+        tabela = tabela.sort_values(x, kind='stable')
+        return tabela.iloc[lttb(tabela[x].to_numpy(), tabela[y].to_numpy(), limite)]
+
+    partes = [reduzir_serie(parte, x, y, limite=limite) for _, parte in tabela.groupby(grupo, sort=False, observed=True)]
+    return pd.concat(partes) if partes else tabela
+
+
+def modo_render(n_pontos):
+    return 'webgl' if n_pontos > LIMITE_WEBGL else 'svg'
+
+
+def tamanho_serializado(fig):
+    return len(pio.to_json(fig, validate=False))
+
+
+def _categorico(valores):
+    return np.asarray(valores).dtype.kind not in 'iufcmM'
+
+
+def _limitar_categorias(trace, n):
+    """Aplica o top-N com "Outros" a um traço de pizza ou de barras com eixo categórico."""
+    if trace.type == 'pie':
+        categorias, valores = trace.labels, trace.values
+        campos = ('labels', 'values')
+    elif trace.type == 'bar':
+        horizontal = trace.orientation == 'h'
+        categorias, valores = (trace.y, trace.x) if horizontal else (trace.x, trace.y)
+        campos = ('y', 'x') if horizontal else ('x', 'y')
+    else:
+        return
+    if categorias is None or valores is None or len(categorias) <= n + 1:
+        return
+    # Barras sobre eixo numérico ou de datas são séries, não categorias
+    if trace.type == 'bar' and not _categorico(categorias):
+        return
+
+    contagens = pd.Series(_numerico(valores), index=pd.Index(np.asarray(categorias)).astype(str))
+    reduzida = top_n(contagens.groupby(level=0, sort=False).sum(), n)
+    atualizacao = {campos[0]: reduzida.index.to_numpy(), campos[1]: reduzida.to_numpy()}
+    # Cores por barra (escala contínua) acompanham os novos valores; textos por ponto não valem mais
+    cores = getattr(trace.marker, 'color', None) if trace.type == 'bar' else None
+    if cores is not None and not isinstance(cores, str) and len(cores) == len(categorias):
+        atualizacao['marker.color'] = reduzida.to_numpy()
+    for atributo in ('customdata', 'text', 'hovertext'):
+        valores_atributo = getattr(trace, atributo, None)
+        if valores_atributo is not None and not isinstance(valores_atributo, str) and len(valores_atributo) == len(categorias):
+            atualizacao[atributo] = None
+    trace.update(atualizacao)
+
+
+def limitar_figura(fig, max_bytes=LIMITE_BYTES_FIGURA, n=TOP_N_PADRAO):
+    """Limita o que a figura envia ao navegador.
+
+    Traços de pizza e de barras categóricas ficam com os ``n`` maiores valores
+    e "Outros"; depois, os traços de linha são reamostrados pela metade até a
+    figura serializada caber em ``max_bytes``.
+    """
+    for trace in fig.data:
+        _limitar_categorias(trace, n)
+
+    tamanho = tamanho_serializado(fig)
+    while tamanho > max_bytes:
+        reduziu = False
+        for trace in fig.data:
+            if trace.type not in ('scatter', 'scattergl'):
+                continue
+            x, y = getattr(trace, 'x', None), getattr(trace, 'y', None)
+            if x is None or y is None or len(x) <= 3 or len(x) != len(y) or _categorico(x):
+                continue
+            manter = lttb(np.asarray(x), np.asarray(y), max(3, len(x) // 2))
+            atualizacao = {'x': np.asarray(x)[manter], 'y': np.asarray(y)[manter]}
+            for atributo in ('customdata', 'text', 'hovertext'):
+                valores = getattr(trace, atributo, None)
+                if valores is not None and not isinstance(valores, str) and len(valores) == len(x):
+                    atualizacao[atributo] = np.asarray(valores)[manter]
+            trace.update(atualizacao)
+            reduziu = True
+        if not reduziu:
+            break
+        tamanho = tamanho_serializado(fig)
+    return fig
@@ -0,0 +1,176 @@
+"""Registro de bases compartilhado entre as sessões do servidor.
+
+Cada base (chave = hash do conteúdo) é mantida uma única vez por processo,
+já compactada, a partir de um arquivo Arrow IPC mapeado em memória: as
+colunas sem nulos ficam como visões somente leitura do mapeamento (sem
+cópia) e as demais são convertidas uma vez. Cada sessão guarda apenas a
+chave da base e o próprio estado dos filtros.
+
+O registro conta as sessões que usam cada base; uma base sem sessões ativas
+há mais de ``tempo_ocioso`` segundos é descartada (junto com o arquivo).
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import pyarrow as pa
+
+from paradas.ingestao import DIRETORIO_CACHE_PADRAO, LIMITE_CACHE_PADRAO_MB, VERSAO_CACHE, limpar_lru
+
+TEMPO_OCIOSO_PADRAO_S = float(os.environ.get('PARADAS_REGISTRO_OCIOSO_S', '1800'))
+
+
+def gravar_arrow(df, caminho):
+    """Grava ``df`` como Arrow IPC sem compressão (requisito para o mapeamento)."""
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    temporario = Path(caminho).with_suffix('.tmp')
+    with pa.OSFile(str(temporario), 'wb') as arquivo:
+        with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+
+
+def mapear_arrow(caminho):
+    """DataFrame apoiado no arquivo mapeado; devolve também a tabela que o mantém vivo."""
+    tabela = pa.ipc.open_file(pa.memory_map(str(caminho))).read_all()
+    return tabela.to_pandas(split_blocks=True), tabela
+
+
+class BaseCompartilhada:
+    """Uma base no registro: o DataFrame, seu arquivo mapeado e as sessões que a usam."""
+
+    def __init__(self, chave, df, tabela=None, caminho=None, memoria_antes=None):
+        self.chave = chave
+        self.df = df
+        self.tabela = tabela
+        self.caminho = caminho
+        self.memoria_antes = memoria_antes
+        self.sessoes = {}
+        self.ultimo_acesso = time.monotonic()
+
+    @property
+    def mapeada(self):
+        return self.tabela is not None
+
+    def memoria_mapeada(self):
+        return self.tabela.nbytes if self.mapeada else 0
+
+
+class RegistroBases:
+    """Bases compartilhadas por chave de conteúdo, com contagem de sessões e descarte por ociosidade.
+
+    ``carregar`` (em ``adquirir``) só é chamado para a primeira sessão que
+    pede uma chave; sessões concorrentes com a mesma base esperam por ela.
+    """
+
+    def __init__(
+        self,
+        diretorio=DIRETORIO_CACHE_PADRAO / 'compartilhado',
+        tempo_ocioso=TEMPO_OCIOSO_PADRAO_S,
+        limite_bytes=LIMITE_CACHE_PADRAO_MB * 1024 * 1024,
+    ):
+        self.diretorio = Path(diretorio)
+        self.tempo_ocioso = tempo_ocioso
+        self.limite_bytes = limite_bytes
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        # Arquivos de execuções anteriores são reaproveitados, dentro do limite de tamanho
+        limpar_lru(self.diretorio, '*.arrow', limite_bytes)
+        self._bases = {}
+        self._travas_carga = {}
+        self._trava = threading.Lock()
+
+    def _caminho(self, chave):
+        return self.diretorio / f'{chave}.v{VERSAO_CACHE}.arrow'
+
+    def _carregar(self, chave, carregar):
+        """Monta a entrada a partir do arquivo Arrow existente ou de ``carregar()``."""
+        caminho = self._caminho(chave)
+        memoria_antes = None
+        novo = not caminho.exists()
+        if novo:
+            df, memoria_antes = carregar()
+            try:
+                gravar_arrow(df, caminho)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OSError):
+                # Colunas com tipos mistos não são serializáveis; manter só em memória
+                caminho.with_suffix('.tmp').unlink(missing_ok=True)
+                return BaseCompartilhada(chave, df, memoria_antes=memoria_antes)
+        else:
+            # A data de modificação marca o último uso para o limpar_lru
+            os.utime(caminho)
+        df, tabela = mapear_arrow(caminho)
+        if novo:
+            # Depois de mapear: um arquivo apagado continua válido para quem já o mapeou
+            limpar_lru(self.diretorio, '*.arrow', self.limite_bytes)
+        return BaseCompartilhada(chave, df, tabela, caminho, memoria_antes)
+
+    def adquirir(self, chave, sessao, carregar):
+        """Base de ``chave`` registrada para ``sessao``.
+
+        ``carregar()`` deve devolver (DataFrame compactado, memória antes da compactação).
+        """
+        with self._trava:
+            self._descartar_ociosas()
+            base = self._bases.get(chave)
+            if base is None:
+                trava_carga = self._travas_carga.setdefault(chave, threading.Lock())
+
+        if base is None:
+            with trava_carga:
+                with self._trava:
+                    base = self._bases.get(chave)
+                if base is None:
+                    base = self._carregar(chave, carregar)
+                    with self._trava:
+                        self._bases[chave] = base
+                        self._travas_carga.pop(chave, None)
+
+        with self._trava:
+            base.sessoes[sessao] = time.monotonic()
+            base.ultimo_acesso = time.monotonic()
+        return base
+
+    def liberar(self, chave, sessao, descartar=False):
+        """A sessão deixou de usar a base (outro arquivo ou upload removido).
+
+        Com ``descartar=True`` (resultados de consulta, que dificilmente são
+        pedidos de novo), a base sem outras sessões sai na hora, sem esperar
+        o tempo ocioso.
+        """
+        with self._trava:
+            base = self._bases.get(chave)
+            if base is not None:
+                base.sessoes.pop(sessao, None)
+                base.ultimo_acesso = time.monotonic()
+                if descartar and not base.sessoes:
+                    self._remover(chave)
+
+    def _remover(self, chave):
+        base = self._bases.pop(chave)
+        if base.caminho is not None:
+            # Os mapeamentos já abertos continuam válidos até serem liberados
+            base.caminho.unlink(missing_ok=True)
+
+    def _descartar_ociosas(self):
+        agora = time.monotonic()
+        for chave, base in list(self._bases.items()):
+            # Sessões fechadas não avisam o servidor: expiram pelo último rerun
+            for sessao, visto in list(base.sessoes.items()):
+                if agora - visto > self.tempo_ocioso:
+                    del base.sessoes[sessao]
+            if not base.sessoes and agora - base.ultimo_acesso > self.tempo_ocioso:
+                self._remover(chave)
+
+    def descartar_ociosas(self):
+        with self._trava:
+            self._descartar_ociosas()
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'bases': len(self._bases),
+                'sessoes': sum(len(base.sessoes) for base in self._bases.values()),
+                'mapeado_bytes': sum(base.memoria_mapeada() for base in self._bases.values()),
+            }
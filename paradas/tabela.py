@@ -0,0 +1,61 @@
+"""Tabela paginada: ordenação, busca e páginas resolvidas no servidor.
+
+Tudo opera sobre as posições filtradas da base; só as linhas da página
+visível são materializadas em um DataFrame e enviadas ao navegador.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class IndiceTabela:
+    """Ranks de ordenação por coluna, calculados sob demanda uma vez por base."""
+
+    def __init__(self, df):
+        self.df = df
+        self._ranks = {}
+        self._trava = threading.Lock()
+
+    def rank(self, coluna):
+        """Posição de cada linha na ordenação crescente de ``coluna`` (vazios por último)."""
+        with self._trava:
+            if coluna not in self._ranks:
+                serie = self.df[coluna].reset_index(drop=True)
+                ordem = serie.sort_values(kind='stable', na_position='last').index.to_numpy()
+                rank = np.empty(len(serie), dtype=np.int64)
+                rank[ordem] = np.arange(len(serie))
+                self._ranks[coluna] = rank
+            return self._ranks[coluna]
+
+    def buscar(self, posicoes, coluna, termo):
+        """Posições cujo valor em ``coluna`` contém ``termo`` (sem diferenciar maiúsculas)."""
+        serie = self.df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Busca apenas nas categorias e aplica pelos códigos
+            casou = serie.cat.categories.astype(str).str.contains(termo, case=False, regex=False)
+            permitido = np.append(np.asarray(casou, dtype=bool), False)
+            codigos = serie.cat.codes.to_numpy()[posicoes]
+            return posicoes[permitido[codigos]]
+        valores = serie.iloc[posicoes].astype(str)
+        return posicoes[valores.str.contains(termo, case=False, regex=False).to_numpy(dtype=bool)]
+
+    def consultar(self, posicoes, ordenar_por=None, crescente=True, coluna_busca=None, termo=None):
+        """Aplica busca e ordenação às posições filtradas."""
+        if coluna_busca and termo:
+            posicoes = self.buscar(posicoes, coluna_busca, termo)
+        if ordenar_por:
+            chave = self.rank(ordenar_por)[posicoes]
+            ordem = np.argsort(chave if crescente else -chave, kind='stable')
+            posicoes = posicoes[ordem]
+        return posicoes
+
+    def pagina(self, posicoes, numero, tamanho):
+        """Linhas da página ``numero`` (começando em 1) de ``tamanho`` linhas."""
+        inicio = (numero - 1) * tamanho
+        return self.df.iloc[posicoes[inicio:inicio + tamanho]]
+
+
+def total_paginas(n_linhas, tamanho):
+    return max(1, -(-n_linhas // tamanho))
@@ -0,0 +1,106 @@
+"""Pré-cálculo das seções pesadas do dashboard em segundo plano.
+
+As tarefas rodam num pool de threads do processo (as bases são
+compartilhadas entre sessões, então não há cópia para outros processos) e
+ficam guardadas pela chave: a mesma chave agendada de novo devolve o mesmo
+futuro, concluído ou não. As funções agendadas não devem chamar o
+Streamlit, só o pacote ``paradas``.
+
+Os resultados guardados têm limite de entradas e de bytes, como o
+``CacheGraficos``; as tarefas que uma sessão deixou de pedir (filtro
+trocado, seção escondida) e que ainda não começaram são canceladas.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from paradas.graficos import tamanho_estimado
+
+THREADS_PADRAO = int(os.environ.get('PARADAS_TAREFAS_THREADS', min(4, os.cpu_count() or 1)))
+
+
+class ExecutorTarefas:
+    """Pool de threads com os resultados guardados por chave (LRU das tarefas concluídas)."""
+
+    def __init__(self, threads=THREADS_PADRAO, max_resultados=64, max_bytes=256 * 1024 * 1024):
+        self.max_resultados = max_resultados
+        self.max_bytes = max_bytes
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='paradas')
+        self._futuros = OrderedDict()
+        self._tamanhos = {}
+        self._bytes = 0
+        self._sessoes = {}
+        self._trava = threading.Lock()
+
+    def agendar(self, chave, funcao, *args):
+        """Futuro do resultado de ``funcao(*args)`` para ``chave``.
+
+        Tarefas que falharam ou foram canceladas são reagendadas; as demais
+        nunca são recalculadas enquanto estiverem guardadas.
+        """
+        with self._trava:
+            futuro = self._futuros.get(chave)
+            if futuro is not None and not (futuro.done() and (futuro.cancelled() or futuro.exception() is not None)):
+                self._futuros.move_to_end(chave)
+                return futuro
+            if futuro is not None:
+                self._remover(chave)
+            futuro = self._pool.submit(funcao, *args)
+            self._futuros[chave] = futuro
+        # Fora da trava: com a tarefa já concluída, o callback roda nesta thread
+        futuro.add_done_callback(lambda concluido: self._concluida(chave, concluido))
+        return futuro
+
+    def _concluida(self, chave, futuro):
+        tamanho = 0 if futuro.cancelled() or futuro.exception() is not None else tamanho_estimado(futuro.result())
+        with self._trava:
+            if self._futuros.get(chave) is not futuro:
+                return
+            self._tamanhos[chave] = tamanho
+            self._bytes += tamanho
+            self._descartar_antigas(manter=chave)
+
+    def _remover(self, chave):
+        del self._futuros[chave]
+        self._bytes -= self._tamanhos.pop(chave, 0)
+
+    def _descartar_antigas(self, manter=None):
+        # Só tarefas concluídas saem (as pendentes ainda têm quem espere por
+        # elas), nunca a que acabou de concluir
+        concluidas = [chave for chave, futuro in self._futuros.items() if futuro.done() and chave != manter]
+        for chave in concluidas:
+            if len(self._futuros) <= self.max_resultados and self._bytes <= self.max_bytes:
+                break
+            self._remover(chave)
+
+    def manter_apenas(self, sessao, chaves):
+        """Registra as tarefas que ``sessao`` pediu nesta execução e cancela as anteriores.
+
+        Uma tarefa que a sessão pediu antes e não pediu agora é cancelada se
+        ainda não começou e nenhuma outra sessão a pediu.
+        """
+        chaves = set(chaves)
+        with self._trava:
+            anteriores = self._sessoes.get(sessao, set())
+            self._sessoes[sessao] = chaves
+            pedidas = set().union(*self._sessoes.values())
+            abandonadas = [(chave, self._futuros[chave]) for chave in anteriores - pedidas if chave in self._futuros]
+            # Sessões encerradas não avisam: saem quando nada do que pediram está guardado
+            self._sessoes = {
+                outra: pedidas_outra for outra, pedidas_outra in self._sessoes.items()
+                if outra == sessao or pedidas_outra & self._futuros.keys()
+            }
+
+        # Fora da trava: cancel() chama os callbacks de conclusão nesta thread
+        for chave, futuro in abandonadas:
+            if futuro.cancel():
+                with self._trava:
+                    if self._futuros.get(chave) is futuro:
+                        self._remover(chave)
+
+    def estatisticas(self):
+        with self._trava:
+            pendentes = sum(not futuro.done() for futuro in self._futuros.values())
+            return {'pendentes': pendentes, 'concluidas': len(self._futuros) - pendentes, 'bytes': self._bytes}
@@ -0,0 +1,69 @@
+"""Kaplan-Meier e Weibull comparados ao cálculo manual e ao ``scipy.stats``."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from paradas.confiabilidade import ajustar_weibull, kaplan_meier, tempos_entre_falhas
+
+
+def test_tempos_entre_falhas():
+    df = pd.DataFrame({
+        'Data Início': pd.to_datetime([
+            '2024-01-01 00:00', '2024-01-01 10:00', '2024-01-02 00:00',
+            '2024-01-01 00:00', '2024-01-01 05:00', '2024-01-01 20:00',
+            '2024-01-01 00:00',
+        ]),
+        'Tempo de Parada (h)': [12.0, 1.0, 2.0, 1.0, np.nan, 3.0, 1.0],
+        'Local': ['A'] * 7,
+        'Equipamento': ['E1', 'E1', 'E1', 'E2', 'E2', 'E2', 'E3'],
+        'Status': ['Fechado', 'Fechado', 'Fechado', 'Fechado', 'Aberto', 'Fechado', 'Fechado'],
+    })
+    tempo, falha, linhas = tempos_entre_falhas(df)
+    # E1: a parada das 10:00 fica dentro da primeira; volta às 12:00 e falha à 0:00 do dia 2.
+    # E2: funciona de 01:00 às 05:00 e fica parado em aberto (censurado, sem cauda).
+    # E3: só a cauda, de 01:00 até o fim dos dados (dia 2, 02:00), censurada.
+    assert sorted(zip(linhas.tolist(), tempo.tolist(), falha.tolist())) == [
+        (2, 12.0, True), (4, 4.0, False), (6, 25.0, False),
+    ]
+
+
+def test_kaplan_meier_manual():
+    # Grupo 0: falhas em 2, 3 (duas) e 8; censuras em 3 e 5
+    tempo = np.array([2.0, 3.0, 3.0, 3.0, 5.0, 8.0, 4.0, 6.0])
+    falha = np.array([True, True, True, False, False, True, True, False])
+    grupo = np.array([0, 0, 0, 0, 0, 0, 1, 1])
+    curvas = kaplan_meier(grupo, tempo, falha)
+
+    g0 = curvas[curvas['grupo'] == 0]
+    assert g0['Tempo (h)'].tolist() == [2.0, 3.0, 8.0]
+    assert g0['Em Risco'].tolist() == [6, 5, 1]
+    assert g0['Falhas'].tolist() == [1, 2, 1]
+    np.testing.assert_allclose(g0['Sobrevivência'], [5 / 6, 5 / 6 * 3 / 5, 0.0])
+
+    g1 = curvas[curvas['grupo'] == 1]
+    assert g1['Tempo (h)'].tolist() == [4.0]
+    np.testing.assert_allclose(g1['Sobrevivência'], [0.5])
+
+
+def test_weibull_igual_ao_scipy():
+    rng = np.random.default_rng(7)
+    grupos, tempos, falhas = [], [], []
+    for g, (forma, escala) in enumerate([(0.8, 100.0), (1.5, 400.0), (3.0, 50.0)]):
+        tempo = escala * rng.weibull(forma, 300)
+        censura = escala * rng.weibull(forma, 300) * 1.5
+        grupos.append(np.full(300, g))
+        tempos.append(np.minimum(tempo, censura))
+        falhas.append(tempo <= censura)
+    grupo, tempo, falha = np.concatenate(grupos), np.concatenate(tempos), np.concatenate(falhas)
+
+    forma, escala = ajustar_weibull(grupo, tempo, falha, 4)
+    for g in range(3):
+        no_grupo = grupo == g
+        dados = stats.CensoredData.right_censored(tempo[no_grupo], ~falha[no_grupo])
+        forma_scipy, _, escala_scipy = stats.weibull_min.fit(dados, floc=0)
+        assert forma[g] == pytest.approx(forma_scipy, rel=1e-3)
+        assert escala[g] == pytest.approx(escala_scipy, rel=1e-3)
+    # Grupo sem observações
+    assert np.isnan(forma[3]) and np.isnan(escala[3])
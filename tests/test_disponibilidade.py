@@ -0,0 +1,61 @@
+"""Disponibilidade com paradas duplicadas: KPIs, cubo e agregados com a mesma definição."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from paradas.agregados import agregar, kpis_de_agregados
+from paradas.cubo import CuboParadas
+from paradas.kpis import NIVEIS, calcular_kpis, tabela_kpis
+
+
+def _base():
+    # Três paradas de 24 h duplicadas no mesmo ativo e uma em outro Local com o mesmo Equipamento
+    return pd.DataFrame({
+        'Data Início': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-01', '2024-01-03', '2024-01-10']),
+        'Tempo de Parada (h)': [24.0, 24.0, 24.0, 12.0, 6.0],
+        'Local': ['A', 'A', 'A', 'A', 'B'],
+        'Equipamento': ['E1', 'E1', 'E1', 'E1', 'E1'],
+        'Status': ['Fechado'] * 5,
+    })
+
+
+def test_cubo_une_paradas_duplicadas():
+    df = _base()
+    cubo = CuboParadas(df)
+    assert cubo.ativos() == 2
+
+    serie = cubo.serie(granularidade='Mês')
+    assert serie['Tempo de Parada (h)'].sum() == pytest.approx(24 + 12 + 6)
+    assert serie['Disponibilidade (%)'].between(0, 100).all()
+
+    dia = cubo.serie(granularidade='Dia').set_index('Período')
+    assert dia.loc[pd.Timestamp('2024-01-01'), 'Tempo de Parada (h)'] == pytest.approx(24)
+    assert dia.loc[pd.Timestamp('2024-01-01'), 'Disponibilidade (%)'] == pytest.approx(50)
+
+
+def test_agregados_iguais_aos_kpis():
+    df = _base()
+    kpis = calcular_kpis(df)
+    tabela = kpis_de_agregados(agregar(df))
+    for coluna in ['Tempo Total Parada (h)', 'Tempo Operacional (h)', 'MTBF (h)', 'Disponibilidade (%)']:
+        np.testing.assert_allclose(tabela[coluna].iloc[0], kpis[coluna], err_msg=coluna)
+
+
+def test_tabela_kpis_igual_aos_kpis_de_cada_grupo():
+    # Pares (Local, Equipamento) ausentes deixam buracos nos códigos de ativo
+    df = pd.concat([_base(), pd.DataFrame({
+        'Data Início': pd.to_datetime(['2024-01-05', '2024-01-06']),
+        'Tempo de Parada (h)': [30.0, 8.0],
+        'Local': ['C', 'C'],
+        'Equipamento': ['E2', 'E2'],
+        'Status': ['Fechado', 'Fechado'],
+    })], ignore_index=True)
+    tabela = tabela_kpis(df)
+    for nivel, chaves in NIVEIS.items():
+        parte = tabela[tabela['Nível'] == nivel]
+        for _, linha in parte.iterrows():
+            grupo = df[(df[chaves] == linha[chaves].to_numpy()).all(axis=1)]
+            esperado = calcular_kpis(grupo)
+            for coluna in ['Tempo Total Parada (h)', 'Disponibilidade (%)']:
+                assert linha[coluna] == pytest.approx(esperado[coluna]), (nivel, coluna)
@@ -0,0 +1,126 @@
+"""Filtros empurrados para as fontes externas comparados ao ``IndiceFiltros`` sobre a base inteira."""
+
+import sqlite3
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from paradas import fontes
+from paradas.filtros import IndiceFiltros
+from paradas.fontes import FonteParquetParticionada, FonteSQLite, gravar_particionado
+
+
+def _base():
+    # 'Tempo de Parada (h)' único por linha identifica as linhas lidas
+    inicio = pd.to_datetime([
+        '2024-01-14 23:00', '2024-01-15 00:00', '2024-01-20 10:30', '2024-01-31 23:59',
+        '2024-02-01 00:00', '2024-02-10 00:00', '2024-02-10 23:00', '2024-02-11 00:00',
+        '2024-03-05 08:00', '2024-03-06 09:00', '2024-03-07 10:00', '2024-03-08 11:00',
+    ])
+    return pd.DataFrame({
+        'Data Início': inicio,
+        'Data Fim': inicio + pd.Timedelta(hours=2),
+        'Tempo de Parada (h)': np.arange(1.0, len(inicio) + 1),
+        'Local': ['A', 'A', 'B', 'A', 'B', 'A', 'B', 'A', 'C', 'C', 'A', 'B'],
+        'Equipamento': ['E1', 'E2', None, 'E1', 'E3', 'E2', 'E1', None, 'E4', 'E5', 'E1', 'E3'],
+        'Causa': ['falha'] * len(inicio),
+        'Status': ['Fechado', 'Aberto', 'Fechado', None, 'Fechado', 'Fechado',
+                   'Aberto', 'Fechado', 'Fechado', 'Aberto', 'Fechado', 'Fechado'],
+    })
+
+
+def _sqlite(df, caminho):
+    texto = df.copy()
+    for coluna in ['Data Início', 'Data Fim']:
+        texto[coluna] = df[coluna].dt.strftime('%Y-%m-%d %H:%M:%S')
+    # Datas em texto ISO 8601, com ' ' ou 'T' antes da hora
+    texto.loc[::2, 'Data Início'] = df.loc[::2, 'Data Início'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    conexao = sqlite3.connect(caminho)
+    try:
+        texto.to_sql('paradas', conexao, index=False)
+    finally:
+        conexao.close()
+    return FonteSQLite(caminho)
+
+
+def _parquet(df, caminho):
+    gravar_particionado(df, caminho, prefixo='base')
+    return FonteParquetParticionada(caminho)
+
+
+@pytest.fixture(params=['sqlite', 'parquet'])
+def fonte(request, tmp_path):
+    if request.param == 'sqlite':
+        return _sqlite(_base(), tmp_path / 'paradas.sqlite')
+    return _parquet(_base(), tmp_path / 'particionado')
+
+
+def _ids(df):
+    return set(df['Tempo de Parada (h)'].astype(float))
+
+
+def _conferir(fonte, selecoes, periodo):
+    base = _base()
+    esperado = _ids(base.iloc[IndiceFiltros(base).filtrar(selecoes, periodo)])
+    lidas = fonte.ler(selecoes, periodo).reset_index(drop=True)
+    # O filtro empurrado pode trazer linhas a mais, nunca a menos
+    assert esperado <= _ids(lidas)
+    assert _ids(lidas.iloc[IndiceFiltros(lidas).filtrar(selecoes, periodo)]) == esperado
+
+
+SELECOES = [
+    {},
+    {'Local': []},
+    {'Local': ['A']},
+    {'Local': ['A', 'B', 'C']},
+    {'Equipamento': ['E1']},
+    {'Equipamento': ['E2', None]},
+    {'Equipamento': [None]},
+    {'Status': ['Fechado'], 'Local': ['B', 'C']},
+    {'Status': [None, 'Aberto'], 'Equipamento': ['E1', 'E3']},
+]
+
+PERIODOS = [None, (date(2024, 1, 15), date(2024, 2, 10)), (date(2024, 2, 10), date(2024, 2, 10))]
+
+
+@pytest.mark.parametrize('periodo', PERIODOS)
+@pytest.mark.parametrize('selecoes', SELECOES)
+def test_filtro_empurrado_mantem_linhas_do_indice(fonte, selecoes, periodo):
+    _conferir(fonte, selecoes, periodo)
+
+
+def test_ultimo_dia_do_periodo_inteiro(fonte):
+    lidas = fonte.ler({}, (date(2024, 1, 15), date(2024, 2, 10)))
+    assert {2.0, 6.0, 7.0} <= _ids(lidas)
+    assert not {1.0, 8.0} & _ids(lidas)
+
+
+def test_selecao_completa_nao_restringe(fonte):
+    assert fonte.restricoes({'Local': ['A', 'B', 'C'], 'Status': []}) == {}
+    assert fonte.restricoes({'Equipamento': ['E1', 'E2', 'E3', 'E4', 'E5']}) == {
+        'Equipamento': (['E1', 'E2', 'E3', 'E4', 'E5'], False)
+    }
+    assert fonte.restricoes({'Equipamento': ['E1', 'E2', 'E3', 'E4', 'E5', None]}) == {}
+
+
+def test_catalogo_limitado(fonte, monkeypatch):
+    monkeypatch.setattr(fontes, 'LIMITE_CATALOGO', 3)
+    assert not fonte.catalogo_completo('Equipamento')
+    assert len([valor for valor in fonte.valores_distintos('Equipamento') if valor is not None]) == 3
+    # Com a lista cortada, selecionar tudo o que aparece ainda filtra
+    visiveis = fonte.valores_distintos('Equipamento')
+    assert 'Equipamento' in fonte.restricoes({'Equipamento': visiveis})
+    _conferir(fonte, {'Equipamento': visiveis}, None)
+
+
+def test_regravar_particionado_substitui(tmp_path):
+    destino = tmp_path / 'particionado'
+    base = _base()
+    gravar_particionado(base, destino, prefixo='base')
+    gravar_particionado(base, destino, prefixo='base')
+    gravar_particionado(base.iloc[:2], destino, prefixo='outra')
+    fonte = FonteParquetParticionada(destino)
+    assert len(fonte.ler()) == len(base) + 2
+    assert sorted(fonte.valores_distintos('Status'), key=str) == sorted(['Aberto', 'Fechado', None], key=str)
@@ -0,0 +1,81 @@
+"""Leitura em blocos para o cache Parquet comparada à leitura direta do pandas."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from paradas.compactacao import compactar
+from paradas.ingestao import CacheParquet, gravar_parquet_em_blocos, ler_arquivo
+
+
+def _csv_misto():
+    linhas = ['Data Início,Data Fim,Equipamento,Nº,Status']
+    for i in range(5):
+        linhas.append(f'2024-01-0{i + 1} 08:00,2024-01-0{i + 1} 10:00,{100 + i},{i},Fechado')
+    for i in range(5):
+        linhas.append(f'2024-02-0{i + 1} 08:00,2024-02-0{i + 1} 09:30,EMP {i},{i + 5},Aberto')
+    return '\n'.join(linhas).encode('utf-8')
+
+
+def _em_blocos(dados, nome, tmp_path, tamanho_bloco):
+    destino = tmp_path / 'base.parquet'
+    gravar_parquet_em_blocos(dados, nome, destino, tamanho_bloco=tamanho_bloco)
+    return pd.read_parquet(destino)
+
+
+def _comparar(em_blocos, direto):
+    assert list(em_blocos.columns) == list(direto.columns)
+    for col in direto.columns:
+        esperado, obtido = direto[col], em_blocos[col]
+        if pd.api.types.is_numeric_dtype(esperado) or pd.api.types.is_datetime64_any_dtype(esperado):
+            assert esperado.dtype.kind == obtido.dtype.kind, col
+            np.testing.assert_array_equal(obtido.to_numpy(), esperado.to_numpy())
+        else:
+            assert obtido.astype(str).tolist() == esperado.astype(str).tolist(), col
+
+
+@pytest.mark.parametrize('tamanho_bloco', [3, 5, 100])
+def test_csv_com_texto_depois_de_numeros(tmp_path, tamanho_bloco):
+    dados = _csv_misto()
+    em_blocos = _em_blocos(dados, 'base.csv', tmp_path, tamanho_bloco)
+
+    _comparar(em_blocos, ler_arquivo(dados, 'base.csv'))
+    assert em_blocos['Equipamento'].tolist()[:6] == ['100', '101', '102', '103', '104', 'EMP 0']
+    assert pd.api.types.is_integer_dtype(em_blocos['Nº'])
+
+
+def test_csv_inteiro_com_vazio_em_bloco_posterior(tmp_path):
+    dados = b'Data In\xc3\xadcio,Status,Qtd\n2024-01-01,Fechado,1\n2024-01-02,Fechado,2\n2024-01-03,Aberto,\n'
+    em_blocos = _em_blocos(dados, 'base.csv', tmp_path, tamanho_bloco=2)
+
+    _comparar(em_blocos, ler_arquivo(dados, 'base.csv'))
+
+
+def test_xlsx_misto(tmp_path):
+    df = pd.DataFrame({
+        'Data Início': pd.date_range('2024-01-01', periods=10, freq='D'),
+        'Data Fim': pd.date_range('2024-01-01 06:00', periods=10, freq='D'),
+        'Nº': range(1, 11),
+        'Equipamento': [100, 101, 102, 103, 104, 'EMP 0', 'EMP 1', 'EMP 2', 'EMP 3', 'EMP 4'],
+        'Status': ['Fechado'] * 10,
+    })
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    dados = buffer.getvalue()
+    em_blocos = _em_blocos(dados, 'base.xlsx', tmp_path, tamanho_bloco=4)
+
+    _comparar(em_blocos, ler_arquivo(dados, 'base.xlsx'))
+    assert pd.api.types.is_integer_dtype(em_blocos['Nº'])
+
+
+def test_cache_le_categorias_como_compactar(tmp_path):
+    dados = _csv_misto() + b'\n2024-03-01 08:00,,EMP 0,10,\n'
+    cache = CacheParquet(tmp_path)
+    caminho = cache.salvar_em_blocos('base', dados, 'base.csv', tamanho_bloco=4)
+
+    obtido = compactar(cache.obter('base'))
+    esperado = compactar(pd.read_parquet(caminho))
+    assert obtido.dtypes.to_dict() == esperado.dtypes.to_dict()
+    pd.testing.assert_frame_equal(obtido, esperado)